@@ -0,0 +1,52 @@
+"""
+Adapter for running a CrewAI agent on a single prompt outside a Crew.
+"""
+
+import json
+from typing import Any, Optional, Type
+
+from crewai import Agent
+from pydantic import BaseModel
+
+def _parse_json(raw: str) -> Any:
+    """JSON in raw, allowing a Markdown code fence around it; None if there is none."""
+    text = raw.strip()
+    if text.startswith('```'):
+        text = text.split('\n', 1)[-1].rsplit('```', 1)[0]
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return None
+
+class AgentRunner:
+    """
+    Gives a CrewAI agent the `await execute(prompt)` interface the agents'
+    execute methods call.
+
+    Each prompt is run as a standalone agent kickoff with a structured
+    response format, and the parsed result is returned as a dict.
+    """
+
+    def __init__(self, agent: Agent, response_format: Type[BaseModel]):
+        self.agent = agent
+        self.response_format = response_format
+
+    async def execute(
+        self,
+        prompt: str,
+        response_format: Optional[Type[BaseModel]] = None,
+        strict: bool = True
+    ) -> Any:
+        """
+        Run prompt; response_format overrides the runner's schema for this call.
+        With strict=False a response that does not match the schema is
+        returned as parsed JSON (None if it is not JSON) instead of raising,
+        for callers that validate its parts themselves.
+        """
+        response_format = response_format or self.response_format
+        output = await self.agent.kickoff_async(prompt, response_format=response_format)
+        if output.pydantic is not None:
+            return output.pydantic.model_dump()
+        if not strict:
+            return _parse_json(output.raw)
+        return response_format.model_validate_json(output.raw).model_dump()
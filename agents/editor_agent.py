@@ -2,14 +2,15 @@
 EditorAgent for compiling and formatting the final AI news digest.
 """
 
-from typing import List, Dict
+from typing import List, Optional
 from crewai import Agent
+from crewai.llms.base_llm import BaseLLM
 from agents.verifier_agent import VerifiedSummary
-from datetime import datetime
-import yaml
-import os
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field, PrivateAttr
+from utils.config import AppConfig, get_config
+from utils.llm_cache import build_llm
+from tools.digest_renderer import DigestRenderer
 
 class FormatDigestSchema(BaseModel):
     """Schema for the format digest tool input."""
@@ -21,53 +22,67 @@ class FormatDigestSchema(BaseModel):
         description="The title of the digest"
     )
 
+class IntroOutput(BaseModel):
+    """Structured response for the digest's intro paragraph."""
+    intro: str = Field(description="A 2-4 sentence introduction to today's digest")
+
 class FormatDigestTool(BaseTool):
     """Tool for formatting the final digest."""
     
     name: str = "FormatDigest"
     description: str = "Format and compile verified news summaries into a professional digest"
     args_schema: type[BaseModel] = FormatDigestSchema
-    _config: Dict = PrivateAttr()
+    _config: AppConfig = PrivateAttr()
 
-    def __init__(self):
+    def __init__(self, config: Optional[AppConfig] = None):
         super().__init__()
-        self._config = self._load_config()
-
-    def _load_config(self) -> Dict:
-        """Load configuration from config.yaml."""
-        with open("config.yaml", 'r') as f:
-            return yaml.safe_load(f)
+        self._config = config or get_config()
 
     def _run(self, content: str, title: str = "AI News Digest") -> str:
-        """Format and save the digest."""
+        """
+        Save Markdown content as the digest, with its HTML rendering if that
+        format is configured. JSON needs structured stories, so it is only
+        written by publish().
+        """
         try:
-            # Create digests directory if it doesn't exist
-            os.makedirs("digests", exist_ok=True)
-            
-            # Save the digest with today's date
-            today = datetime.now().strftime("%Y-%m-%d")
-            filename = f"digests/ai_digest_{today}.md"
-            
-            with open(filename, "w") as f:
-                f.write(content)
-            
+            renderer = DigestRenderer(self._config)
+            renderer.write({'markdown': content, 'html': renderer.html(content, title)})
             return content
         except Exception as e:
             return f"Error saving digest: {str(e)}"
 
+    def publish(
+        self,
+        verified_summaries: List[VerifiedSummary],
+        title: str = "AI News Digest",
+        intro: Optional[str] = None
+    ) -> str:
+        """
+        Render verified summaries in every configured format and save them.
+        Returns the Markdown digest.
+        """
+        renderer = DigestRenderer(self._config)
+        documents = renderer.render(verified_summaries, title, intro=intro)
+        renderer.write(documents)
+        return documents['markdown']
+
 class EditorAgent:
     """Agent responsible for compiling and formatting the final digest."""
     
     @staticmethod
-    def create() -> Agent:
-        """Create and return the EditorAgent."""
+    def create(config: Optional[AppConfig] = None, llm: Optional[BaseLLM] = None) -> Agent:
+        """
+        Create and return the EditorAgent.
+        Uses the configured, response-cached LLM unless llm is given.
+        """
         return Agent(
             role='Content Editor',
             goal='Create a well-organized, professional AI news digest',
             backstory="""You are a skilled editor with expertise in technology 
             journalism. Your role is to compile verified AI news summaries into 
             a cohesive, well-structured digest that provides value to readers.""",
-            tools=[FormatDigestTool()],
+            tools=[FormatDigestTool(config)],
+            llm=llm or build_llm(config),
             verbose=True,
             allow_delegation=False
         )
@@ -97,4 +112,25 @@ class EditorAgent:
             """
         )
         
-        return task_result 
\ No newline at end of file
+        return task_result
+
+    @staticmethod
+    async def write_intro(agent: Agent, verified_summaries: List[VerifiedSummary]) -> str:
+        """
+        Write the digest's intro paragraph with one agent call; the stories
+        themselves are laid out by DigestRenderer. Only titles, sources and
+        verification status are sent, which keeps the call small.
+        """
+        stories = "\n".join(
+            f"- {summary.title} ({summary.source}; {summary.verification_status})"
+            for summary in verified_summaries
+        )
+        task_result = await agent.execute(
+            f"""Write a brief introduction for today's AI news digest, which covers these stories:
+            {stories}
+            
+            In 2-4 sentences, highlight the most significant developments and any
+            common themes. Professional tone; no headings, lists or links.
+            """
+        )
+        return task_result.get('intro', '')
@@ -2,23 +2,30 @@
 HarvesterAgent for gathering AI-related news articles.
 """
 
-from typing import List
+from typing import List, Optional
 from crewai import Agent
+from crewai.llms.base_llm import BaseLLM
 from tools.news_scraper_tool import NewsScraperTool, NewsArticle
+from utils.config import AppConfig
+from utils.llm_cache import build_llm
 
 class HarvesterAgent:
     """Agent responsible for gathering AI-related news articles."""
     
     @staticmethod
-    def create() -> Agent:
-        """Create and return the HarvesterAgent."""
+    def create(config: Optional[AppConfig] = None, llm: Optional[BaseLLM] = None) -> Agent:
+        """
+        Create and return the HarvesterAgent.
+        Uses the configured, response-cached LLM unless llm is given.
+        """
         return Agent(
             role='News Harvester',
             goal='Gather the most relevant and recent AI news articles',
             backstory="""You are an expert news curator with a deep understanding 
             of artificial intelligence and technology. Your task is to gather the 
             most significant AI news stories of the day.""",
-            tools=[NewsScraperTool()],
+            tools=[NewsScraperTool(config)],
+            llm=llm or build_llm(config),
             verbose=True,
             allow_delegation=False
         )
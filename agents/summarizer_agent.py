@@ -2,12 +2,24 @@
 SummarizerAgent for creating concise summaries of news articles.
 """
 
-from typing import List, Dict
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any, List, Dict, Optional, Tuple
 from crewai import Agent
+from crewai.llms.base_llm import BaseLLM
 from tools.news_scraper_tool import NewsArticle
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from crewai.tools import BaseTool
+from pydantic import BaseModel, Field, ValidationError
+from utils.config import AppConfig, get_config
+from utils.llm_cache import build_llm
+from utils.metrics import get_metrics
+from utils.tokens import TokenBudget, chunk_paragraphs, count_tokens, truncate_to_tokens
+
+if TYPE_CHECKING:
+    from crew.article_store import ArticleStore
 
 @dataclass
 class ArticleSummary:
@@ -18,6 +30,23 @@ class ArticleSummary:
     published_date: datetime
     summary: str
     key_points: List[str]
+    related_urls: List[str] = field(default_factory=list)
+
+class SummaryOutput(BaseModel):
+    """Structured summary the summarizer's LLM returns for one article."""
+    summary: str = Field(description="A 1-2 paragraph summary of the article")
+    key_points: List[str] = Field(
+        default_factory=list,
+        description="The article's key takeaways"
+    )
+
+class BatchSummaryItem(SummaryOutput):
+    """One article's summary within a batched response."""
+    id: int = Field(description="The id the article was given in the prompt")
+
+class BatchSummaryOutput(BaseModel):
+    """Structured response for a batch of articles summarized in one call."""
+    summaries: List[BatchSummaryItem]
 
 class SummarizeTool(BaseTool):
     """Tool for summarizing articles."""
@@ -33,8 +62,11 @@ class SummarizerAgent:
     """Agent responsible for creating concise article summaries."""
     
     @staticmethod
-    def create() -> Agent:
-        """Create and return the SummarizerAgent."""
+    def create(config: Optional[AppConfig] = None, llm: Optional[BaseLLM] = None) -> Agent:
+        """
+        Create and return the SummarizerAgent.
+        Uses the configured, response-cached LLM unless llm is given.
+        """
         return Agent(
             role='Content Summarizer',
             goal='Create clear, accurate, and concise summaries of AI news articles',
@@ -42,45 +74,312 @@ class SummarizerAgent:
             distilling complex technical information into clear, readable summaries. 
             You understand AI technology deeply and can explain it to others effectively.""",
             tools=[SummarizeTool()],
+            llm=llm or build_llm(config),
             verbose=True,
             allow_delegation=False
         )
 
     @staticmethod
-    async def execute(agent: Agent, articles: List[NewsArticle]) -> List[ArticleSummary]:
+    async def _call(
+        agent: Agent,
+        prompt: str,
+        budget: Optional[TokenBudget],
+        model: Optional[str],
+        **kwargs: Any
+    ) -> Any:
+        """Run one prompt, charging its tokens to the run budget first."""
+        if budget is not None:
+            budget.reserve(count_tokens(prompt, model))
+        return await agent.execute(prompt, **kwargs)
+
+    @staticmethod
+    async def _summarize(
+        agent: Agent,
+        article: NewsArticle,
+        budget: Optional[TokenBudget] = None,
+        config: Optional[AppConfig] = None
+    ) -> ArticleSummary:
         """
-        Execute the summarization task.
-        Returns a list of article summaries.
+        Summarize a single article.
+        Content is cut to the per-article token budget. Articles that fit in
+        one prompt are summarized with one agent call; longer ones are split
+        into paragraph chunks that are summarized concurrently and then
+        combined by a final call.
         """
-        summaries = []
+        config = config or get_config()
+        settings = config.summarization
+        model = config.api.openai.model
+        content = truncate_to_tokens(
+            article.content or article.snippet, settings.max_tokens_per_article, model
+        )
         
-        for article in articles:
-            task_result = await agent.execute(
+        if count_tokens(content, model) <= settings.single_call_max_tokens:
+            task_result = await SummarizerAgent._call(
+                agent,
                 f"""Analyze and summarize the following AI news article:
-                Title: {article.title}
-                Content: {article.content or article.snippet}
-                
-                Create a comprehensive summary that:
-                1. Captures the main points and significance
-                2. Maintains technical accuracy
-                3. Is clear and engaging
-                4. Identifies key takeaways
-                5. Is 1-2 paragraphs long
-                
-                Format the summary in a structured way with clear sections.
-                """
+            Title: {article.title}
+            Content: {content}
+            
+            Create a comprehensive summary that:
+            1. Captures the main points and significance
+            2. Maintains technical accuracy
+            3. Is clear and engaging
+            4. Identifies key takeaways
+            5. Is 1-2 paragraphs long
+            
+            Format the summary in a structured way with clear sections.
+            """,
+                budget,
+                model
             )
+        else:
+            chunks = chunk_paragraphs(content, settings.chunk_tokens, model)
+            semaphore = asyncio.Semaphore(settings.max_concurrent_chunks)
+            
+            async def summarize_chunk(index: int, chunk: str) -> Dict[str, Any]:
+                async with semaphore:
+                    return await SummarizerAgent._call(
+                        agent,
+                        f"""Summarize part {index + 1} of {len(chunks)} of the following AI news article:
+            Title: {article.title}
+            Content: {chunk}
+            
+            Capture the main facts and claims of this part in one short paragraph
+            and list its key points. Maintain technical accuracy.
+            """,
+                        budget,
+                        model
+                    )
+            
+            partials = await asyncio.gather(
+                *(summarize_chunk(i, chunk) for i, chunk in enumerate(chunks))
+            )
+            combined = "\n\n".join(
+                f"Part {i + 1}: {partial.get('summary', '')}\n"
+                + "\n".join(f"- {point}" for point in partial.get('key_points', []))
+                for i, partial in enumerate(partials)
+            )
+            task_result = await SummarizerAgent._call(
+                agent,
+                f"""Combine the following partial summaries of one AI news article into a single summary:
+            Title: {article.title}
+            Partial summaries:
+            {combined}
+            
+            Create a comprehensive summary that:
+            1. Captures the main points and significance
+            2. Maintains technical accuracy
+            3. Is clear and engaging
+            4. Identifies key takeaways
+            5. Is 1-2 paragraphs long
+            """,
+                budget,
+                model
+            )
+        
+        # Parse the agent's response into an ArticleSummary
+        return ArticleSummary(
+            title=article.title,
+            url=article.url,
+            source=article.source,
+            published_date=article.published_date,
+            summary=task_result.get('summary', ''),
+            key_points=task_result.get('key_points', []),
+            related_urls=list(article.related_urls)
+        )
+
+    @staticmethod
+    def _batch_entry(position: int, article: NewsArticle) -> str:
+        return f"""[id {position}]
+            Title: {article.title}
+            Content: {article.content or article.snippet}
+            """
+
+    @staticmethod
+    def _plan_batches(
+        articles: List[NewsArticle],
+        indices: List[int],
+        config: AppConfig
+    ) -> Tuple[List[List[int]], List[int]]:
+        """
+        Split the articles at indices into batches and single calls.
+        Articles up to batch_article_max_tokens are packed in order into
+        batches of at most batch_max_articles and batch_max_tokens; longer
+        articles, and batches that would hold only one article, get their
+        own call.
+        """
+        settings = config.summarization
+        if not settings.batch_enabled:
+            return [], list(indices)
+        model = config.api.openai.model
+        
+        batches: List[List[int]] = []
+        singles: List[int] = []
+        current: List[int] = []
+        current_tokens = 0
+        for index in indices:
+            tokens = count_tokens(SummarizerAgent._batch_entry(len(current), articles[index]), model)
+            if tokens > settings.batch_article_max_tokens:
+                singles.append(index)
+                continue
+            if current and (
+                current_tokens + tokens > settings.batch_max_tokens
+                or len(current) >= settings.batch_max_articles
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        
+        singles += [batch[0] for batch in batches if len(batch) == 1]
+        return [batch for batch in batches if len(batch) > 1], singles
+
+    @staticmethod
+    async def _summarize_batch(
+        agent: Agent,
+        articles: List[NewsArticle],
+        budget: Optional[TokenBudget] = None,
+        config: Optional[AppConfig] = None
+    ) -> Dict[int, ArticleSummary]:
+        """
+        Summarize several short articles with one agent call.
+        Returns summaries by position in articles; positions whose item is
+        missing or malformed in the response are left out.
+        """
+        config = config or get_config()
+        entries = "\n".join(
+            SummarizerAgent._batch_entry(position, article)
+            for position, article in enumerate(articles)
+        )
+        task_result = await SummarizerAgent._call(
+            agent,
+            f"""Summarize each of the following AI news articles independently.
+            For every article, write a 1-2 paragraph summary that captures its main
+            points and significance with technical accuracy, and list its key takeaways.
+            Give exactly one entry per article id.
             
-            # Parse the agent's response into an ArticleSummary
-            summary = ArticleSummary(
+            Articles:
+            {entries}
+            """,
+            budget,
+            config.api.openai.model,
+            response_format=BatchSummaryOutput,
+            strict=False
+        )
+        
+        # Validated item by item, so one malformed entry costs only its own article
+        items = task_result.get('summaries') if isinstance(task_result, dict) else task_result
+        if not isinstance(items, list):
+            items = []
+        summaries: Dict[int, ArticleSummary] = {}
+        for item in items:
+            try:
+                item = BatchSummaryItem.model_validate(item)
+            except ValidationError:
+                continue
+            if item.id in summaries or not 0 <= item.id < len(articles) or not item.summary.strip():
+                continue
+            article = articles[item.id]
+            summaries[item.id] = ArticleSummary(
                 title=article.title,
                 url=article.url,
                 source=article.source,
                 published_date=article.published_date,
-                summary=task_result.get('summary', ''),
-                key_points=task_result.get('key_points', [])
+                summary=item.summary,
+                key_points=item.key_points,
+                related_urls=list(article.related_urls)
             )
-            
-            summaries.append(summary)
+        return summaries
+
+    @staticmethod
+    async def execute(
+        agent: Agent,
+        articles: List[NewsArticle],
+        max_concurrent: Optional[int] = None,
+        timeout: Optional[float] = None,
+        store: Optional['ArticleStore'] = None,
+        budget: Optional[TokenBudget] = None
+    ) -> List[ArticleSummary]:
+        """
+        Execute the summarization task.
+        Up to max_concurrent articles are summarized at once; summaries are
+        returned in article order and articles that fail or time out are
+        logged and left out. With a store, unchanged articles reuse their
+        stored summary and new summaries are saved to it. Short articles are
+        packed into batched requests (see _plan_batches). Prompt tokens are
+        charged to budget, by default a new one of summarization.max_tokens_per_run;
+        articles that no longer fit in it are left out.
+        """
+        logger = logging.getLogger(__name__)
+        config = get_config()
+        settings = config.concurrency.summarizer
+        if budget is None:
+            budget = TokenBudget(config.summarization.max_tokens_per_run)
+        if max_concurrent is None:
+            max_concurrent = settings.max_concurrent
+        if timeout is None:
+            timeout = settings.timeout_seconds
+        
+        semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        metrics = get_metrics()
+        summaries_by_index: Dict[int, ArticleSummary] = {}
+        to_summarize = []
+        for index, article in enumerate(articles):
+            stored = store.get_summary(article) if store is not None else None
+            if stored is not None:
+                summaries_by_index[index] = stored
+            else:
+                to_summarize.append(index)
+        
+        def keep(index: int, summary: ArticleSummary) -> None:
+            summaries_by_index[index] = summary
+            if store is not None:
+                store.put_summary(articles[index], summary)
+        
+        async def summarize_one(index: int) -> None:
+            try:
+                async with semaphore:
+                    with metrics.article(articles[index].url, 'summarize'):
+                        summary = await asyncio.wait_for(
+                            SummarizerAgent._summarize(agent, articles[index], budget, config),
+                            timeout=timeout
+                        )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error summarizing article {articles[index].url}: {e!r}")
+                return
+            keep(index, summary)
+        
+        async def summarize_batch(indices: List[int]) -> None:
+            try:
+                async with semaphore:
+                    start = time.perf_counter()
+                    parsed = await asyncio.wait_for(
+                        SummarizerAgent._summarize_batch(
+                            agent, [articles[i] for i in indices], budget, config
+                        ),
+                        timeout=timeout
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Batch of {len(indices)} articles failed, retrying individually: {e!r}")
+                parsed = {}
+            for position, summary in parsed.items():
+                metrics.record_article(articles[indices[position]].url, 'summarize', time.perf_counter() - start)
+                keep(indices[position], summary)
+            retry = [index for position, index in enumerate(indices) if position not in parsed]
+            if retry and parsed:
+                logger.info(f"Retrying {len(retry)} malformed batch items individually")
+            await asyncio.gather(*(summarize_one(index) for index in retry))
+        
+        batches, singles = SummarizerAgent._plan_batches(articles, to_summarize, config)
+        await asyncio.gather(
+            *(summarize_batch(batch) for batch in batches),
+            *(summarize_one(index) for index in singles)
+        )
         
-        return summaries 
\ No newline at end of file
+        return [summaries_by_index[i] for i in range(len(articles)) if i in summaries_by_index]
@@ -2,78 +2,187 @@
 VerifierAgent for fact-checking article claims.
 """
 
-from typing import List, Dict
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, List, Dict, Optional
 from crewai import Agent
+from crewai.llms.base_llm import BaseLLM
 from tools.search_tool import VerifyClaimTool, CheckVerificationTool
 from agents.summarizer_agent import ArticleSummary
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
+from pydantic import BaseModel, Field
+from utils.config import AppConfig, get_config
+from utils.llm_cache import build_llm
+from utils.metrics import get_metrics
+
+if TYPE_CHECKING:
+    from crew.article_store import ArticleStore
 
 @dataclass
 class VerifiedSummary(ArticleSummary):
     """Data class to store verified article summary information."""
-    verification_sources: List[Dict[str, str]]
-    verification_status: str
-    confidence_score: float
+    verification_sources: List[Dict[str, str]] = field(default_factory=list)
+    verification_status: str = 'unverified'
+    confidence_score: float = 0.0
+    # Date, title and url of an earlier digest's story on the same news, if any
+    previous_coverage: Optional[Dict[str, str]] = None
+    # Title, start date and article count of the storyline the story belongs to
+    storyline: Optional[Dict[str, Any]] = None
+
+class VerificationOutput(BaseModel):
+    """Structured verdict the verifier's LLM returns for one summary."""
+    status: str = Field(description="verified, partially verified or unverified")
+    confidence: float = Field(ge=0.0, le=1.0, description="Confidence in the summary's claims")
+    sources: List[Dict[str, str]] = Field(
+        default_factory=list,
+        description="Sources used for verification, each with a title and url"
+    )
+
+def build_verified(summary: ArticleSummary, task_result: Optional[Dict[str, Any]]) -> VerifiedSummary:
+    """Combine a summary with the verifier's result; no result means unverified."""
+    task_result = task_result or {}
+    return VerifiedSummary(
+        title=summary.title,
+        url=summary.url,
+        source=summary.source,
+        published_date=summary.published_date,
+        summary=summary.summary,
+        key_points=summary.key_points,
+        related_urls=summary.related_urls,
+        verification_sources=task_result.get('sources', []),
+        verification_status=task_result.get('status', 'unverified'),
+        confidence_score=float(task_result.get('confidence', 0.0))
+    )
+
+class VerificationCollector:
+    """Collects per-summary verification results and builds them in input order."""
+    
+    def __init__(self, summaries: List[ArticleSummary]):
+        self._summaries = summaries
+        self._results: List[Optional[Dict[str, Any]]] = [None] * len(summaries)
+        self._verified: Dict[int, VerifiedSummary] = {}
+    
+    def add(self, index: int, task_result: Dict[str, Any]) -> None:
+        """Record the agent's verification result for the summary at index."""
+        self._results[index] = task_result
+    
+    def add_verified(self, index: int, verified: VerifiedSummary) -> None:
+        """Record an already built result, such as one reused from a previous run."""
+        self._verified[index] = verified
+    
+    def add_failure(self, index: int, error: BaseException) -> None:
+        """Record a failed verification; the summary is kept as unverified."""
+        logging.getLogger(__name__).error(
+            f"Error verifying summary {self._summaries[index].url}: {error!r}"
+        )
+        self._results[index] = {}
+    
+    def results(self) -> List[VerifiedSummary]:
+        """Build VerifiedSummary objects in the order the summaries were given."""
+        verified_summaries = []
+        for index, (summary, task_result) in enumerate(zip(self._summaries, self._results)):
+            if index in self._verified:
+                verified_summaries.append(self._verified[index])
+                continue
+            verified_summaries.append(build_verified(summary, task_result))
+        return verified_summaries
 
 class VerifierAgent:
     """Agent responsible for verifying article claims."""
     
     @staticmethod
-    def create() -> Agent:
-        """Create and return the VerifierAgent."""
+    def create(config: Optional[AppConfig] = None, llm: Optional[BaseLLM] = None) -> Agent:
+        """
+        Create and return the VerifierAgent.
+        Uses the configured, response-cached LLM unless llm is given.
+        """
+        verify_tool = VerifyClaimTool(config=config)
         return Agent(
             role='Fact Checker',
             goal='Verify the accuracy of AI news article claims',
             backstory="""You are a meticulous fact-checker with expertise in AI 
             and technology. Your role is to verify claims made in news articles 
             by cross-referencing them with trusted sources.""",
-            tools=[VerifyClaimTool(), CheckVerificationTool()],
+            tools=[verify_tool, CheckVerificationTool(verify_tool=verify_tool)],
+            llm=llm or build_llm(config),
             verbose=True,
             allow_delegation=False
         )
 
+    @staticmethod
+    async def _verify(agent: Agent, summary: ArticleSummary) -> Dict[str, Any]:
+        """Verify a single summary with one agent call."""
+        return await agent.execute(
+            f"""Verify the following AI news article summary:
+            Title: {summary.title}
+            Summary: {summary.summary}
+            Key Points: {', '.join(summary.key_points)}
+            
+            For each main claim:
+            1. Cross-reference with trusted sources
+            2. Verify technical accuracy
+            3. Check for potential biases
+            4. Assess overall credibility
+            
+            Provide verification sources and confidence level.
+            """
+        )
+
     @staticmethod
     async def execute(
         agent: Agent, 
-        summaries: List[ArticleSummary]
+        summaries: List[ArticleSummary],
+        max_concurrent: Optional[int] = None,
+        timeout: Optional[float] = None,
+        store: Optional['ArticleStore'] = None
     ) -> List[VerifiedSummary]:
         """
         Execute the verification task.
-        Returns a list of verified article summaries.
+        Summaries are verified in parallel, up to max_concurrent LLM calls at
+        once; the Serper searches those calls trigger are limited separately
+        by VerifyClaimTool. Returns verified summaries in input order, with
+        failed or timed-out summaries marked unverified. With a store,
+        unchanged summaries reuse their stored verification and successful
+        new verifications are saved to it.
         """
-        verified_summaries = []
+        settings = get_config().concurrency.verifier
+        if max_concurrent is None:
+            max_concurrent = settings.max_concurrent_llm
+        if timeout is None:
+            timeout = settings.timeout_seconds
         
-        for summary in summaries:
-            task_result = await agent.execute(
-                f"""Verify the following AI news article summary:
-                Title: {summary.title}
-                Summary: {summary.summary}
-                Key Points: {', '.join(summary.key_points)}
-                
-                For each main claim:
-                1. Cross-reference with trusted sources
-                2. Verify technical accuracy
-                3. Check for potential biases
-                4. Assess overall credibility
-                
-                Provide verification sources and confidence level.
-                """
-            )
-            
-            # Parse the agent's response into a VerifiedSummary
-            verified = VerifiedSummary(
-                title=summary.title,
-                url=summary.url,
-                source=summary.source,
-                published_date=summary.published_date,
-                summary=summary.summary,
-                key_points=summary.key_points,
-                verification_sources=task_result.get('sources', []),
-                verification_status=task_result.get('status', 'unverified'),
-                confidence_score=float(task_result.get('confidence', 0.0))
-            )
-            
-            verified_summaries.append(verified)
+        semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        collector = VerificationCollector(summaries)
+        verified_now = []
+        
+        async def verify_bounded(index: int, summary: ArticleSummary) -> None:
+            if store is not None:
+                stored = store.get_verified(summary)
+                if stored is not None:
+                    collector.add_verified(index, stored)
+                    return
+            async with semaphore:
+                try:
+                    with get_metrics().article(summary.url, 'verify'):
+                        task_result = await asyncio.wait_for(
+                            VerifierAgent._verify(agent, summary),
+                            timeout=timeout
+                        )
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    collector.add_failure(index, e)
+                    return
+            collector.add(index, task_result)
+            verified_now.append(index)
+        
+        await asyncio.gather(
+            *(verify_bounded(i, summary) for i, summary in enumerate(summaries))
+        )
         
-        return verified_summaries 
\ No newline at end of file
+        results = collector.results()
+        if store is not None:
+            for index in verified_now:
+                store.put_verified(summaries[index], results[index])
+        return results
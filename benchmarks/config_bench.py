@@ -0,0 +1,51 @@
+"""
+Benchmark configuration construction and lookup cost.
+
+Compares re-parsing config.yaml per tool with the shared validated
+AppConfig, and list scans over trusted_domains with the precomputed set.
+
+Usage:
+    python -m benchmarks.config_bench [--iterations 200] [--lookups 200000]
+"""
+
+import argparse
+import time
+
+import yaml
+
+from utils.config import get_config, load_config
+
+def per_call_us(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--lookups", type=int, default=200000)
+    args = parser.parse_args()
+
+    def parse_yaml():
+        with open("config.yaml", 'r') as f:
+            return yaml.safe_load(f)
+
+    # Four tools used to parse the file separately on every crew construction
+    print(f"{'yaml.safe_load x4 (old per-tool)':<38} "
+          f"{per_call_us(lambda: [parse_yaml() for _ in range(4)], args.iterations):10.1f} us")
+    print(f"{'load_config (parse + validate once)':<38} "
+          f"{per_call_us(load_config, args.iterations):10.1f} us")
+    print(f"{'get_config (shared instance)':<38} "
+          f"{per_call_us(get_config, args.iterations):10.1f} us")
+
+    raw = parse_yaml()
+    config = get_config()
+    domain = "neurosciencenews.com"
+    print(f"{'dict path + list membership':<38} "
+          f"{per_call_us(lambda: domain in raw['verification']['trusted_domains'], args.lookups) * 1000:10.1f} ns")
+    print(f"{'AppConfig precomputed set':<38} "
+          f"{per_call_us(lambda: domain in config.verification.trusted_domain_set, args.lookups) * 1000:10.1f} ns")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Regression check for near-duplicate detection on labelled headline pairs.
+
+Each pair is two articles as Serper returns them (title and snippet, no
+fetched content): either the same story from two outlets, or two different
+stories that share a topic and its vocabulary (rival model launches, rival
+funding rounds, two chip stocks, a launch and its follow-up). Deduplication
+runs before content is fetched, so these are exactly the features it sees.
+Prints the estimated and exact token overlap of every pair against the
+configured threshold and exits non-zero if any pair is not handled as
+expected: a different-story pair merged (a story lost from the digest) or
+a same-story pair expected to merge kept apart.
+
+Usage:
+    python -m benchmarks.dedup_pairs [--threshold 0.5]
+"""
+
+import argparse
+import sys
+from datetime import datetime
+from typing import List, Tuple
+
+from tools.news_scraper_tool import NewsArticle
+from utils.config import get_config
+from utils.dedup import MinHasher, StoryDeduplicator
+
+# (merged?, (title, snippet), (title, snippet)); True pairs are the same story
+PAIRS: List[Tuple[bool, Tuple[str, str], Tuple[str, str]]] = [
+    (True,
+     ("OpenAI launches GPT-5, its most capable model yet",
+      "OpenAI on Thursday released GPT-5, which it says is its most capable model for coding and reasoning."),
+     ("OpenAI releases GPT-5, calling it its most capable model yet",
+      "OpenAI released GPT-5 on Thursday, saying the model is its most capable yet at coding and reasoning.")),
+    (True,
+     ("Anthropic raises $13 billion in funding round led by Iconiq",
+      "Anthropic has raised $13 billion in a Series F round led by Iconiq, valuing the AI startup at $183 billion."),
+     ("Anthropic closes $13 billion Series F at $183 billion valuation",
+      "AI startup Anthropic closed a $13 billion Series F funding round led by Iconiq at a $183 billion valuation.")),
+    # The same story, reworded past the threshold: kept apart, which costs a
+    # summary but loses nothing
+    (False,
+     ("Nvidia stock falls after export restrictions on H20 chips to China",
+      "Nvidia shares fell after the US government restricted exports of its H20 AI chips to China."),
+     ("Nvidia shares drop as US restricts H20 chip exports to China",
+      "Shares of Nvidia dropped after the US restricted exports of the H20 AI chip to China.")),
+    (True,
+     ("Meta hires Apple's top AI models executive for superintelligence lab",
+      "Meta has hired Ruoming Pang, who led Apple's foundation models team, for its superintelligence lab."),
+     ("Apple's head of AI models leaves for Meta superintelligence lab",
+      "Ruoming Pang, head of Apple's foundation models team, is leaving for Meta's superintelligence lab.")),
+    (False,
+     ("OpenAI launches GPT-5, its most capable model yet",
+      "OpenAI on Thursday released GPT-5, which it says is its most capable model for coding and reasoning."),
+     ("Google launches Gemini 3, its most capable model yet",
+      "Google on Tuesday released Gemini 3, which it says is its most capable model for coding and reasoning.")),
+    (False,
+     ("Anthropic raises $13 billion in funding round led by Iconiq",
+      "Anthropic has raised $13 billion in a Series F round led by Iconiq, valuing the AI startup at $183 billion."),
+     ("Mistral raises $2 billion in funding round led by ASML",
+      "Mistral has raised $2 billion in a Series C round led by ASML, valuing the AI startup at $14 billion.")),
+    (False,
+     ("Nvidia stock falls after export restrictions on AI chips to China",
+      "Nvidia shares fell after the US government tightened restrictions on AI chip exports to China."),
+     ("AMD stock falls after export restrictions on AI chips to China",
+      "AMD shares fell after the US government tightened restrictions on AI chip exports to China.")),
+    (False,
+     ("Microsoft releases new open-weight reasoning model",
+      "Microsoft released an open-weight reasoning model that it says rivals larger models on math benchmarks."),
+     ("Alibaba releases new open-weight reasoning model",
+      "Alibaba released an open-weight reasoning model that it says rivals larger models on math benchmarks.")),
+    (False,
+     ("OpenAI launches GPT-5, its most capable model yet",
+      "OpenAI on Thursday released GPT-5, which it says is its most capable model for coding and reasoning."),
+     ("GPT-5 rollout hits capacity limits, OpenAI says",
+      "OpenAI said demand for GPT-5 has exceeded its capacity, slowing responses for some users.")),
+]
+
+def _article(title: str, snippet: str, n: int) -> NewsArticle:
+    return NewsArticle(
+        title=title,
+        url=f"https://example{n}.com/story",
+        source=f"example{n}.com",
+        published_date=datetime(2025, 8, 7),
+        snippet=snippet
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threshold", type=float, default=None, help="Default: dedup.similarity_threshold")
+    args = parser.parse_args()
+    settings = get_config().dedup
+    threshold = args.threshold if args.threshold is not None else settings.similarity_threshold
+    dedup = StoryDeduplicator(
+        similarity_threshold=threshold,
+        num_permutations=settings.num_permutations,
+        bands=settings.bands
+    )
+
+    failures = 0
+    print(f"threshold {threshold:.2f}")
+    print(f"{'expect':>6} {'est':>5} {'exact':>6} {'merged':>7}  pair")
+    for expected, left, right in PAIRS:
+        articles = [_article(*left, 1), _article(*right, 2)]
+        features = [dedup.features(a) for a in articles]
+        exact = len(features[0] & features[1]) / len(features[0] | features[1])
+        estimate = MinHasher.similarity(*(dedup._hasher.signature(f) for f in features))
+        merged = len(dedup.clusters(articles)) == 1
+        ok = merged == expected
+        failures += not ok
+        print(f"{str(expected):>6} {estimate:>5.2f} {exact:>6.2f} {str(merged):>7}  "
+              f"{left[0][:40]} / {right[0][:40]}{'' if ok else '  <-- wrong'}")
+
+    if failures:
+        print(f"{failures} of {len(PAIRS)} pairs deduplicated wrongly")
+        sys.exit(1)
+    print(f"All {len(PAIRS)} pairs deduplicated correctly")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Microbenchmark for trusted-domain classification.
+
+Classifies a batch of synthetic URLs with the old linear endswith scan and
+with DomainPolicy, for the configured trusted list and for lists 10x and
+100x larger. The trie's per-URL cost should stay flat as the list grows.
+
+Usage:
+    python -m benchmarks.domain_policy_bench [--urls 100000]
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from utils.config import get_config
+from utils.domain_policy import DomainPolicy
+
+def synthetic_urls(trusted: List[str], count: int, seed: int = 7) -> List[str]:
+    """Mix of trusted, subdomain, look-alike and unrelated URLs."""
+    rng = random.Random(seed)
+    urls = []
+    for i in range(count):
+        domain = rng.choice(trusted)
+        kind = i % 4
+        if kind == 0:
+            host = f"www.{domain}"
+        elif kind == 1:
+            host = f"news.{domain}"
+        elif kind == 2:
+            host = f"not{domain}"
+        else:
+            host = f"site{rng.randrange(100000)}.example.net"
+        urls.append(f"https://{host}/2025/06/02/story-{i}?utm_source=feed")
+    return urls
+
+def linear_scan(trusted: List[str]) -> Callable[[str], bool]:
+    """The previous NewsScraperTool check: strip www. then endswith over the list."""
+    def is_trusted(url: str) -> bool:
+        domain = DomainPolicy.normalize_host(url)
+        return any(domain.endswith(t) for t in trusted)
+    return is_trusted
+
+def time_classifier(classify: Callable[[str], bool], urls: List[str]) -> float:
+    start = time.perf_counter()
+    for url in urls:
+        classify(url)
+    return (time.perf_counter() - start) / len(urls) * 1e9
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--urls", type=int, default=100000)
+    args = parser.parse_args()
+
+    base = list(get_config().verification.trusted_domains)
+    for factor in (1, 10, 100):
+        trusted = base + [f"extra{i}-{d}" for i in range(factor - 1) for d in base]
+        urls = synthetic_urls(base, args.urls)
+        policy = DomainPolicy(allowed=trusted)
+        scan_ns = time_classifier(linear_scan(trusted), urls)
+        trie_ns = time_classifier(policy.is_allowed, urls)
+        print(
+            f"{len(trusted):5d} trusted domains, {len(urls)} URLs: "
+            f"linear scan {scan_ns:8.0f} ns/url   trie {trie_ns:6.0f} ns/url"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+Local stand-ins for Serper, article pages and the LLM, for offline benchmarks.
+
+FakeSerperServer answers Serper's news and search endpoints with
+deterministic synthetic results and, when used as the HTTP proxy, serves
+the article pages those results link to. FakeLLM is a CrewAI LLM that
+answers every prompt the agents send with well-formed output after a
+configurable delay, and reports token usage like a real provider.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+from crewai.llms.base_llm import BaseLLM
+from pydantic import PrivateAttr
+
+from utils.tokens import count_tokens
+
+_WORDS = """
+    model agent benchmark chip startup lab robot dataset policy safety reasoning
+    vision speech open weights cluster training inference regulation funding
+    partnership release research paper compute memory context alignment
+    multimodal coding assistant search enterprise cloud device privacy
+""".split()
+
+def _digest(*parts: Any) -> int:
+    raw = '|'.join(str(part) for part in parts).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(raw, digest_size=8).digest(), 'big')
+
+# Synthetic vocabulary large enough that unrelated stories share few words
+_SYLLABLES = [c + v for c in 'bdfgklmnprstvz' for v in 'aeiou']
+_VOCABULARY = _WORDS + [
+    a + b + c for a in _SYLLABLES[::3] for b in _SYLLABLES[1::4] for c in ('n', 'r', 'x', 'l')
+]
+
+def _headline(seed: int) -> str:
+    rng = random.Random(seed)
+    return ' '.join(rng.choice(_VOCABULARY) for _ in range(8)).capitalize()
+
+class _FakeSerperHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _fail(self) -> bool:
+        server: FakeSerperServer = self.server.owner
+        if server.error_rate and server.rng_uniform() < server.error_rate:
+            self._send(500, b'{"message": "injected error"}', "application/json")
+            return True
+        return False
+
+    def do_POST(self):
+        server: FakeSerperServer = self.server.owner
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b'{}')
+        time.sleep(server.latency)
+        if server.over_quota():
+            server.count('throttled')
+            self._send(429, b'{"message": "rate limit exceeded"}', "application/json", {"Retry-After": "1"})
+            return
+        if self._fail():
+            return
+        endpoint = urlsplit(self.path).path.rstrip('/').rsplit('/', 1)[-1]
+        if endpoint == 'news':
+            data = {"news": server.news_results(payload)}
+        else:
+            data = {"organic": server.organic_results(payload)}
+        server.count(endpoint)
+        self._send(200, json.dumps(data).encode('utf-8'), "application/json")
+
+    def do_GET(self):
+        # Proxied article requests carry the absolute URL as the path
+        server: FakeSerperServer = self.server.owner
+        time.sleep(server.page_latency)
+        if self._fail():
+            return
+        server.count('page')
+        self._send(200, server.article_page(self.path).encode('utf-8'), "text/html; charset=utf-8")
+
+class FakeSerperServer:
+    """
+    Threaded local server standing in for Serper and the news sites.
+
+    News queries restricted with `site:host` return articles on that host,
+    other queries spread over hosts. Every result links to a plain-HTTP URL
+    whose page is served by this same server when it is set as the HTTP
+    proxy. duplicate_rate of results re-report an earlier story under a
+    near-identical headline, so deduplication has work to do. With a
+    quota_per_second, API calls beyond it (averaged over a second) are
+    refused with 429 and Retry-After, like a provider's rate limit.
+    """
+
+    def __init__(
+        self,
+        hosts: Sequence[str],
+        latency: float = 0.0,
+        page_latency: float = 0.0,
+        error_rate: float = 0.0,
+        duplicate_rate: float = 0.1,
+        paragraphs: int = 6,
+        seed: int = 7,
+        quota_per_second: float = 0.0
+    ):
+        self.hosts = list(hosts)
+        self.latency = latency
+        self.page_latency = page_latency
+        self.error_rate = error_rate
+        self.duplicate_rate = duplicate_rate
+        self.paragraphs = paragraphs
+        self.quota_per_second = quota_per_second
+        self._quota = quota_per_second
+        self._quota_updated = time.monotonic()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests: Dict[str, int] = {}
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeSerperHandler)
+        self._server.daemon_threads = True
+        self._server.owner = self
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> 'FakeSerperServer':
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def rng_uniform(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+    def over_quota(self) -> bool:
+        """Take one call from the quota's token bucket; True if it is empty."""
+        if not self.quota_per_second:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            rate = self.quota_per_second
+            self._quota = min(rate, self._quota + (now - self._quota_updated) * rate)
+            self._quota_updated = now
+            if self._quota < 1:
+                return True
+            self._quota -= 1
+            return False
+
+    def count(self, kind: str) -> None:
+        with self._lock:
+            self.requests[kind] = self.requests.get(kind, 0) + 1
+
+    def news_results(self, payload: Dict[str, Any]) -> List[Dict[str, str]]:
+        query = payload.get('q', '')
+        num = int(payload.get('num', 10))
+        page = int(payload.get('page', 1))
+        site = re.search(r"site:(\S+)", query)
+        results = []
+        for i in range((page - 1) * num, page * num):
+            seed = _digest(query, i)
+            host = site.group(1) if site else self.hosts[seed % len(self.hosts)]
+            story = seed
+            if i and (seed % 1000) / 1000 < self.duplicate_rate:
+                story = _digest(query, i - 1)
+            title = _headline(story)
+            if story != seed:
+                title = f"{title} update"
+            results.append({
+                "title": title,
+                "link": f"http://{host}/news/{seed:x}",
+                "snippet": f"{title}. {_headline(story + 1)}.",
+                "date": f"{seed % 20 + 1} hours ago",
+                "source": host,
+            })
+        return results
+
+    def organic_results(self, payload: Dict[str, Any]) -> List[Dict[str, str]]:
+        query = payload.get('q', '')
+        return [
+            {
+                "title": _headline(_digest(query, 'organic', i)),
+                "link": f"http://{self.hosts[_digest(query, i) % len(self.hosts)]}/ref/{i}",
+                "snippet": query[:160],
+                "date": "2026-01-01",
+            }
+            for i in range(int(payload.get('num', 10)))
+        ]
+
+    def article_page(self, url: str) -> str:
+        seed = _digest(url)
+        paragraphs = ''.join(
+            f"<p>{_headline(seed + n)} {_headline(seed + n + 1000)}.</p>"
+            for n in range(self.paragraphs)
+        )
+        return (
+            f"<html><head><title>{_headline(seed)}</title></head><body>"
+            f"<nav>Home News</nav><article><h1>{_headline(seed)}</h1>{paragraphs}</article>"
+            f"<footer>Copyright</footer></body></html>"
+        )
+
+class FakeLLM(BaseLLM):
+    """
+    CrewAI LLM that answers locally after `latency` seconds.
+
+    Agents with tools are driven through one tool call (the news scraper
+    or claim verification) before their final answer, so the tools run as
+    they would with a real model. Summaries, batched summaries and
+    verification verdicts come back as JSON matching the schemas the
+    agents expect. Prompt tokens are counted from the messages and each
+    answer reports completion_tokens.
+    """
+
+    latency: float = 0.0
+    completion_tokens: int = 150
+    _calls: int = PrivateAttr(default=0)
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def _text(self, messages: Any) -> str:
+        if isinstance(messages, str):
+            return messages
+        return '\n'.join(str(m.get('content', '')) for m in messages)
+
+    def _answer(self, messages: Any, response_model: Optional[type]) -> Any:
+        text = self._text(messages)
+        task = text.rsplit('Current Task:', 1)[-1]
+        used_tool = not isinstance(messages, str) and any(m.get('role') == 'assistant' for m in messages)
+        filler = ' '.join(_WORDS[i % len(_WORDS)] for i in range(max(1, self.completion_tokens - 20)))
+
+        # CrewAI may list tools under a snake_case form of their names
+        tools = {name.replace('_', '').lower(): name for name in re.findall(r"Tool Name: (\S+)", text)}
+        if not used_tool and 'fetchnewsarticles' in tools and response_model is None:
+            return (f'Thought: I need the news\nAction: {tools["fetchnewsarticles"]}\n'
+                    f'Action Input: {{"query": "AI"}}')
+        if not used_tool and 'verifyclaim' in tools and response_model is None:
+            title = re.search(r"Title: (.*)", task)
+            claim = json.dumps({"claim": title.group(1).strip() if title else "AI news"})
+            return f'Thought: I should check the claim\nAction: {tools["verifyclaim"]}\nAction Input: {claim}'
+
+        ids = [int(i) for i in re.findall(r"\[id (\d+)\]", task)]
+        if ids:
+            data = {"summaries": [
+                {"id": i, "summary": filler, "key_points": ["point one", "point two"]} for i in ids
+            ]}
+        elif 'Verify the following' in task:
+            data = {"status": "verified", "confidence": 0.9,
+                    "sources": [{"title": "Reference", "url": "http://example.com/ref"}]}
+        elif 'Write a brief introduction' in task:
+            data = {"intro": filler}
+        elif 'summar' in task.lower():
+            data = {"summary": filler, "key_points": ["point one", "point two"]}
+        else:
+            data = None
+
+        if response_model is not None and data is not None:
+            return response_model.model_validate(data)
+        answer = json.dumps(data) if data is not None else filler
+        return f"Thought: I now know the final answer\nFinal Answer: {answer}"
+
+    def _track(self, messages: Any) -> None:
+        prompt_tokens = count_tokens(self._text(messages))
+        self._calls += 1
+        self._track_token_usage_internal({
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+            'total_tokens': prompt_tokens + self.completion_tokens,
+        })
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        time.sleep(self.latency)
+        self._track(messages)
+        return self._answer(messages, response_model)
+
+    async def acall(self, messages, tools=None, callbacks=None, available_functions=None,
+                    from_task=None, from_agent=None, response_model=None):
+        await asyncio.sleep(self.latency)
+        self._track(messages)
+        return self._answer(messages, response_model)
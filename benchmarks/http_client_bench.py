@@ -0,0 +1,102 @@
+"""
+Benchmark the shared pooled HTTP client against one-off requests.post calls.
+
+Runs a local stand-in for the Serper API and measures per-request latency
+for sequential and concurrent queries.
+
+Usage:
+    python -m benchmarks.http_client_bench [--requests 500] [--workers 16]
+"""
+
+import argparse
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List
+
+import requests
+
+from utils.http_client import HttpClient
+
+class StandInSerperHandler(BaseHTTPRequestHandler):
+    """Minimal keep-alive JSON endpoint that answers like Serper's news API."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    body = json.dumps({"news": [{"title": "t", "link": "https://example.com/a"}]}).encode()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInSerperHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def timed_calls(call: Callable[[], None], count: int, workers: int) -> List[float]:
+    """Run call count times on workers threads and return per-call latencies in ms."""
+    def one(_):
+        start = time.perf_counter()
+        call()
+        return (time.perf_counter() - start) * 1000
+
+    if workers == 1:
+        return [one(i) for i in range(count)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(one, range(count)))
+
+def report(label: str, latencies: List[float], elapsed: float) -> None:
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"{label:<34} mean {statistics.mean(latencies):7.3f} ms  "
+        f"p50 {statistics.median(latencies):7.3f} ms  p99 {p99:7.3f} ms  "
+        f"total {elapsed:6.2f} s"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--transport", default="requests", choices=["requests", "httpx"])
+    args = parser.parse_args()
+
+    server = start_server()
+    url = f"http://127.0.0.1:{server.server_address[1]}/news"
+    payload = {"q": "artificial intelligence news", "type": "news", "num": 10}
+    client = HttpClient(pool_maxsize=args.workers, transport=args.transport)
+
+    def unpooled():
+        requests.post(url, json=payload).raise_for_status()
+
+    def pooled():
+        client.post(url, json=payload).raise_for_status()
+
+    for label, call, workers in (
+        ("requests.post, sequential", unpooled, 1),
+        ("HttpClient.post, sequential", pooled, 1),
+        (f"requests.post, {args.workers} threads", unpooled, args.workers),
+        (f"HttpClient.post, {args.workers} threads", pooled, args.workers),
+    ):
+        start = time.perf_counter()
+        latencies = timed_calls(call, args.requests, workers)
+        report(label, latencies, time.perf_counter() - start)
+
+    client.close()
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
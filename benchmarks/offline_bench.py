@@ -0,0 +1,208 @@
+"""
+Offline end-to-end benchmark of the digest pipeline at several article counts.
+
+Drives AIDailyCrew and VerifyClaimTool against a local Serper stand-in
+(benchmarks/fakes.py) that also serves the article pages through an HTTP
+proxy, with a local LLM stand-in answering every agent call after a fixed
+delay. Nothing leaves the machine and no API keys are needed, so the
+numbers track the pipeline's own overhead: harvesting, deduplication,
+content extraction, prompt building, batching, concurrency and output.
+Every response cache and the article store are disabled and each repeat
+runs in fresh temporary directories.
+
+Reports, per article count: end-to-end p50/p99 and throughput, p50/p99
+per stage, p50/p99 per-article summarize and verify time, LLM calls and
+tokens, and peak traced Python memory.
+
+Usage:
+    python -m benchmarks.offline_bench [--sizes 5 50 500] [--repeat 3]
+        [--llm-latency 0.05] [--serper-latency 0.02] [--page-latency 0.01]
+        [--error-rate 0.0] [--modes pipeline streaming crew] [--no-tracemalloc]
+"""
+
+import argparse
+import contextlib
+import logging
+import math
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+os.environ.setdefault("SERPER_API_KEY", "offline-benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+
+from benchmarks.fakes import FakeLLM, FakeSerperServer
+from crew.ai_daily_crew import MODES, AIDailyCrew
+from tools.search_tool import VerifyClaimTool
+from utils.config import AppConfig, load_config, set_config
+from utils.domain_policy import DomainPolicy
+from utils.metrics import _percentile
+
+def bench_config(base: AppConfig, server_url: str, size: int, workdir: str) -> AppConfig:
+    """base pointed at the stand-in server, sized for `size` articles, with no reuse."""
+    per_page = min(100, max(10, size))
+    queries = len(base.news_sources) + max(1, len(base.harvest.topics))
+    target = math.ceil(size * base.harvest.candidate_multiplier)
+    return base.model_copy(update={
+        'article_limits': base.article_limits.model_copy(update={
+            'max_articles_per_day': size,
+            'max_articles_per_source': size,
+        }),
+        'harvest': base.harvest.model_copy(update={
+            'results_per_page': per_page,
+            'max_pages': max(1, math.ceil(target / (queries * per_page)) + 1),
+        }),
+        'api': base.api.model_copy(update={
+            'serper': base.api.serper.model_copy(update={
+                'endpoint': f"{server_url}/news",
+                'search_endpoint': f"{server_url}/search",
+            }),
+        }),
+        # Retries stay on; pacing would measure the configured quota, not the pipeline
+        'rate_limits': base.rate_limits.model_copy(update={
+            'serper': base.rate_limits.serper.model_copy(update={'requests_per_second': None}),
+        }),
+        'cache': base.cache.model_copy(update={
+            'serper': base.cache.serper.model_copy(update={'enabled': False}),
+            'llm': base.cache.llm.model_copy(update={'enabled': False}),
+        }),
+        'content_fetch': base.content_fetch.model_copy(update={
+            'per_host_delay_seconds': 0.0,
+            'revalidate_after_seconds': 0.0,
+            'cache_path': os.path.join(workdir, 'content.sqlite3'),
+        }),
+        'article_store': base.article_store.model_copy(update={'enabled': False}),
+        'digest_index': base.digest_index.model_copy(update={'path': os.path.join(workdir, 'digest_index.sqlite3')}),
+        'storylines': base.storylines.model_copy(update={'path': os.path.join(workdir, 'storylines.sqlite3')}),
+        'checkpoints': base.checkpoints.model_copy(update={'dir': os.path.join(workdir, 'checkpoints')}),
+        'metrics': base.metrics.model_copy(update={
+            'report_dir': os.path.join(workdir, 'metrics'),
+            'prometheus_textfile': None,
+        }),
+        'output': base.output.model_copy(update={'output_dir': os.path.join(workdir, 'digests')}),
+    })
+
+def run_once(config: AppConfig, mode: str, run_id: str, llm_latency: float, trace: bool) -> Dict:
+    """One digest run; returns its timings, counts and peak memory."""
+    set_config(config)
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    crew = AIDailyCrew(config, llm_factory=lambda: FakeLLM(model='offline-bench', latency=llm_latency))
+    # The agents are verbose; keep their console output out of the table
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        if mode == 'pipeline':
+            crew.run_pipeline(run_id)
+        elif mode == 'streaming':
+            crew.run_streaming(run_id)
+        else:
+            crew.run(run_id)
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    report = crew.metrics.report()
+    per_article: Dict[str, List[float]] = {}
+    for stages in report['articles']['by_url'].values():
+        for stage, seconds in stages.items():
+            per_article.setdefault(stage, []).append(seconds)
+    return {
+        'seconds': elapsed,
+        'stages': report['stages'],
+        'per_article': per_article,
+        'articles': report['counts'].get('kept', 0),
+        'llm_requests': crew.last_usage.successful_requests,
+        'tokens': crew.last_usage.total_tokens,
+        'peak_bytes': peak,
+    }
+
+def bench_verify_tool(config: AppConfig, claims: int, workers: int) -> List[float]:
+    """Latency of VerifyClaimTool calls issued from `workers` threads."""
+    set_config(config)
+    tool = VerifyClaimTool(config)
+
+    def verify(i: int) -> float:
+        start = time.perf_counter()
+        tool._run(f"Model release {i} improves reasoning benchmark results")
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(verify, range(claims)))
+
+def _p(values: List[float], fraction: float) -> float:
+    return _percentile(values, fraction) if values else float('nan')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs='+', default=[5, 50, 500])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--modes", nargs='+', choices=MODES, default=['pipeline'])
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds per fake LLM call")
+    parser.add_argument("--serper-latency", type=float, default=0.02, help="Seconds per fake Serper call")
+    parser.add_argument("--page-latency", type=float, default=0.01, help="Seconds per fake article page")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of fake HTTP calls failing with 500")
+    parser.add_argument("--no-tracemalloc", action='store_true', help="Skip peak memory tracing (it slows runs down)")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    base = load_config()
+    hosts = [DomainPolicy.normalize_host(source.url) for source in base.news_sources]
+    hosts += [d for d in base.verification.trusted_domains if d not in hosts]
+    server = FakeSerperServer(
+        hosts,
+        latency=args.serper_latency,
+        page_latency=args.page_latency,
+        error_rate=args.error_rate
+    ).start()
+    # Article links are plain-HTTP URLs on real hostnames; route them to the stand-in
+    os.environ["HTTP_PROXY"] = os.environ["http_proxy"] = server.url
+    os.environ["NO_PROXY"] = os.environ["no_proxy"] = "127.0.0.1,localhost"
+
+    print(f"{'mode':<9} {'articles':>8} {'e2e p50':>8} {'e2e p99':>8} {'art/s':>7} "
+          f"{'harvest':>8} {'summ':>8} {'verify':>8} {'edit':>8} "
+          f"{'a.summ p50/p99':>15} {'a.ver p50/p99':>15} {'llm':>6} {'tokens':>8} {'peak MB':>8}")
+    try:
+        for mode in args.modes:
+            for size in args.sizes:
+                runs = []
+                for repeat in range(args.repeat):
+                    with tempfile.TemporaryDirectory() as workdir:
+                        config = bench_config(base, server.url, size, workdir)
+                        runs.append(run_once(
+                            config, mode, f"bench-{mode}-{size}-{repeat}",
+                            args.llm_latency, not args.no_tracemalloc
+                        ))
+
+                seconds = [r['seconds'] for r in runs]
+                stage = lambda name: statistics.median(r['stages'].get(name, 0.0) for r in runs)
+                article_times = lambda name: [t for r in runs for t in r['per_article'].get(name, [])]
+                summ, ver = article_times('summarize'), article_times('verify')
+                articles = statistics.median(r['articles'] for r in runs)
+                print(
+                    f"{mode:<9} {articles:>8.0f} {_p(seconds, 0.5):>8.2f} {_p(seconds, 0.99):>8.2f} "
+                    f"{articles / statistics.median(seconds):>7.1f} "
+                    f"{stage('harvest'):>8.2f} {stage('summarize'):>8.2f} {stage('verify'):>8.2f} {stage('edit'):>8.2f} "
+                    f"{_p(summ, 0.5):>7.3f}/{_p(summ, 0.99):<7.3f} {_p(ver, 0.5):>7.3f}/{_p(ver, 0.99):<7.3f} "
+                    f"{statistics.median(r['llm_requests'] for r in runs):>6.0f} "
+                    f"{statistics.median(r['tokens'] for r in runs):>8.0f} "
+                    f"{max(r['peak_bytes'] for r in runs) / 1e6:>8.1f}"
+                )
+
+        with tempfile.TemporaryDirectory() as workdir:
+            config = bench_config(base, server.url, 50, workdir)
+            workers = config.concurrency.verifier.max_concurrent_serper
+            latencies = bench_verify_tool(config, claims=workers * 10, workers=workers)
+            print(f"\nVerifyClaimTool x{len(latencies)} on {workers} threads: "
+                  f"p50 {_p(latencies, 0.5) * 1000:.1f} ms, p99 {_p(latencies, 0.99) * 1000:.1f} ms")
+        print(f"Stand-in requests served: {dict(sorted(server.requests.items()))}")
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
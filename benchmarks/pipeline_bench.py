@@ -0,0 +1,67 @@
+"""
+Compare end-to-end latency and LLM token use of the crew and pipeline modes.
+
+Runs a full digest generation in each mode against the live APIs (needs
+OPENAI_API_KEY and SERPER_API_KEY) with the article store and Serper
+response cache disabled, so neither mode benefits from the other's work.
+Checkpoints go to a temporary directory.
+
+Usage:
+    python -m benchmarks.pipeline_bench [--runs 1] [--modes crew pipeline]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+
+from dotenv import load_dotenv
+
+from crew.ai_daily_crew import MODES, AIDailyCrew
+from utils.config import load_config, set_config
+
+def isolated_config(checkpoint_dir: str):
+    """The configured settings with every cross-run reuse switched off."""
+    config = load_config()
+    return config.model_copy(update={
+        'article_store': config.article_store.model_copy(update={'enabled': False}),
+        'cache': config.cache.model_copy(update={
+            'serper': config.cache.serper.model_copy(update={'enabled': False})
+        }),
+        'checkpoints': config.checkpoints.model_copy(update={'dir': checkpoint_dir}),
+    })
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--modes", nargs='+', choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+    load_dotenv()
+
+    with tempfile.TemporaryDirectory() as checkpoint_dir:
+        config = isolated_config(checkpoint_dir)
+        set_config(config)
+
+        print(f"{'mode':<10} {'run':>4} {'seconds':>9} {'prompt':>9} {'completion':>11} {'total':>9} {'requests':>9}")
+        totals = {}
+        for mode in args.modes:
+            for run in range(args.runs):
+                crew = AIDailyCrew(config)
+                start = time.perf_counter()
+                if mode == 'pipeline':
+                    crew.run_pipeline()
+                else:
+                    crew.run()
+                elapsed = time.perf_counter() - start
+                usage = crew.last_usage
+                totals.setdefault(mode, []).append((elapsed, usage.total_tokens))
+                print(f"{mode:<10} {run + 1:>4} {elapsed:>9.1f} {usage.prompt_tokens:>9} "
+                      f"{usage.completion_tokens:>11} {usage.total_tokens:>9} {usage.successful_requests:>9}")
+
+        print()
+        for mode, samples in totals.items():
+            print(f"{mode:<10} median {statistics.median(s for s, _ in samples):8.1f} s  "
+                  f"{statistics.median(t for _, t in samples):10.0f} tokens")
+
+if __name__ == "__main__":
+    main()
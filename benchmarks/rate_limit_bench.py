@@ -0,0 +1,109 @@
+"""
+Benchmark for Serper calls under a provider quota.
+
+Sends verification-style Serper queries from many threads to the local
+stand-in (benchmarks/fakes.py) with a quota that answers calls beyond it
+with 429 and Retry-After, like Serper's rate limit. Runs each scenario
+with the response cache off:
+
+    none     rate_limits.serper disabled: every 429 fails the call
+    retry    retries with backoff and Retry-After, adaptive concurrency,
+             no client-side pacing
+    paced    as retry, plus a token bucket at the quota
+
+Reports, per scenario: calls that succeeded and failed, 429s served,
+wall time, successful calls per second and p50/p99 call latency.
+
+Usage:
+    python -m benchmarks.rate_limit_bench [--calls 200] [--workers 16]
+        [--quota 20] [--latency 0.02]
+"""
+
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from benchmarks.fakes import FakeSerperServer
+from utils.config import AppConfig, load_config, set_config
+from utils.metrics import _percentile
+from utils.serper_client import SerperClient
+
+def scenario_config(base: AppConfig, server_url: str, enabled: bool, rate: Optional[float]) -> AppConfig:
+    serper = base.rate_limits.serper.model_copy(update={
+        'enabled': enabled,
+        'requests_per_second': rate,
+        'burst': max(1, int(rate or 1)),
+        'backoff_base_seconds': 0.1,
+    })
+    return base.model_copy(update={
+        'api': base.api.model_copy(update={
+            'serper': base.api.serper.model_copy(update={
+                'endpoint': f"{server_url}/news",
+                'search_endpoint': f"{server_url}/search",
+            }),
+        }),
+        'cache': base.cache.model_copy(update={
+            'serper': base.cache.serper.model_copy(update={'enabled': False}),
+        }),
+        'rate_limits': base.rate_limits.model_copy(update={'serper': serper}),
+    })
+
+def run_scenario(config: AppConfig, calls: int, workers: int) -> Tuple[int, List[float], float]:
+    """Failures, latencies of successful calls and wall time."""
+    set_config(config)
+    client = SerperClient("offline-benchmark", config)
+    endpoint = config.api.serper.verification_endpoint
+
+    def search(i: int) -> Optional[float]:
+        start = time.perf_counter()
+        try:
+            client.search(endpoint, {"q": f"Model release {i} improves reasoning", "num": 3})
+        except requests.exceptions.RequestException:
+            return None
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(search, range(calls)))
+    latencies = [r for r in results if r is not None]
+    return calls - len(latencies), latencies, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--quota", type=float, default=20, help="Calls per second the stand-in accepts")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds per stand-in call")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    base = load_config()
+    server = FakeSerperServer(base.verification.trusted_domains, latency=args.latency).start()
+    scenarios: Dict[str, Tuple[bool, Optional[float]]] = {
+        'none': (False, None),
+        'retry': (True, None),
+        'paced': (True, args.quota),
+    }
+    print(f"{'scenario':<9} {'ok':>5} {'failed':>6} {'429s':>6} {'seconds':>8} {'ok/s':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    try:
+        for name, (enabled, rate) in scenarios.items():
+            server.quota_per_second = 0
+            time.sleep(1.0)
+            server.quota_per_second = args.quota
+            server.requests.pop('throttled', None)
+            config = scenario_config(base, server.url, enabled, rate)
+            failed, latencies, seconds = run_scenario(config, args.calls, args.workers)
+            p = lambda fraction: _percentile(latencies, fraction) * 1000 if latencies else float('nan')
+            print(
+                f"{name:<9} {len(latencies):>5} {failed:>6} {server.requests.get('throttled', 0):>6} "
+                f"{seconds:>8.2f} {len(latencies) / seconds:>7.1f} {p(0.5):>8.0f} {p(0.99):>8.0f}"
+            )
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
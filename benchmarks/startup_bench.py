@@ -0,0 +1,97 @@
+"""
+Measure CLI startup cost with `python -X importtime` and guard it.
+
+Runs each light CLI invocation in a fresh interpreter several times and
+reports the median wall time, the total import time and the slowest
+imports. Fails (exit status 1) if an invocation imports a module from the
+heavy stack (crewai, langchain, openai, litellm, requests, bs4) or takes
+longer than its budget, so it can run in CI.
+
+Usage:
+    python -m benchmarks.startup_bench [--runs 5] [--budget-ms 1500] [--top 8]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Invocations that must start without the agent stack
+COMMANDS = {
+    'import main': ['-c', 'import main'],
+    '--help': ['main.py', '--help'],
+    'validate-config': ['main.py', 'validate-config'],
+    'list-digests': ['main.py', 'list-digests', '--limit', '1'],
+    'search': ['main.py', 'search', 'model', '--limit', '1'],
+    'check': ['main.py', 'check'],
+}
+
+FORBIDDEN = ('crewai', 'langchain', 'openai', 'litellm', 'requests', 'bs4')
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """(self, cumulative) microseconds by module from -X importtime output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+def measure(args: List[str]) -> Tuple[float, Dict[str, Tuple[int, int]]]:
+    """Wall seconds and import times of one invocation in a fresh interpreter."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', *args],
+        cwd=ROOT, capture_output=True, text=True,
+        env=dict(os.environ, PYTHONPATH=str(ROOT))
+    )
+    elapsed = time.perf_counter() - start
+    return elapsed, parse_importtime(result.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500, help="Maximum median wall time per command")
+    parser.add_argument("--top", type=int, default=8, help="Slowest imports listed per command")
+    args = parser.parse_args()
+
+    baseline = statistics.median(measure(['-c', 'pass'])[0] for _ in range(args.runs))
+    print(f"bare interpreter: {baseline * 1000:.0f} ms\n")
+
+    failures = []
+    print(f"{'command':<16} {'wall ms':>8} {'imports ms':>11} {'modules':>8}")
+    details = {}
+    for name, command in COMMANDS.items():
+        samples = [measure(command) for _ in range(args.runs)]
+        wall = statistics.median(s for s, _ in samples)
+        modules = samples[-1][1]
+        import_ms = sum(self_us for self_us, _ in modules.values()) / 1000
+        print(f"{name:<16} {wall * 1000:>8.0f} {import_ms:>11.0f} {len(modules):>8}")
+        details[name] = modules
+
+        heavy = sorted({m.split('.')[0] for m in modules if m.split('.')[0] in FORBIDDEN})
+        if heavy:
+            failures.append(f"{name}: imports {', '.join(heavy)}")
+        if wall * 1000 > args.budget_ms:
+            failures.append(f"{name}: {wall * 1000:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+
+    for name, modules in details.items():
+        slowest = sorted(modules.items(), key=lambda item: item[1][1], reverse=True)[:args.top]
+        print(f"\nslowest imports for {name} (cumulative ms):")
+        for module, (_, cumulative_us) in slowest:
+            print(f"  {cumulative_us / 1000:8.1f}  {module}")
+
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nStartup within budget.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Regression check for storyline assignment on labelled headline pairs.
+
+Each pair is an article and one published a day later: either a follow-up
+in the same storyline (a launch and its rollout trouble, a funding round
+and its aftermath) or a rival story told in the same words (another
+company's model launch or funding round). Both go through a fresh
+StorylineTracker, the cold start where document frequencies say least.
+Prints the cosine similarity the tracker scores each pair at against the
+configured threshold and exits non-zero if a follow-up starts a storyline
+of its own or a rival story joins the first article's storyline.
+
+Usage:
+    python -m benchmarks.storyline_pairs [--threshold 0.4]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+import numpy as np
+
+from tools.news_scraper_tool import NewsArticle
+from utils.config import get_config
+from utils.storylines import StorylineTracker, _Features, _normalize_rows
+
+GPT5 = ("OpenAI launches GPT-5, its most capable model yet",
+        "OpenAI on Thursday released GPT-5, which it says is its most capable model for coding and reasoning.")
+ANTHROPIC = ("Anthropic raises $13 billion in funding round led by Iconiq",
+             "Anthropic has raised $13 billion in a Series F round led by Iconiq, valuing the AI startup at $183 billion.")
+NVIDIA = ("Nvidia stock falls after export restrictions on H20 chips to China",
+          "Nvidia shares fell after the US government restricted exports of its H20 AI chips to China.")
+META = ("Meta hires Apple's top AI models executive for superintelligence lab",
+        "Meta has hired Ruoming Pang, who led Apple's foundation models team, for its superintelligence lab.")
+
+# (same storyline?, (title, snippet), (title, snippet) a day later)
+PAIRS: List[Tuple[bool, Tuple[str, str], Tuple[str, str]]] = [
+    (True, GPT5,
+     ("GPT-5 rollout hits capacity limits, OpenAI says",
+      "OpenAI said demand for GPT-5 has exceeded its capacity, slowing responses for some users.")),
+    (True, ANTHROPIC,
+     ("Anthropic's $183 billion valuation puts it among the most valuable startups",
+      "After its $13 billion Series F, Anthropic is now worth more than most public software companies.")),
+    (True, NVIDIA,
+     ("Nvidia to resume H20 sales to China after US reverses ban",
+      "Nvidia said it will resume sales of its H20 AI chip to China after the US government said it would grant licenses.")),
+    (True, META,
+     ("Two more Apple AI researchers follow Ruoming Pang to Meta",
+      "Meta has hired two more researchers from Apple's foundation models team, weeks after poaching Ruoming Pang.")),
+    (False, GPT5,
+     ("Google launches Gemini 3, its most capable model yet",
+      "Google on Tuesday released Gemini 3, which it says is its most capable model for coding and reasoning.")),
+    (False, ANTHROPIC,
+     ("Mistral raises $2 billion in funding round led by ASML",
+      "Mistral has raised $2 billion in a Series C round led by ASML, valuing the AI startup at $14 billion.")),
+    (False, NVIDIA,
+     ("AMD unveils MI400 accelerators to take on Nvidia in data centers",
+      "AMD showed its next generation of AI accelerators, which it says will compete with Nvidia's in data centers.")),
+    (False,
+     ("Microsoft releases new open-weight reasoning model",
+      "Microsoft released an open-weight reasoning model that it says rivals larger models on math benchmarks."),
+     ("Alibaba releases new open-weight reasoning model",
+      "Alibaba released an open-weight reasoning model that it says rivals larger models on math benchmarks.")),
+]
+
+def _article(title: str, snippet: str, n: int, day: int) -> NewsArticle:
+    return NewsArticle(
+        title=title,
+        url=f"https://example{day}.com/story{n}",
+        source=f"example{day}.com",
+        published_date=datetime(2025, 8, 7) + timedelta(days=day),
+        snippet=snippet
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threshold", type=float, default=None, help="Default: storylines.similarity_threshold")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    settings = get_config().storylines
+    threshold = args.threshold if args.threshold is not None else settings.similarity_threshold
+
+    failures = 0
+    print(f"threshold {threshold:.2f}")
+    print(f"{'same':>5} {'cosine':>6} {'joined':>7}  pair")
+    with tempfile.TemporaryDirectory() as workdir:
+        for n, (same, first, later) in enumerate(PAIRS):
+            tracker = StorylineTracker(
+                os.path.join(workdir, f"storylines{n}.sqlite3"),
+                dimensions=settings.dimensions,
+                similarity_threshold=threshold
+            )
+            articles = [_article(*first, n, 0), _article(*later, n, 1)]
+            assigned = [tracker.assign([article]) for article in articles]
+            joined = [storyline.id for storyline in assigned[0].values()] == \
+                     [storyline.id for storyline in assigned[1].values()]
+            # The score the later article gets: IDF over the two documents seen
+            vectors = _Features(settings.dimensions).matrix(articles)
+            idf = np.log(3.0 / (1.0 + (vectors != 0).sum(axis=0))) + 1.0
+            vectors = _normalize_rows(vectors * idf)
+            ok = joined == same
+            failures += not ok
+            print(f"{str(same):>5} {float(vectors[0] @ vectors[1]):>6.2f} {str(joined):>7}  "
+                  f"{first[0][:40]} / {later[0][:40]}{'' if ok else '  <-- wrong'}")
+
+    if failures:
+        print(f"{failures} of {len(PAIRS)} pairs assigned wrongly")
+        sys.exit(1)
+    print(f"All {len(PAIRS)} pairs assigned correctly")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark for cross-day storyline assignment.
+
+Generates a synthetic history of articles spread over some days, each a
+follow-up to one of a few hundred underlying stories (a handful of story
+terms plus shared filler vocabulary), and replays it through a fresh
+StorylineTracker in one call, as a new tracker seeds itself from the
+article store. Then times a typical daily run of new articles against the
+resulting state. Reports articles per second, storylines formed and how
+pure they are (the share of each storyline's articles from its most
+common underlying story).
+
+Usage:
+    python -m benchmarks.storylines_bench [--articles 20000] [--days 60]
+        [--stories 400] [--daily 50] [--dimensions 1024]
+"""
+
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+from tools.news_scraper_tool import NewsArticle
+from utils.domain_policy import normalize_url
+from utils.storylines import StorylineTracker
+
+FILLER = """
+    ai model company announced week launch users data system platform new
+    industry market product team billion developers tools open version early
+    """.split()
+
+def _word(rng: random.Random) -> str:
+    return ''.join(rng.choice('bcdfgklmnprstvz') + rng.choice('aeiou') for _ in range(3))
+
+def synthetic_history(
+    count: int, days: int, stories: int, seed: int = 11, start: datetime = None
+) -> List[Tuple[int, NewsArticle]]:
+    """(underlying story, article) pairs in publication order."""
+    rng = random.Random(seed)
+    start = start or datetime.now() - timedelta(days=days)
+    terms = [[_word(rng) for _ in range(8)] for _ in range(stories)]
+    # Each story runs for a few days somewhere in the period
+    spans = [(rng.uniform(0, days - 1), rng.uniform(1, 6)) for _ in range(stories)]
+    history = []
+    for i in range(count):
+        story = rng.randrange(stories)
+        begin, length = spans[story]
+        published = start + timedelta(days=min(days, begin + rng.uniform(0, length)))
+        words = terms[story]
+        title = ' '.join(rng.sample(words, 4) + rng.sample(FILLER, 2))
+        snippet = ' '.join(rng.sample(words, 5) + rng.sample(FILLER, 8))
+        history.append((story, NewsArticle(
+            title=title.capitalize(),
+            url=f"https://news{i % 50}.example.com/{story}/{i}",
+            source=f"news{i % 50}.example.com",
+            published_date=published,
+            snippet=snippet,
+        )))
+    history.sort(key=lambda pair: pair[1].published_date)
+    return history
+
+def purity(history: List[Tuple[int, NewsArticle]], assigned) -> float:
+    members = defaultdict(Counter)
+    for story, article in history:
+        members[assigned[normalize_url(article.url)].id][story] += 1
+    return sum(c.most_common(1)[0][1] for c in members.values()) / len(history)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--articles", type=int, default=20000)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--stories", type=int, default=400)
+    parser.add_argument("--daily", type=int, default=50)
+    parser.add_argument("--dimensions", type=int, default=1024)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    history = synthetic_history(args.articles + args.daily, args.days, args.stories)
+    backlog, today = history[:args.articles], history[args.articles:]
+    with tempfile.TemporaryDirectory() as workdir:
+        tracker = StorylineTracker(os.path.join(workdir, 'storylines.sqlite3'), dimensions=args.dimensions)
+
+        start = time.perf_counter()
+        assigned = tracker.assign([article for _, article in backlog])
+        elapsed = time.perf_counter() - start
+        stats = tracker.stats()
+        print(f"history: {len(backlog)} articles in {elapsed:.2f} s "
+              f"({len(backlog) / elapsed:,.0f} articles/s), {stats['storylines']} storylines "
+              f"for {args.stories} stories, purity {purity(backlog, assigned):.1%}")
+
+        start = time.perf_counter()
+        assigned = tracker.assign([article for _, article in today])
+        elapsed = time.perf_counter() - start
+        print(f"daily run: {len(today)} articles in {elapsed * 1000:.0f} ms, "
+              f"purity {purity(today, assigned):.1%}")
+
+        start = time.perf_counter()
+        tracker.assign([article for _, article in today])
+        print(f"repeat of the daily run (already assigned): "
+              f"{(time.perf_counter() - start) * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
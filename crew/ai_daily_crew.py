@@ -2,79 +2,118 @@
 AI Daily Crew orchestration for coordinating the news digest generation process.
 """
 
+import asyncio
 from crewai import Crew, Task
-from typing import List
+from crewai.llms.base_llm import BaseLLM
+from crewai.types.usage_metrics import UsageMetrics
+from typing import Callable, Dict, List, Optional, Sequence
+from agents.agent_runner import AgentRunner
 from agents.harvester_agent import HarvesterAgent
-from agents.summarizer_agent import SummarizerAgent
-from agents.verifier_agent import VerifierAgent
-from agents.editor_agent import EditorAgent
+from agents.summarizer_agent import ArticleSummary, SummarizerAgent, SummaryOutput
+from agents.verifier_agent import VerifiedSummary, VerifierAgent, VerificationOutput
+from agents.editor_agent import EditorAgent, FormatDigestTool, IntroOutput
+from crew.article_store import ArticleStore, from_record, normalize_url, to_record
+from crew.checkpoint import STAGES, RunCheckpoint
+from crew.editions import edition_config, harvest_editions, merge_articles, select_editions
+from crew.streaming import StreamingPipeline
+from tools.digest_renderer import digest_path
+from tools.news_scraper_tool import NewsArticle, NewsScraperTool
+from utils.config import AppConfig, get_config
+from utils.digest_index import DigestIndex
+from utils.metrics import RunMetrics, get_metrics, start_run
+from utils.storylines import Storyline, StorylineTracker, group_by_storyline
 import logging
+import sqlite3
+import time
+from datetime import date, timedelta
+
+MODES = ('crew', 'pipeline', 'streaming')
 
 class AIDailyCrew:
     """Crew for orchestrating the AI news digest generation process."""
     
-    def __init__(self):
-        """Initialize the crew with all necessary agents."""
+    def __init__(
+        self,
+        config: Optional[AppConfig] = None,
+        llm_factory: Optional[Callable[[], BaseLLM]] = None
+    ):
+        """
+        Initialize the crew with all necessary agents.
+        llm_factory, if given, builds the LLM for each agent instead of the
+        configured one.
+        """
         self.logger = logging.getLogger(__name__)
+        self.config = config or get_config()
+        self.store = ArticleStore.from_config(self.config)
+        self.digest_index = DigestIndex.from_config(self.config)
+        self.storyline_tracker = StorylineTracker.from_config(self.config)
+        self.run_id: Optional[str] = None
+        self.last_usage: Optional[UsageMetrics] = None
+        self.metrics: RunMetrics = get_metrics()
+        self._stage_clock = time.perf_counter()
         
-        # Create all agents
-        self.harvester = HarvesterAgent.create()
-        self.summarizer = SummarizerAgent.create()
-        self.verifier = VerifierAgent.create()
-        self.editor = EditorAgent.create()
+        # Create all agents; each gets its own LLM so usage is tracked per agent
+        llm = llm_factory or (lambda: None)
+        self.harvester = HarvesterAgent.create(self.config, llm())
+        self.summarizer = SummarizerAgent.create(self.config, llm())
+        self.verifier = VerifierAgent.create(self.config, llm())
+        self.editor = EditorAgent.create(self.config, llm())
         
-        # Create tasks
-        self.tasks = [
-            Task(
-                description="""Gather today's most important AI news articles. Focus on significant 
+        # Stage definitions in execution order: (agent, description, expected output)
+        self.stage_specs = dict(zip(STAGES, [
+            (
+                self.harvester,
+                """Gather today's most important AI news articles. Focus on significant 
                 developments, breakthroughs, and major industry news. Ensure articles 
                 are from reputable sources and are properly dated.""",
-                expected_output="""A list of relevant AI news articles, each containing:
+                """A list of relevant AI news articles, each containing:
                 - Title
                 - URL
                 - Source
                 - Publication date
                 - Brief snippet or description""",
-                agent=self.harvester
             ),
-            Task(
-                description="""Analyze and summarize the gathered AI news articles. Create 
+            (
+                self.summarizer,
+                """Analyze and summarize the gathered AI news articles. Create 
                 comprehensive summaries that capture main points, maintain technical 
                 accuracy, are clear and engaging, and identify key takeaways. Each 
                 summary should be 1-2 paragraphs long.""",
-                expected_output="""A list of article summaries, each containing:
+                """A list of article summaries, each containing:
                 - Original article metadata (title, URL, source, date)
                 - Comprehensive 1-2 paragraph summary
                 - List of key takeaways or bullet points""",
-                agent=self.summarizer
             ),
-            Task(
-                description="""Verify the claims made in the article summaries by 
+            (
+                self.verifier,
+                """Verify the claims made in the article summaries by 
                 cross-referencing with trusted sources. Check technical accuracy,
                 potential biases, and assess overall credibility. Provide verification 
                 sources and confidence levels.""",
-                expected_output="""A list of verified summaries, each containing:
+                """A list of verified summaries, each containing:
                 - Original summary content
                 - Verification sources used
                 - Verification status (verified/partially verified/unverified)
                 - Confidence score
                 - Any corrections or clarifications needed""",
-                agent=self.verifier
             ),
-            Task(
-                description="""Compile the verified AI news summaries into a professional 
+            (
+                self.editor,
+                """Compile the verified AI news summaries into a professional 
                 digest. Format with a clear title and date, brief introduction, 
                 main stories section, sources and verification status. Ensure proper 
                 Markdown formatting and include all necessary attribution and links.""",
-                expected_output="""A professionally formatted Markdown document containing:
+                """A professionally formatted Markdown document containing:
                 - Title and date
                 - Brief introduction/overview
                 - Main stories section with verified summaries
                 - Sources and verification status
                 - All necessary attribution and links""",
-                agent=self.editor
             )
-        ]
+        ]))
+        
+        # Create tasks
+        self.tasks = [self._build_task(stage) for stage in STAGES]
         
         # Create the crew
         self.crew = Crew(
@@ -88,17 +127,438 @@ class AIDailyCrew:
             verbose=True
         )
 
-    def run(self) -> str:
+    def _build_task(
+        self,
+        stage: str,
+        checkpoint: Optional[RunCheckpoint] = None,
+        prior_output: Optional[str] = None
+    ) -> Task:
+        """
+        Build the Task for a stage. With a checkpoint, the task saves its output
+        when it completes; prior_output carries a resumed run's last completed
+        stage into the first task that runs.
+        """
+        agent, description, expected_output = self.stage_specs[stage]
+        if prior_output is not None:
+            description = f"{description}\n\nOutput of the previous stage:\n{prior_output}"
+        
+        callback = None
+        if checkpoint is not None:
+            def callback(output, stage=stage):
+                self._end_stage(stage)
+                checkpoint.save_stage(stage, output.raw)
+        
+        return Task(
+            description=description,
+            expected_output=expected_output,
+            agent=agent,
+            callback=callback
+        )
+
+    def _open_checkpoint(self, run_id: Optional[str], resume: bool, mode: str) -> RunCheckpoint:
+        """Create a checkpoint for a new run, or reopen one to resume it."""
+        if resume:
+            checkpoint = RunCheckpoint.open(run_id, self.config)
+            if checkpoint.mode != mode:
+                raise ValueError(
+                    f"Run {run_id} was started in {checkpoint.mode} mode and "
+                    f"cannot be resumed in {mode} mode"
+                )
+        else:
+            checkpoint = RunCheckpoint.create(run_id, self.config, mode=mode)
+        self.run_id = checkpoint.run_id
+        self.metrics = start_run(self.run_id)
+        self._stage_clock = time.perf_counter()
+        return checkpoint
+
+    def _end_stage(self, stage: str) -> None:
+        """Record the time since the previous crew stage ended as this stage's time."""
+        now = time.perf_counter()
+        self.metrics.record_stage(stage, now - self._stage_clock)
+        self._stage_clock = now
+
+    def _llm_usage_meter(self) -> Callable[[], UsageMetrics]:
+        """A function returning the LLM usage of the agents called directly since this call."""
+        llm_agents = [self.summarizer, self.verifier, self.editor]
+        usage_before = [agent.llm.get_token_usage_summary() for agent in llm_agents]
+        
+        def llm_usage() -> UsageMetrics:
+            usage = UsageMetrics()
+            for agent, before in zip(llm_agents, usage_before):
+                usage.add_usage_metrics(agent.llm.get_token_usage_summary().delta_since(before))
+            return usage
+        return llm_usage
+
+    def _intro(self, verified: List[VerifiedSummary]) -> Optional[str]:
+        """The editor LLM's intro paragraph if output.llm_intro is set; None for the default one."""
+        if not self.config.output.llm_intro or not verified:
+            return None
+        try:
+            return asyncio.run(EditorAgent.write_intro(AgentRunner(self.editor, IntroOutput), verified)) or None
+        except Exception as e:
+            self.logger.warning(f"Could not write the intro, using the default one: {e!r}")
+            return None
+
+    def _mark_covered(self, stories: List[VerifiedSummary]) -> None:
+        """
+        Bring the archive index up to date and note on each story the most
+        recent earlier digest that already covered it (digest_index settings).
+        """
+        settings = self.config.digest_index
+        if self.digest_index is None:
+            return
+        try:
+            self.digest_index.update_from_config(self.config)
+            if not settings.flag_covered:
+                return
+            today = date.today()
+            since = (today - timedelta(days=settings.covered_within_days)).isoformat()
+            for story in stories:
+                hit = self.digest_index.previous_coverage(
+                    story.title, story.url, today.isoformat(), since, settings.title_similarity
+                )
+                if hit is not None:
+                    story.previous_coverage = {'date': hit.date, 'title': hit.title, 'url': hit.url}
+        except sqlite3.Error as e:
+            self.logger.warning(f"Digest index unavailable, not flagging earlier coverage: {e}")
+            return
+        covered = sum(1 for story in stories if story.previous_coverage)
+        if covered:
+            self.logger.info(f"{covered} of {len(stories)} stories were covered in earlier digests")
+
+    def _track_storylines(self, articles: List[NewsArticle]) -> Dict[str, Storyline]:
+        """
+        Assign the run's articles to storylines (see StorylineTracker); a new
+        tracker first replays the article store's history. Returns the
+        storyline of each article by normalized URL.
+        """
+        if self.storyline_tracker is None:
+            return {}
+        try:
+            if self.store is not None and not self.storyline_tracker.stats()['articles']:
+                history = self.store.articles()
+                if history:
+                    self.logger.info(f"Seeding storylines from {len(history)} stored articles")
+                    self.storyline_tracker.assign(history)
+            return self.storyline_tracker.assign(articles)
+        except sqlite3.Error as e:
+            self.logger.warning(f"Storyline state unavailable, not grouping stories: {e}")
+            return {}
+
+    def _group_storylines(
+        self,
+        stories: List[VerifiedSummary],
+        storylines: Dict[str, Storyline]
+    ) -> List[VerifiedSummary]:
+        """Note each story's storyline on it and put stories of one storyline together."""
+        for story in stories:
+            storyline = storylines.get(normalize_url(story.url))
+            if storyline is not None:
+                story.storyline = {
+                    'id': storyline.id,
+                    'title': storyline.title,
+                    'since': storyline.first_seen.strftime('%Y-%m-%d'),
+                    'articles': storyline.articles,
+                }
+        return group_by_storyline(stories, storylines)
+
+    def _index_new_digests(self) -> None:
+        """Add the digests just written to the archive index."""
+        if self.digest_index is None:
+            return
+        try:
+            self.digest_index.update_from_config(self.config)
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not index the new digest: {e}")
+
+    def _write_digest(
+        self,
+        checkpoint: RunCheckpoint,
+        articles: List[NewsArticle],
+        verified: List[VerifiedSummary]
+    ) -> str:
+        """Render and write the digest unless the edit stage is checkpointed; returns its Markdown."""
+        digest = checkpoint.load_stage('edit')
+        if digest is None:
+            with self.metrics.stage('edit'):
+                verified = self._group_storylines(verified, self._track_storylines(articles))
+                self._mark_covered(verified)
+                digest = FormatDigestTool(self.config).publish(verified, intro=self._intro(verified))
+            checkpoint.save_stage('edit', digest)
+            self._index_new_digests()
+        return digest
+
+    def _finish_metrics(self, status: str) -> None:
+        """Close the run's metrics and export them as configured."""
+        if self.last_usage is not None:
+            self.metrics.record_llm_usage(
+                self.last_usage.prompt_tokens,
+                self.last_usage.completion_tokens,
+                self.last_usage.successful_requests
+            )
+        self.metrics.finish(status)
+        stages = ', '.join(f"{name}={seconds:.1f}s" for name, seconds in self.metrics.report()['stages'].items())
+        self.logger.info(f"Run {self.run_id} {status}; stage times: {stages or 'none'}")
+        settings = self.config.metrics
+        if settings.enabled:
+            self.metrics.export(settings.report_dir, settings.prometheus_textfile)
+
+    def run(self, run_id: Optional[str] = None, resume: bool = False) -> str:
         """
         Execute the full digest generation process.
+        Each completed stage is checkpointed under run_id; with resume=True the
+        run restarts from the first stage without a checkpoint.
+        Tasks hand each other free-form agent output rather than article
+        records, so this mode neither reads nor writes the article store.
         Returns the path to the generated digest file.
         """
+        checkpoint = self._open_checkpoint(run_id, resume, 'crew')
+        if self.store is not None:
+            self.logger.info("Crew mode does not use the article store; every article is summarized and verified")
+        
+        start = checkpoint.first_incomplete()
+        if start is None:
+            self.logger.info(f"Run {self.run_id} already completed; returning its digest")
+            return checkpoint.load_stage(STAGES[-1])
+        
+        remaining = STAGES[STAGES.index(start):]
+        previous = STAGES.index(start) - 1
+        prior_output = checkpoint.load_stage(STAGES[previous]) if previous >= 0 else None
+        tasks = [self._build_task(remaining[0], checkpoint, prior_output)]
+        tasks += [self._build_task(stage, checkpoint) for stage in remaining[1:]]
+        crew = Crew(
+            agents=[self.stage_specs[stage][0] for stage in remaining],
+            tasks=tasks,
+            verbose=True
+        )
+        
         try:
+            if resume:
+                self.logger.info(f"Resuming run {self.run_id} from stage '{start}'")
             self.logger.info("Starting AI news digest generation...")
-            result = self.crew.kickoff()
+            checkpoint.mark('running')
+            result = crew.kickoff()
+            self.last_usage = crew.usage_metrics
+            checkpoint.mark('completed')
+            self._finish_metrics('completed')
             self.logger.info("AI news digest generation completed successfully!")
             return result
             
         except Exception as e:
+            checkpoint.mark('failed', str(e))
+            self._finish_metrics('failed')
+            self.logger.error(f"Error generating digest: {e}")
+            self.logger.error(f"Resume with: python main.py --resume {self.run_id}")
+            raise
+
+    def run_pipeline(self, run_id: Optional[str] = None, resume: bool = False) -> str:
+        """
+        Generate the digest with plain Python for the tool-only stages.
+        Harvesting calls the news scraper directly and the digest is laid out
+        and written without an LLM; only summarization and verification go
+        through their agents. Stages are checkpointed like run().
+        Returns the digest content.
+        """
+        checkpoint = self._open_checkpoint(run_id, resume, 'pipeline')
+        if resume:
+            self.logger.info(f"Resuming run {self.run_id} from stage '{checkpoint.first_incomplete()}'")
+        
+        llm_usage = self._llm_usage_meter()
+        
+        try:
+            self.logger.info("Starting AI news digest generation (pipeline mode)...")
+            checkpoint.mark('running')
+            
+            articles = self._stage(checkpoint, 'harvest', NewsArticle, lambda: (
+                NewsScraperTool(self.config)._fetch_articles(self.config.harvest.query)
+            ))
+            summaries = self._stage(checkpoint, 'summarize', ArticleSummary, lambda: asyncio.run(
+                SummarizerAgent.execute(
+                    AgentRunner(self.summarizer, SummaryOutput), articles, store=self.store
+                )
+            ))
+            verified = self._stage(checkpoint, 'verify', VerifiedSummary, lambda: asyncio.run(
+                VerifierAgent.execute(
+                    AgentRunner(self.verifier, VerificationOutput), summaries, store=self.store
+                )
+            ))
+            
+            digest = self._write_digest(checkpoint, articles, verified)
+            
+            self.last_usage = llm_usage()
+            checkpoint.mark('completed')
+            self._finish_metrics('completed')
+            self.logger.info("AI news digest generation completed successfully!")
+            return digest
+            
+        except Exception as e:
+            self.last_usage = llm_usage()
+            checkpoint.mark('failed', str(e))
+            self._finish_metrics('failed')
+            self.logger.error(f"Error generating digest: {e}")
+            self.logger.error(f"Resume with: python main.py --resume {self.run_id}")
+            raise
+
+    def run_streaming(self, run_id: Optional[str] = None, resume: bool = False) -> str:
+        """
+        Generate the digest like run_pipeline, but with the stages running
+        at the same time: each article goes on to summarization as soon as
+        it is harvested and its content fetched, and each summary straight
+        on to verification (see StreamingPipeline). The stage outputs are
+        checkpointed once the stream has drained; a resumed run streams
+        again but reuses every summary and verification it had finished.
+        Returns the digest content.
+        """
+        checkpoint = self._open_checkpoint(run_id, resume, 'streaming')
+        if resume:
+            self.logger.info(f"Resuming run {self.run_id} from stage '{checkpoint.first_incomplete()}'")
+        llm_usage = self._llm_usage_meter()
+        
+        try:
+            self.logger.info("Starting AI news digest generation (streaming mode)...")
+            checkpoint.mark('running')
+            
+            records = checkpoint.load_stage('verify')
+            if records is not None:
+                verified = [from_record(VerifiedSummary, record) for record in records]
+                articles = [from_record(NewsArticle, record) for record in checkpoint.load_stage('harvest')]
+            else:
+                pipeline = StreamingPipeline(
+                    self.config,
+                    AgentRunner(self.summarizer, SummaryOutput),
+                    AgentRunner(self.verifier, VerificationOutput),
+                    store=self.store,
+                    checkpoint=checkpoint
+                )
+                verified = asyncio.run(pipeline.run())
+                articles = pipeline.articles
+                for stage, items in (
+                    ('harvest', pipeline.articles),
+                    ('summarize', pipeline.summaries),
+                    ('verify', verified)
+                ):
+                    checkpoint.save_stage(stage, [to_record(item) for item in items])
+            
+            digest = self._write_digest(checkpoint, articles, verified)
+            
+            self.last_usage = llm_usage()
+            checkpoint.mark('completed')
+            self._finish_metrics('completed')
+            self.logger.info("AI news digest generation completed successfully!")
+            return digest
+            
+        except Exception as e:
+            self.last_usage = llm_usage()
+            checkpoint.mark('failed', str(e))
+            self._finish_metrics('failed')
             self.logger.error(f"Error generating digest: {e}")
-            raise 
\ No newline at end of file
+            self.logger.error(f"Resume with: python main.py --resume {self.run_id}")
+            raise
+
+    def run_batch(
+        self,
+        editions: Optional[Sequence[str]] = None,
+        run_id: Optional[str] = None,
+        resume: bool = False,
+        workers: Optional[int] = None
+    ) -> Dict[str, str]:
+        """
+        Generate several editions (see the `editions` config) in one run.
+        Each distinct harvest runs once, on up to workers threads; the
+        articles of all editions are then summarized and verified together,
+        so a story in several editions costs its LLM calls once, and each
+        edition's digest is laid out and written like run_pipeline's.
+        editions names the editions to generate (default all); a resumed
+        run generates the editions it was started with. Stages are
+        checkpointed as one run.
+        Returns the digest path of each edition by name.
+        """
+        checkpoint = self._open_checkpoint(run_id, resume, 'batch')
+        harvested = checkpoint.load_stage('harvest')
+        if harvested is not None:
+            editions = list(harvested)
+        selected = select_editions(self.config, editions)
+        configs = {edition.name: edition_config(self.config, edition) for edition in selected}
+        if resume:
+            self.logger.info(f"Resuming run {self.run_id} from stage '{checkpoint.first_incomplete()}'")
+        
+        llm_usage = self._llm_usage_meter()
+        
+        try:
+            self.logger.info(f"Starting batch generation of editions: {', '.join(configs)}")
+            checkpoint.mark('running')
+            
+            if harvested is None:
+                with self.metrics.stage('harvest'):
+                    per_edition = harvest_editions(configs, workers)
+                checkpoint.save_stage('harvest', {
+                    name: [to_record(article) for article in articles]
+                    for name, articles in per_edition.items()
+                })
+            else:
+                per_edition = {
+                    name: [from_record(NewsArticle, record) for record in records]
+                    for name, records in harvested.items()
+                }
+            articles = merge_articles(per_edition)
+            self.logger.info(
+                f"{len(articles)} distinct articles across "
+                f"{sum(len(a) for a in per_edition.values())} edition slots"
+            )
+            
+            summaries = self._stage(checkpoint, 'summarize', ArticleSummary, lambda: asyncio.run(
+                SummarizerAgent.execute(
+                    AgentRunner(self.summarizer, SummaryOutput), articles, store=self.store
+                )
+            ))
+            verified = self._stage(checkpoint, 'verify', VerifiedSummary, lambda: asyncio.run(
+                VerifierAgent.execute(
+                    AgentRunner(self.verifier, VerificationOutput), summaries, store=self.store
+                )
+            ))
+            
+            paths = checkpoint.load_stage('edit')
+            if paths is None:
+                by_url = {normalize_url(summary.url): summary for summary in verified}
+                paths = {}
+                with self.metrics.stage('edit'):
+                    storylines = self._track_storylines(articles)
+                    for edition in selected:
+                        stories = [
+                            by_url[key] for key in
+                            dict.fromkeys(normalize_url(a.url) for a in per_edition[edition.name])
+                            if key in by_url
+                        ]
+                        stories = self._group_storylines(stories, storylines)
+                        config = configs[edition.name]
+                        self._mark_covered(stories)
+                        FormatDigestTool(config).publish(stories, title=edition.title, intro=self._intro(stories))
+                        paths[edition.name] = digest_path(config)
+                        self.logger.info(f"Edition '{edition.name}': {len(stories)} stories -> {paths[edition.name]}")
+                checkpoint.save_stage('edit', paths)
+                self._index_new_digests()
+            
+            self.last_usage = llm_usage()
+            checkpoint.mark('completed')
+            self._finish_metrics('completed')
+            self.logger.info("Batch generation completed successfully!")
+            return paths
+            
+        except Exception as e:
+            self.last_usage = llm_usage()
+            checkpoint.mark('failed', str(e))
+            self._finish_metrics('failed')
+            self.logger.error(f"Error generating editions: {e}")
+            self.logger.error(f"Resume with: python main.py --resume {self.run_id}")
+            raise
+
+    def _stage(self, checkpoint: RunCheckpoint, stage: str, record_type: type, produce) -> list:
+        """Load a stage's checkpointed records, or produce and checkpoint them."""
+        records = checkpoint.load_stage(stage)
+        if records is not None:
+            return [from_record(record_type, record) for record in records]
+        with self.metrics.stage(stage):
+            items = produce()
+        checkpoint.save_stage(stage, [to_record(item) for item in items])
+        self.logger.info(f"Stage '{stage}' produced {len(items)} items")
+        return items
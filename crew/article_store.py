@@ -0,0 +1,181 @@
+"""
+Persistent store of processed articles so later runs can skip unchanged stories.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, fields
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Type, TypeVar
+
+from agents.summarizer_agent import ArticleSummary
+from agents.verifier_agent import VerifiedSummary
+from tools.news_scraper_tool import NewsArticle
+from utils.config import AppConfig, get_config
+from utils.domain_policy import normalize_url
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+def content_hash(article: NewsArticle) -> str:
+    """Hash of the article text the LLM stages would see."""
+    text = f"{article.title}\n{article.content or article.snippet}"
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def summary_hash(summary: ArticleSummary) -> str:
+    """Hash of the summary text the verifier would see."""
+    text = f"{summary.title}\n{summary.summary}\n" + "\n".join(summary.key_points)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def to_record(obj: Any) -> Dict[str, Any]:
+    """JSON-ready dict of an article, summary or verified summary dataclass."""
+    data = asdict(obj)
+    if isinstance(data.get('published_date'), datetime):
+        data['published_date'] = data['published_date'].isoformat()
+    return data
+
+def from_record(cls: Type[T], data: Dict[str, Any]) -> T:
+    """Rebuild a dataclass from to_record output, ignoring unknown fields."""
+    known = {f.name for f in fields(cls)}
+    data = {key: value for key, value in data.items() if key in known}
+    if isinstance(data.get('published_date'), str):
+        data['published_date'] = datetime.fromisoformat(data['published_date'])
+    return cls(**data)
+
+def _encode(obj: Any) -> str:
+    return json.dumps(to_record(obj))
+
+def _decode(cls: Type[T], raw: str) -> T:
+    return from_record(cls, json.loads(raw))
+
+class ArticleStore:
+    """
+    SQLite store of harvested articles and their LLM stage results.
+
+    Rows are keyed by normalized URL and remember the content hash the
+    summary was made from and the summary hash the verification was made
+    from. A stored result is only returned while those hashes still match,
+    so changed articles go back through the LLM stages and unchanged ones
+    are reused. Uses WAL mode so concurrent runs can share the file.
+    """
+
+    def __init__(self, path: str, retention_days: float = 14):
+        self.path = path
+        self.retention_days = retention_days
+        self._local = threading.local()
+        Path(os.path.dirname(path) or '.').mkdir(parents=True, exist_ok=True)
+        conn = self._connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS articles (
+                url_key TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                article TEXT NOT NULL,
+                summary TEXT,
+                summary_hash TEXT,
+                verified TEXT,
+                first_seen REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_content_hash ON articles(content_hash)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_updated_at ON articles(updated_at)")
+        self.prune()
+
+    @classmethod
+    def from_config(cls, config: Optional[AppConfig] = None) -> Optional['ArticleStore']:
+        """Open the configured store, or return None if it is disabled."""
+        settings = (config or get_config()).article_store
+        if not settings.enabled:
+            return None
+        return cls(settings.path, settings.retention_days)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def prune(self) -> int:
+        """Drop rows not touched within the retention window."""
+        cutoff = time.time() - self.retention_days * 86400
+        return self._connection().execute(
+            "DELETE FROM articles WHERE updated_at < ?", (cutoff,)
+        ).rowcount
+
+    def articles(self) -> List[NewsArticle]:
+        """Every stored article, oldest first."""
+        return [
+            _decode(NewsArticle, row[0]) for row in
+            self._connection().execute("SELECT article FROM articles ORDER BY first_seen")
+        ]
+
+    def _row(self, url: str) -> Optional[Dict[str, Any]]:
+        cursor = self._connection().execute(
+            "SELECT * FROM articles WHERE url_key = ?", (normalize_url(url),)
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return dict(zip([column[0] for column in cursor.description], row))
+
+    def record_article(self, article: NewsArticle) -> bool:
+        """
+        Record a harvested article. Returns True if it is new or its content
+        changed, in which case earlier stage results are discarded.
+        """
+        now = time.time()
+        new_hash = content_hash(article)
+        row = self._row(article.url)
+        if row is not None and row['content_hash'] == new_hash:
+            self._connection().execute(
+                "UPDATE articles SET article = ?, updated_at = ? WHERE url_key = ?",
+                (_encode(article), now, row['url_key'])
+            )
+            return False
+        self._connection().execute(
+            "INSERT OR REPLACE INTO articles "
+            "(url_key, content_hash, article, summary, summary_hash, verified, first_seen, updated_at) "
+            "VALUES (?, ?, ?, NULL, NULL, NULL, ?, ?)",
+            (normalize_url(article.url), new_hash, _encode(article),
+             row['first_seen'] if row else now, now)
+        )
+        return True
+
+    def get_summary(self, article: NewsArticle) -> Optional[ArticleSummary]:
+        """Stored summary for an unchanged article, else None."""
+        row = self._row(article.url)
+        if row is None or row['summary'] is None or row['content_hash'] != content_hash(article):
+            return None
+        return _decode(ArticleSummary, row['summary'])
+
+    def put_summary(self, article: NewsArticle, summary: ArticleSummary) -> None:
+        self.record_article(article)
+        self._connection().execute(
+            "UPDATE articles SET summary = ?, summary_hash = ?, verified = NULL, updated_at = ? "
+            "WHERE url_key = ?",
+            (_encode(summary), summary_hash(summary), time.time(), normalize_url(article.url))
+        )
+
+    def get_verified(self, summary: ArticleSummary) -> Optional[VerifiedSummary]:
+        """Stored verification for an unchanged summary, else None."""
+        row = self._row(summary.url)
+        if row is None or row['verified'] is None or row['summary_hash'] != summary_hash(summary):
+            return None
+        return _decode(VerifiedSummary, row['verified'])
+
+    def put_verified(self, summary: ArticleSummary, verified: VerifiedSummary) -> None:
+        """Store a verification; ignored if the summary is not in the store."""
+        self._connection().execute(
+            "UPDATE articles SET verified = ?, summary_hash = ?, updated_at = ? WHERE url_key = ?",
+            (_encode(verified), summary_hash(summary), time.time(), normalize_url(summary.url))
+        )
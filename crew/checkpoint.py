@@ -0,0 +1,161 @@
+"""
+Run-scoped checkpoints so a failed digest run can resume where it stopped.
+"""
+
+import json
+import logging
+import os
+import secrets
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+from utils.config import AppConfig, get_config
+
+logger = logging.getLogger(__name__)
+
+STAGES = ('harvest', 'summarize', 'verify', 'edit')
+
+def _atomic_write(path: Path, text: str) -> None:
+    """Write text to path via a temp file and rename, so readers never see partial data."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+class RunCheckpoint:
+    """
+    Stores the output of each completed stage of one digest run.
+
+    Each run gets its own directory holding a manifest, one file per
+    completed stage and, for stages that work article by article, a
+    journal of finished items. Stage files are written atomically and item
+    journals are append-only, so a crash never leaves a half-written
+    checkpoint behind.
+    """
+
+    def __init__(self, run_id: str, root: str):
+        self.run_id = run_id
+        self.dir = Path(root) / run_id
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_run_id() -> str:
+        """A timestamp, so IDs sort by start time, plus random bits for runs started together."""
+        return f"{datetime.now():%Y%m%d-%H%M%S}-{secrets.token_hex(3)}"
+
+    @classmethod
+    def create(
+        cls,
+        run_id: Optional[str] = None,
+        config: Optional[AppConfig] = None,
+        mode: str = 'crew'
+    ) -> 'RunCheckpoint':
+        """
+        Start checkpointing a new run executed in the given mode; a
+        generated run ID that is already taken is replaced by a fresh one.
+        """
+        root = (config or get_config()).checkpoints.dir
+        checkpoint = cls(run_id or cls.new_run_id(), root)
+        while run_id is None and checkpoint.dir.exists():
+            checkpoint = cls(cls.new_run_id(), root)
+        if checkpoint.exists():
+            raise FileExistsError(f"Checkpoint for run {checkpoint.run_id} already exists")
+        checkpoint.dir.mkdir(parents=True)
+        checkpoint._write_manifest({
+            'run_id': checkpoint.run_id, 'mode': mode, 'created_at': time.time()
+        })
+        checkpoint.mark('running')
+        return checkpoint
+
+    @classmethod
+    def open(cls, run_id: str, config: Optional[AppConfig] = None) -> 'RunCheckpoint':
+        """Reopen an existing run for resuming."""
+        checkpoint = cls(run_id, (config or get_config()).checkpoints.dir)
+        if not checkpoint.exists():
+            raise FileNotFoundError(f"No checkpoint found for run {run_id} in {checkpoint.dir.parent}")
+        return checkpoint
+
+    def exists(self) -> bool:
+        return (self.dir / 'manifest.json').exists()
+
+    def _manifest(self) -> Dict[str, Any]:
+        path = self.dir / 'manifest.json'
+        return json.loads(path.read_text(encoding='utf-8')) if path.exists() else {}
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        _atomic_write(self.dir / 'manifest.json', json.dumps(manifest, indent=2))
+
+    def mark(self, status: str, error: Optional[str] = None) -> None:
+        """Record the run status ('running', 'failed' or 'completed')."""
+        with self._lock:
+            manifest = self._manifest()
+            manifest.update(status=status, updated_at=time.time(), error=error)
+            self._write_manifest(manifest)
+
+    @property
+    def status(self) -> Optional[str]:
+        return self._manifest().get('status')
+
+    @property
+    def mode(self) -> str:
+        """How the run executes its stages: 'crew', 'pipeline', 'streaming' or 'batch'."""
+        return self._manifest().get('mode', 'crew')
+
+    def _stage_path(self, stage: str) -> Path:
+        return self.dir / f"{stage}.json"
+
+    def save_stage(self, stage: str, output: Any) -> None:
+        """Persist a completed stage's output (any JSON-serializable value)."""
+        with self._lock:
+            _atomic_write(self._stage_path(stage), json.dumps({'stage': stage, 'output': output}))
+        logger.info(f"Checkpointed stage '{stage}' of run {self.run_id}")
+
+    def load_stage(self, stage: str) -> Optional[Any]:
+        """Output of a completed stage, or None if it has not completed."""
+        path = self._stage_path(stage)
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding='utf-8'))['output']
+
+    def is_complete(self, stage: str) -> bool:
+        return self._stage_path(stage).exists()
+
+    def first_incomplete(self, stages: Sequence[str] = STAGES) -> Optional[str]:
+        """The first stage without a checkpoint, or None if all are complete."""
+        for stage in stages:
+            if not self.is_complete(stage):
+                return stage
+        return None
+
+    def save_item(self, stage: str, key: str, item: Any) -> None:
+        """Append one finished item of a stage to its journal."""
+        line = json.dumps({'key': key, 'item': item}) + '\n'
+        with self._lock:
+            with open(self.dir / f"{stage}.items.jsonl", 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def load_items(self, stage: str) -> Dict[str, Any]:
+        """Finished items of a stage by key; a torn final line is ignored."""
+        path = self.dir / f"{stage}.items.jsonl"
+        items: Dict[str, Any] = {}
+        if not path.exists():
+            return items
+        for line in path.read_text(encoding='utf-8').splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            items[record['key']] = record['item']
+        return items
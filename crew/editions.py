@@ -0,0 +1,94 @@
+"""
+Editions: several digests generated from one configuration in one process.
+"""
+
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+from crew.article_store import normalize_url
+from tools.news_scraper_tool import NewsArticle, NewsScraperTool
+from tools.source_harvester import QueryMemo
+from utils.config import AppConfig, EditionSettings
+from utils.metrics import bind_metrics
+
+logger = logging.getLogger(__name__)
+
+# Edition used when a batch runs without any configured editions
+DEFAULT_EDITION = EditionSettings(name='default')
+
+def select_editions(config: AppConfig, names: Optional[Sequence[str]] = None) -> List[EditionSettings]:
+    """
+    The configured editions named in names, in configuration order, or all
+    of them if names is empty. Raises ValueError for unknown names.
+    """
+    editions = list(config.editions) or [DEFAULT_EDITION]
+    if not names:
+        return editions
+    known = {edition.name for edition in editions}
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        raise ValueError(f"Unknown editions: {', '.join(unknown)} (configured: {', '.join(sorted(known))})")
+    return [edition for edition in editions if edition.name in names]
+
+def edition_config(base: AppConfig, edition: EditionSettings) -> AppConfig:
+    """base with the edition's harvest, limit and output overrides applied."""
+    data = base.model_dump()
+    data['editions'] = []
+    data['schedule']['editions'] = []
+    harvest, limits = data['harvest'], data['article_limits']
+    if edition.query is not None:
+        harvest['query'] = edition.query
+    if edition.topics is not None:
+        harvest['topics'] = edition.topics
+    if edition.sources is not None:
+        wanted = {name.lower() for name in edition.sources}
+        data['news_sources'] = [s for s in data['news_sources'] if s['name'].lower() in wanted]
+    if edition.max_articles_per_day is not None:
+        limits['max_articles_per_day'] = edition.max_articles_per_day
+    if edition.max_articles_per_source is not None:
+        limits['max_articles_per_source'] = edition.max_articles_per_source
+    if edition.filename_format is not None:
+        data['output']['filename_format'] = edition.filename_format
+    # Validate afresh so derived lookups (source priorities) match the edition
+    return AppConfig.model_validate(data)
+
+def harvest_key(config: AppConfig) -> str:
+    """Identifies the harvest config would produce; equal keys harvest the same articles."""
+    return json.dumps({
+        'sources': [source.model_dump() for source in config.news_sources],
+        'limits': config.article_limits.model_dump(),
+        'harvest': config.harvest.model_dump(),
+        'lookback_hours': config.time_settings.lookback_hours,
+    }, sort_keys=True)
+
+def harvest_editions(configs: Dict[str, AppConfig], workers: Optional[int] = None) -> Dict[str, List[NewsArticle]]:
+    """
+    Harvest every edition, running each distinct harvest once.
+
+    Distinct harvests run concurrently on up to workers threads and share a
+    QueryMemo, so a news query that several editions issue (for example the
+    same source with the same base query) reaches Serper once.
+    """
+    memo = QueryMemo()
+    groups: Dict[str, List[str]] = {}
+    for name, config in configs.items():
+        groups.setdefault(harvest_key(config), []).append(name)
+    logger.info(f"Harvesting {len(configs)} editions with {len(groups)} distinct harvests")
+
+    def harvest(names: List[str]) -> List[NewsArticle]:
+        config = configs[names[0]]
+        return NewsScraperTool(config, memo=memo)._fetch_articles(config.harvest.query)
+
+    with ThreadPoolExecutor(max_workers=workers or len(groups)) as pool:
+        results = dict(zip(groups, pool.map(bind_metrics(harvest), groups.values())))
+    return {name: results[key] for key, names in groups.items() for name in names}
+
+def merge_articles(per_edition: Dict[str, List[NewsArticle]]) -> List[NewsArticle]:
+    """Every edition's articles once, by normalized URL, in first-seen order."""
+    merged: Dict[str, NewsArticle] = {}
+    for articles in per_edition.values():
+        for article in articles:
+            merged.setdefault(normalize_url(article.url), article)
+    return list(merged.values())
@@ -0,0 +1,290 @@
+"""
+Long-running daemon that keeps a warm crew and generates digests on a schedule.
+"""
+
+import json
+import logging
+import os
+import queue
+import signal
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from crew.ai_daily_crew import AIDailyCrew
+from crew.editions import select_editions
+from utils.config import DEFAULT_CONFIG_PATH, AppConfig, ConfigError, load_config, set_config
+
+logger = logging.getLogger(__name__)
+
+RUN_MODES = ('crew', 'pipeline', 'streaming', 'batch')
+
+@dataclass
+class RunRequest:
+    """One queued digest run."""
+    mode: str
+    editions: Tuple[str, ...] = ()
+    reason: str = 'schedule'
+    requested_at: float = field(default_factory=time.time)
+
+@dataclass
+class RunRecord:
+    """Outcome of a finished run, as reported by GET /status."""
+    run_id: Optional[str]
+    mode: str
+    reason: str
+    status: str
+    started_at: float
+    finished_at: float
+    result: Any = None
+    error: Optional[str] = None
+
+def next_run_time(times: Tuple[str, ...], now: datetime) -> Optional[datetime]:
+    """
+    The first scheduled time of day strictly after now, in now's timezone;
+    None if there are no times.
+    """
+    candidates = []
+    for day in (now.date(), now.date() + timedelta(days=1)):
+        for time_of_day in times:
+            hours, minutes = map(int, time_of_day.split(':'))
+            at = datetime(day.year, day.month, day.day, hours, minutes, tzinfo=now.tzinfo)
+            if at > now:
+                candidates.append(at)
+    return min(candidates, default=None)
+
+class _ControlHandler(BaseHTTPRequestHandler):
+    """Local control endpoint: POST /run, GET /status, GET /health."""
+
+    def log_message(self, format, *args):
+        logger.debug(f"Control request from {self.client_address[0]}: {format % args}")
+
+    def _reply(self, status: int, data: Dict[str, Any]) -> None:
+        body = json.dumps(data, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        scheduler: DigestScheduler = self.server.scheduler
+        if self.path == '/health':
+            self._reply(200, {'ok': True})
+        elif self.path == '/status':
+            self._reply(200, scheduler.status())
+        else:
+            self._reply(404, {'error': f"unknown path {self.path}"})
+
+    def do_POST(self):
+        scheduler: DigestScheduler = self.server.scheduler
+        if self.path != '/run':
+            self._reply(404, {'error': f"unknown path {self.path}"})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}') if length else {}
+            if not isinstance(body, dict):
+                raise ValueError("request body must be a JSON object")
+            position = scheduler.trigger(
+                mode=body.get('mode'),
+                editions=body.get('editions'),
+                reason='http'
+            )
+        except ValueError as e:
+            self._reply(400, {'error': str(e)})
+            return
+        self._reply(202, {'queued': True, 'position': position})
+
+class DigestScheduler:
+    """
+    Keeps one AIDailyCrew (agents, tools, LLM clients and the shared HTTP
+    pool) alive and runs digests through it.
+
+    Runs start at the configured schedule.times each day, in
+    time_settings.timezone, or on demand through the local HTTP endpoint;
+    they execute one at a time in the thread that called serve_forever.
+    config.yaml is re-read when it changes: a valid new configuration
+    replaces the crew between runs, an invalid one is logged and ignored.
+    HTTP pool and response cache settings, and the control endpoint's
+    address, only take effect on restart. SIGTERM and SIGINT stop the
+    daemon once the run in progress has finished.
+    """
+
+    def __init__(
+        self,
+        config_path: str = DEFAULT_CONFIG_PATH,
+        config: Optional[AppConfig] = None,
+        crew_factory: Callable[[AppConfig], AIDailyCrew] = AIDailyCrew
+    ):
+        self.config_path = config_path
+        self.config = config or load_config(config_path)
+        self._crew_factory = crew_factory
+        self._config_mtime = self._mtime()
+        self._requests: 'queue.Queue[RunRequest]' = queue.Queue()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._current: Optional[RunRequest] = None
+        self._current_started: Optional[float] = None
+        self._history: List[RunRecord] = []
+        self._next_run: Optional[datetime] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+
+        set_config(self.config)
+        logger.info("Building the crew...")
+        self.crew = crew_factory(self.config)
+
+    def _mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.config_path).st_mtime
+        except OSError:
+            return None
+
+    def _now(self) -> datetime:
+        return datetime.now(ZoneInfo(self.config.time_settings.timezone))
+
+    def _schedule_next(self) -> None:
+        self._next_run = next_run_time(self.config.schedule.times, self._now())
+        if self._next_run is not None:
+            logger.info(f"Next scheduled run at {self._next_run.isoformat()}")
+
+    def trigger(
+        self,
+        mode: Optional[str] = None,
+        editions: Optional[List[str]] = None,
+        reason: str = 'manual'
+    ) -> int:
+        """
+        Queue a run; mode and editions default to the schedule's.
+        Returns the number of runs queued ahead of it. Raises ValueError for
+        an unknown mode or edition, or while shutting down.
+        """
+        if self._stopping.is_set():
+            raise ValueError("the daemon is shutting down")
+        settings = self.config.schedule
+        mode = mode or settings.mode
+        if mode not in RUN_MODES:
+            raise ValueError(f"unknown mode {mode!r}; expected one of {', '.join(RUN_MODES)}")
+        editions = tuple(editions if editions is not None else settings.editions)
+        if mode == 'batch':
+            select_editions(self.config, editions)
+        ahead = self._requests.qsize() + (1 if self._current else 0)
+        self._requests.put(RunRequest(mode, editions, reason))
+        logger.info(f"Queued {mode} run ({reason}); {ahead} ahead of it")
+        return ahead
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            current = self._current
+            return {
+                'state': 'stopping' if self._stopping.is_set() else ('running' if current else 'idle'),
+                'current': dict(asdict(current), started_at=self._current_started) if current else None,
+                'queued': self._requests.qsize(),
+                'next_scheduled': self._next_run.isoformat() if self._next_run else None,
+                'history': [asdict(record) for record in self._history[-10:]],
+            }
+
+    def reload_if_changed(self) -> bool:
+        """Reload config.yaml if it changed; returns True if a new config was installed."""
+        mtime = self._mtime()
+        if mtime == self._config_mtime:
+            return False
+        self._config_mtime = mtime
+        try:
+            config = load_config(self.config_path)
+        except ConfigError as e:
+            logger.error(f"Ignoring changed configuration: {e}")
+            return False
+        if config == self.config:
+            return False
+        if (config.schedule.http_host, config.schedule.http_port) != (
+            self.config.schedule.http_host, self.config.schedule.http_port
+        ):
+            logger.warning("The control endpoint address changes only on restart")
+        set_config(config)
+        self.crew = self._crew_factory(config)
+        self.config = config
+        self._schedule_next()
+        logger.info(f"Reloaded configuration from {self.config_path}")
+        return True
+
+    def _execute(self, request: RunRequest) -> None:
+        with self._lock:
+            self._current = request
+            self._current_started = time.time()
+        logger.info(f"Starting {request.mode} run ({request.reason})")
+        record = RunRecord(None, request.mode, request.reason, 'completed', self._current_started, 0.0)
+        self.crew.run_id = None
+        try:
+            if request.mode == 'batch':
+                record.result = self.crew.run_batch(editions=list(request.editions))
+            elif request.mode == 'pipeline':
+                record.result = self.crew.run_pipeline()
+            elif request.mode == 'streaming':
+                record.result = self.crew.run_streaming()
+            else:
+                record.result = str(self.crew.run())
+        except Exception as e:
+            record.status, record.error = 'failed', str(e)
+            logger.error(f"Scheduled run failed: {e}")
+        record.run_id = self.crew.run_id
+        record.finished_at = time.time()
+        if record.mode != 'batch' and isinstance(record.result, str):
+            # Keep the status page small; the digest itself is on disk
+            record.result = f"{len(record.result)} characters"
+        with self._lock:
+            self._current = None
+            self._history.append(record)
+            del self._history[:-50]
+
+    def _start_server(self) -> None:
+        settings = self.config.schedule
+        self._server = ThreadingHTTPServer((settings.http_host, settings.http_port), _ControlHandler)
+        self._server.daemon_threads = True
+        self._server.scheduler = self
+        threading.Thread(target=self._server.serve_forever, name='digest-control', daemon=True).start()
+        host, port = self._server.server_address[:2]
+        logger.info(f"Control endpoint listening on http://{host}:{port}")
+
+    def stop(self, *_: Any) -> None:
+        """Stop after the run in progress; safe to call from a signal handler."""
+        if not self._stopping.is_set():
+            logger.info("Shutdown requested; finishing the current run first")
+            self._stopping.set()
+
+    def serve_forever(self, install_signal_handlers: bool = True) -> None:
+        """Run scheduled and triggered digests until stop() is called."""
+        if install_signal_handlers:
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+        self._start_server()
+        self._schedule_next()
+        last_reload_check = time.monotonic()
+        try:
+            while not self._stopping.is_set():
+                if self._next_run is not None and self._now() >= self._next_run:
+                    self.trigger(reason='schedule')
+                    self._schedule_next()
+
+                wait = self.config.schedule.reload_check_seconds
+                if self._next_run is not None:
+                    wait = min(wait, max(0.0, (self._next_run - self._now()).total_seconds()))
+                try:
+                    request = self._requests.get(timeout=wait)
+                except queue.Empty:
+                    request = None
+                if request is not None and not self._stopping.is_set():
+                    self._execute(request)
+
+                if time.monotonic() - last_reload_check >= self.config.schedule.reload_check_seconds:
+                    last_reload_check = time.monotonic()
+                    self.reload_if_changed()
+        finally:
+            if self._server is not None:
+                self._server.shutdown()
+                self._server.server_close()
+            logger.info("Daemon stopped")
@@ -0,0 +1,345 @@
+"""
+Streaming digest generation: stages connected by bounded queues instead of barriers.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from agents.summarizer_agent import ArticleSummary, SummarizerAgent
+from agents.verifier_agent import VerifiedSummary, VerifierAgent, build_verified
+from crew.article_store import ArticleStore, from_record, normalize_url, to_record
+from crew.checkpoint import RunCheckpoint
+from tools.news_scraper_tool import NewsArticle, NewsScraperTool
+from utils.config import AppConfig
+from utils.metrics import bind_metrics, get_metrics
+from utils.tokens import TokenBudget
+
+logger = logging.getLogger(__name__)
+
+# Put on a queue after the last item of a stage
+_DONE = object()
+
+class StreamingPipeline:
+    """
+    Harvests, fetches, summarizes and verifies articles at the same time,
+    each article moving to the next stage as soon as it is done with the
+    previous one.
+
+    Stages are connected by asyncio queues holding at most
+    streaming.queue_size articles, so a stage that gets ahead waits for
+    the next one to catch up. Each stage runs as many workers as its
+    concurrency setting allows; the harvest runs in a thread and hands on
+    articles as its queries return them. A run therefore takes about as
+    long as the slowest article's path rather than the sum of the slowest
+    stages.
+
+    With a checkpoint, each harvested article and each finished summary
+    and verification is journaled by URL, so a resumed run streams the same
+    articles again and only repeats the work that had not got through.
+    """
+
+    def __init__(
+        self,
+        config: AppConfig,
+        summarizer: Any,
+        verifier: Any,
+        scraper: Optional[NewsScraperTool] = None,
+        store: Optional[ArticleStore] = None,
+        checkpoint: Optional[RunCheckpoint] = None
+    ):
+        """summarizer and verifier are agents with the `await execute(prompt)` interface."""
+        self.config = config
+        self._summarizer = summarizer
+        self._verifier = verifier
+        self._scraper = scraper or NewsScraperTool(config)
+        self._store = store
+        self._checkpoint = checkpoint
+        self._budget = TokenBudget(config.summarization.max_tokens_per_run)
+        self._metrics = get_metrics()
+        self._stopping = threading.Event()
+        self._arrived: Dict[str, float] = {}
+        self._summarized: Dict[str, Any] = {}
+        self._verified: Dict[str, Any] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.articles: List[NewsArticle] = []
+        self.summaries: List[ArticleSummary] = []
+
+    def _journal(self, stage: str) -> Dict[str, Any]:
+        return self._checkpoint.load_items(stage) if self._checkpoint is not None else {}
+
+    def _save_item(self, stage: str, url: str, item: Any) -> None:
+        if self._checkpoint is not None:
+            self._checkpoint.save_item(stage, normalize_url(url), to_record(item))
+
+    async def _harvest(self, outbox: asyncio.Queue) -> None:
+        """Feed articles from the scraper's thread into outbox as they qualify."""
+        loop = asyncio.get_running_loop()
+
+        # A resumed run replays the articles it had harvested before topping up
+        replayed = [from_record(NewsArticle, record) for record in self._journal('harvest').values()]
+
+        def hand_on(article: NewsArticle) -> bool:
+            """Queue article, waiting for room downstream; False if the run is being torn down."""
+            self._arrived[article.url] = time.perf_counter()
+            future = asyncio.run_coroutine_threadsafe(outbox.put(article), loop)
+            while True:
+                try:
+                    future.result(timeout=0.5)
+                    return True
+                except FutureTimeoutError:
+                    if self._stopping.is_set():
+                        future.cancel()
+                        return False
+
+        def produce() -> None:
+            if not all(map(hand_on, replayed)):
+                return
+            articles = self._scraper.iter_articles(self.config.harvest.query, already=replayed)
+            try:
+                for article in articles:
+                    self._save_item('harvest', article.url, article)
+                    if not hand_on(article):
+                        return
+            finally:
+                articles.close()
+
+        with self._metrics.stage('harvest'):
+            await loop.run_in_executor(self._executor, bind_metrics(produce))
+        await outbox.put(_DONE)
+
+    async def _workers(
+        self,
+        stage: str,
+        count: int,
+        inbox: asyncio.Queue,
+        outbox: asyncio.Queue,
+        handle: Callable[[List[Any]], Awaitable[List[Any]]],
+        batch_size: int = 1
+    ) -> None:
+        """
+        Pass the items of inbox through handle on count workers and put the
+        results on outbox, then mark outbox done. A worker waits for one
+        item and takes along whatever else is already queued, up to
+        batch_size items, so it never holds an item back waiting for more.
+        """
+        async def worker() -> None:
+            while True:
+                items = [await inbox.get()]
+                while len(items) < batch_size and not inbox.empty():
+                    items.append(inbox.get_nowait())
+                done = items[-1] is _DONE
+                if done:
+                    # Leave the marker for the other workers
+                    items.pop()
+                    inbox.put_nowait(_DONE)
+                for result in (await handle(items) if items else []):
+                    await outbox.put(result)
+                if done:
+                    return
+
+        with self._metrics.stage(stage):
+            await asyncio.gather(*(worker() for _ in range(max(1, count))))
+        await outbox.put(_DONE)
+
+    @staticmethod
+    def _each(handle: Callable[[Any], Awaitable[Any]]) -> Callable[[List[Any]], Awaitable[List[Any]]]:
+        """Adapt a one-item handler to _workers, dropping None results."""
+        async def handle_all(items: List[Any]) -> List[Any]:
+            results = await asyncio.gather(*(handle(item) for item in items))
+            return [result for result in results if result is not None]
+        return handle_all
+
+    async def _fetch(self, article: NewsArticle) -> NewsArticle:
+        if article.content is None:
+            loop = asyncio.get_running_loop()
+            try:
+                with self._metrics.article(article.url, 'fetch'):
+                    content = await loop.run_in_executor(
+                        self._executor, bind_metrics(self._scraper.get_article_content), article
+                    )
+            except Exception as e:
+                logger.warning(f"Error fetching content of {article.url}: {e!r}")
+                content = None
+            if content:
+                article.content = content
+        if article.content:
+            self._metrics.count('with_content')
+        self.articles.append(article)
+        return article
+
+    def _keep(self, article: NewsArticle, summary: ArticleSummary) -> ArticleSummary:
+        if self._store is not None:
+            self._store.put_summary(article, summary)
+        self._save_item('summarize', article.url, summary)
+        self.summaries.append(summary)
+        return summary
+
+    async def _summarize_one(self, article: NewsArticle) -> Optional[ArticleSummary]:
+        try:
+            with self._metrics.article(article.url, 'summarize'):
+                summary = await asyncio.wait_for(
+                    SummarizerAgent._summarize(self._summarizer, article, self._budget, self.config),
+                    timeout=self.config.concurrency.summarizer.timeout_seconds
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error summarizing article {article.url}: {e!r}")
+            return None
+        return self._keep(article, summary)
+
+    async def _summarize_batch(self, articles: List[NewsArticle]) -> List[Optional[ArticleSummary]]:
+        start = time.perf_counter()
+        try:
+            parsed = await asyncio.wait_for(
+                SummarizerAgent._summarize_batch(self._summarizer, articles, self._budget, self.config),
+                timeout=self.config.concurrency.summarizer.timeout_seconds
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Batch of {len(articles)} articles failed, retrying individually: {e!r}")
+            parsed = {}
+        summaries = []
+        for position, summary in parsed.items():
+            self._metrics.record_article(articles[position].url, 'summarize', time.perf_counter() - start)
+            summaries.append(self._keep(articles[position], summary))
+        retry = [article for position, article in enumerate(articles) if position not in parsed]
+        summaries += await asyncio.gather(*(self._summarize_one(article) for article in retry))
+        return summaries
+
+    async def _summarize(self, articles: List[NewsArticle]) -> List[ArticleSummary]:
+        """
+        Summarize the articles a worker took off the queue. Short ones are
+        packed into batched requests as in SummarizerAgent.execute, so a
+        backlog costs fewer calls while an article that arrives alone is
+        summarized at once.
+        """
+        ready, pending = [], []
+        for article in articles:
+            journaled = self._summarized.get(normalize_url(article.url))
+            if journaled is not None:
+                summary = from_record(ArticleSummary, journaled)
+                self.summaries.append(summary)
+                ready.append(summary)
+                continue
+            stored = self._store.get_summary(article) if self._store is not None else None
+            if stored is not None:
+                ready.append(self._keep(article, stored))
+            else:
+                pending.append(article)
+
+        batches, singles = SummarizerAgent._plan_batches(pending, list(range(len(pending))), self.config)
+        results = await asyncio.gather(
+            *(self._summarize_batch([pending[i] for i in batch]) for batch in batches),
+            *(self._summarize_one(pending[i]) for i in singles)
+        )
+        for result in results:
+            ready += [s for s in (result if isinstance(result, list) else [result]) if s is not None]
+        return ready
+
+    async def _verify(self, summary: ArticleSummary) -> VerifiedSummary:
+        journaled = self._verified.get(normalize_url(summary.url))
+        if journaled is not None:
+            return from_record(VerifiedSummary, journaled)
+        verified = self._store.get_verified(summary) if self._store is not None else None
+        if verified is None:
+            settings = self.config.concurrency.verifier
+            try:
+                with self._metrics.article(summary.url, 'verify'):
+                    task_result = await asyncio.wait_for(
+                        VerifierAgent._verify(self._verifier, summary),
+                        timeout=settings.timeout_seconds
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Kept as unverified, like VerifierAgent.execute does
+                logger.error(f"Error verifying summary {summary.url}: {e!r}")
+                return build_verified(summary, None)
+            verified = build_verified(summary, task_result)
+            if self._store is not None:
+                self._store.put_verified(summary, verified)
+        self._save_item('verify', summary.url, verified)
+        return verified
+
+    async def _collect(self, inbox: asyncio.Queue, stories: List[VerifiedSummary]) -> None:
+        """The editor's end of the stream: gather verified summaries as they arrive."""
+        while True:
+            verified = await inbox.get()
+            if verified is _DONE:
+                return
+            arrived = self._arrived.get(verified.url)
+            if arrived is not None:
+                self._metrics.record_article(verified.url, 'end_to_end', time.perf_counter() - arrived)
+            stories.append(verified)
+            logger.info(
+                f"Story {len(stories)} ready: {verified.title} ({verified.verification_status})"
+            )
+
+    async def run(self) -> List[VerifiedSummary]:
+        """
+        Stream today's articles through every stage.
+        Returns the verified summaries ordered by source priority and then
+        recency, like the harvest order of the other modes. Articles whose
+        summarization fails are left out; failed verifications are kept as
+        unverified. Stage times overlap: each is recorded from the start of
+        the run until that stage drained.
+        """
+        self._summarized = self._journal('summarize')
+        self._verified = self._journal('verify')
+        size = self.config.streaming.queue_size
+        harvested, fetched, summarized, verified = (asyncio.Queue(size) for _ in range(4))
+        concurrency = self.config.concurrency
+        summarization = self.config.summarization
+        fetch_workers = self.config.content_fetch.max_workers
+        stories: List[VerifiedSummary] = []
+        # The harvest thread and content downloads get their own threads
+        self._executor = ThreadPoolExecutor(max_workers=fetch_workers + 1, thread_name_prefix='stream')
+
+        stages = [asyncio.ensure_future(stage) for stage in (
+            self._harvest(harvested),
+            self._workers('fetch', fetch_workers, harvested, fetched, self._each(self._fetch)),
+            self._workers(
+                'summarize', concurrency.summarizer.max_concurrent, fetched, summarized, self._summarize,
+                batch_size=summarization.batch_max_articles if summarization.batch_enabled else 1
+            ),
+            self._workers(
+                'verify', concurrency.verifier.max_concurrent_llm, summarized, verified,
+                self._each(self._verify)
+            ),
+            self._collect(verified, stories)
+        )]
+        try:
+            await asyncio.gather(*stages)
+        finally:
+            # A failed stage never feeds the queues the others wait on
+            self._stopping.set()
+            for stage in stages:
+                stage.cancel()
+            await asyncio.gather(*stages, return_exceptions=True)
+            await asyncio.get_running_loop().run_in_executor(
+                None, partial(self._executor.shutdown, wait=True, cancel_futures=True)
+            )
+
+        # Duplicates found after a story was summarized still count as its sources
+        by_url = {normalize_url(article.url): article for article in self.articles}
+        self.articles.sort(
+            key=lambda a: (self._scraper.priority_of(a), -a.published_date.timestamp())
+        )
+        rank = {normalize_url(article.url): position for position, article in enumerate(self.articles)}
+        for story in stories:
+            article = by_url.get(normalize_url(story.url))
+            if article is not None:
+                story.related_urls = list(article.related_urls)
+        stories.sort(key=lambda story: rank.get(normalize_url(story.url), len(rank)))
+        self.summaries.sort(key=lambda summary: rank.get(normalize_url(summary.url), len(rank)))
+        logger.info(
+            f"Streamed {len(self.articles)} articles into {len(stories)} verified stories"
+        )
+        return stories
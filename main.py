@@ -1,75 +1,299 @@
 """
 Main entry point for the AI Daily Digest generator.
+
+Subcommands import what they use when they run: crewai and the agent stack
+are loaded by `run`, `batch` and `daemon` only, so `check`,
+`list-digests`, `search`, `validate-config` and --help start quickly.
 """
 
+import argparse
 import logging
-from crew.ai_daily_crew import AIDailyCrew
-from dotenv import load_dotenv
 import os
-import yaml
+import sys
 from pathlib import Path
 
-def setup_logging():
+# The default command; `python main.py [--mode ...]` still runs a digest
+DEFAULT_COMMAND = 'run'
+
+# crew.ai_daily_crew.MODES, spelled out so --help needs no imports
+RUN_MODES = ('crew', 'pipeline', 'streaming')
+
+REQUIRED_ENV_VARS = ('OPENAI_API_KEY', 'SERPER_API_KEY')
+REQUIRED_PACKAGES = ('crewai', 'requests', 'bs4', 'yaml', 'pydantic', 'dotenv', 'markdown2', 'numpy')
+OPTIONAL_PACKAGES = ('tiktoken', 'httpx', 'h2')
+
+def setup_logging(config):
     """Configure logging settings."""
-    with open("config.yaml", 'r') as f:
-        config = yaml.safe_load(f)
-    
     # Ensure logs directory exists
-    log_file = config['logging']['file']
+    log_file = config.logging.file
     log_dir = os.path.dirname(log_file)
     if log_dir:
         Path(log_dir).mkdir(parents=True, exist_ok=True)
-    
+
     logging.basicConfig(
-        level=getattr(logging, config['logging']['level']),
+        level=getattr(logging, config.logging.level),
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        filename=config['logging']['file']
+        filename=log_file
     )
 
 def check_environment():
     """Verify all required environment variables are set."""
-    required_vars = [
-        'OPENAI_API_KEY',
-        'SERPER_API_KEY'
-    ]
-    
-    missing = [var for var in required_vars if not os.getenv(var)]
-    
+    missing = [var for var in REQUIRED_ENV_VARS if not os.getenv(var)]
+
     if missing:
         raise EnvironmentError(
             f"Missing required environment variables: {', '.join(missing)}"
         )
 
-def main():
-    """Main execution function."""
+def load_app_config(args: argparse.Namespace):
+    """Load .env and the configuration file, and install it for every tool."""
+    from dotenv import load_dotenv
+    from utils.config import DEFAULT_CONFIG_PATH, load_config, set_config
+
+    load_dotenv()
+    config = load_config(args.config or DEFAULT_CONFIG_PATH)
+    set_config(config)
+    return config
+
+def prepare_run(args: argparse.Namespace):
+    """Configuration, logging and environment checks shared by digest-generating commands."""
+    config = load_app_config(args)
+    setup_logging(config)
+    check_environment()
+    return config
+
+def cmd_run(args: argparse.Namespace) -> int:
+    """Generate one digest."""
+    logger = logging.getLogger(__name__)
+    config = prepare_run(args)
+    from crew.ai_daily_crew import AIDailyCrew
+    from crew.checkpoint import RunCheckpoint
+
+    mode = args.mode
+    if mode is None:
+        # A resumed run continues in the mode it was started in
+        mode = RunCheckpoint.open(args.resume, config).mode if args.resume else 'crew'
+    if mode == 'batch':
+        args.editions, args.workers = None, None
+        return cmd_batch(args, config)
+
+    logger.info("Initializing AI Daily Digest generation...")
+    crew = AIDailyCrew(config)
+    run = {'pipeline': crew.run_pipeline, 'streaming': crew.run_streaming}.get(mode, crew.run)
+    if args.resume:
+        digest = run(run_id=args.resume, resume=True)
+    else:
+        digest = run(run_id=args.run_id)
+
+    logger.info("Digest generation completed successfully!")
+    print("\nDigest generated successfully!")
+    print(f"Output: {digest}")
+    return 0
+
+def cmd_batch(args: argparse.Namespace, config=None) -> int:
+    """Generate several editions in one run."""
+    logger = logging.getLogger(__name__)
+    config = config or prepare_run(args)
+    from crew.ai_daily_crew import AIDailyCrew
+
+    paths = AIDailyCrew(config).run_batch(
+        editions=args.editions,
+        run_id=args.resume or args.run_id,
+        resume=bool(args.resume),
+        workers=args.workers
+    )
+    logger.info("Digest generation completed successfully!")
+    print("\nDigests generated successfully!")
+    for name, path in paths.items():
+        print(f"{name}: {path}")
+    return 0
+
+def cmd_daemon(args: argparse.Namespace) -> int:
+    """Run digests on the configured schedule until stopped."""
+    config = prepare_run(args)
+    from crew.scheduler import DigestScheduler
+    from utils.config import DEFAULT_CONFIG_PATH
+
+    DigestScheduler(args.config or DEFAULT_CONFIG_PATH, config=config).serve_forever()
+    return 0
+
+def cmd_validate_config(args: argparse.Namespace) -> int:
+    """Validate the configuration file."""
+    from utils.config import ConfigError
+
+    try:
+        config = load_app_config(args)
+    except ConfigError as e:
+        print(f"Invalid: {e}")
+        return 1
+    print(
+        f"Configuration is valid: {len(config.news_sources)} news sources, "
+        f"{len(config.verification.trusted_domains)} trusted domains, "
+        f"{len(config.editions)} editions"
+    )
+    return 0
+
+def _writable_dir(path: str) -> bool:
+    """Whether path (a directory that may not exist yet) can be created and written."""
+    path = os.path.abspath(path or '.')
+    while not os.path.exists(path):
+        path = os.path.dirname(path)
+    return os.path.isdir(path) and os.access(path, os.W_OK)
+
+def cmd_check(args: argparse.Namespace) -> int:
+    """Check configuration, credentials, packages and paths without running anything."""
+    from importlib.util import find_spec
+    from utils.config import ConfigError
+
+    problems = 0
+
+    def report(ok: bool, message: str, required: bool = True) -> None:
+        nonlocal problems
+        if not ok and required:
+            problems += 1
+        print(f"[{'ok' if ok else ('FAIL' if required else 'warn')}] {message}")
+
+    try:
+        config = load_app_config(args)
+        report(True, "configuration is valid")
+    except ConfigError as e:
+        report(False, f"configuration: {e}")
+        config = None
+
+    for var in REQUIRED_ENV_VARS:
+        report(bool(os.getenv(var)), f"environment variable {var}")
+    for package in REQUIRED_PACKAGES:
+        report(find_spec(package) is not None, f"package {package}")
+    for package in OPTIONAL_PACKAGES:
+        report(find_spec(package) is not None, f"optional package {package}", required=False)
+
+    if config is not None:
+        paths = {
+            'output directory': config.output.output_dir,
+            'log directory': os.path.dirname(config.logging.file),
+            'checkpoint directory': config.checkpoints.dir,
+            'content cache directory': os.path.dirname(config.content_fetch.cache_path),
+        }
+        for label, path in paths.items():
+            report(_writable_dir(path), f"{label} {path or '.'} is writable")
+
+    print("All checks passed." if not problems else f"{problems} check(s) failed.")
+    return 1 if problems else 0
+
+def cmd_list_digests(args: argparse.Namespace) -> int:
+    """List generated digest files, newest first."""
+    from utils.config import ConfigError
+    from utils.digest_index import digest_files
+
+    try:
+        config = load_app_config(args)
+    except ConfigError as e:
+        print(f"Invalid: {e}")
+        return 1
+
+    digests = digest_files(config)
+    if not digests:
+        print(f"No digests in {config.output.output_dir}")
+    for date, path in digests[:args.limit]:
+        print(f"{date}  {path.stat().st_size:>8} B  {path}")
+    return 0
+
+def cmd_search(args: argparse.Namespace) -> int:
+    """Ranked full-text search over past digests, indexing new and changed ones first."""
+    from utils.config import ConfigError
+    from utils.digest_index import DigestIndex
+
+    try:
+        config = load_app_config(args)
+    except ConfigError as e:
+        print(f"Invalid: {e}")
+        return 1
+
+    index = DigestIndex(config.digest_index.path)
+    report = index.update_from_config(config)
+    if report['indexed'] or report['removed']:
+        print(f"Indexed {report['indexed']} digests, dropped {report['removed']}")
+    hits = index.search(' '.join(args.query), days=args.days, source=args.source, limit=args.limit)
+    if not hits:
+        print("No matching stories")
+    for hit in hits:
+        print(f"{hit.date}  {hit.score:6.2f}  {hit.title}")
+        print(f"{'':20}{hit.source + '  ' if hit.source else ''}{hit.url}")
+    return 0
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line options; with no subcommand, `run` is assumed."""
+    parser = argparse.ArgumentParser(description="Generate the AI Daily Digest.")
+    parser.add_argument('--config', help="Configuration file (default: config.yaml)")
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+
+    def add_run_ids(command: argparse.ArgumentParser) -> None:
+        group = command.add_mutually_exclusive_group()
+        group.add_argument('--run-id', help="ID for a new run's checkpoints (default: timestamp)")
+        group.add_argument('--resume', metavar='RUN_ID', help="Resume a failed run from its last checkpoint")
+
+    run = commands.add_parser('run', help="Generate today's digest (default)")
+    run.add_argument(
+        '--mode', choices=RUN_MODES,
+        help="crew: every stage runs as an agent task (default); "
+             "pipeline: harvesting and digest writing run as plain Python stages; "
+             "streaming: like pipeline, with each article passed on as soon as a stage finishes it"
+    )
+    add_run_ids(run)
+    run.set_defaults(handler=cmd_run)
+
+    batch = commands.add_parser('batch', help="Generate the configured editions in one run")
+    batch.add_argument('editions', nargs='*', metavar='EDITION', help="Editions to generate (default: all)")
+    batch.add_argument('--workers', type=int, help="Distinct edition harvests run at once (default: all)")
+    add_run_ids(batch)
+    batch.set_defaults(handler=cmd_batch)
+
+    daemon = commands.add_parser(
+        'daemon',
+        help="Keep running: generate digests at the schedule.times in the configuration "
+             "and on POST /run to the local control endpoint"
+    )
+    daemon.set_defaults(handler=cmd_daemon)
+
+    check = commands.add_parser('check', help="Check configuration, API keys, packages and paths")
+    check.set_defaults(handler=cmd_check)
+
+    validate = commands.add_parser('validate-config', help="Validate the configuration file")
+    validate.set_defaults(handler=cmd_validate_config)
+
+    search = commands.add_parser('search', help="Search past digests, best matches first")
+    search.add_argument('query', nargs='+', help="Words to look for in titles, sources and stories")
+    search.add_argument('--days', type=int, help="Only digests from the last DAYS days")
+    search.add_argument('--source', help="Only stories whose source contains SOURCE")
+    search.add_argument('--limit', type=int, default=20, help="Stories shown (default: 20)")
+    search.set_defaults(handler=cmd_search)
+
+    list_digests = commands.add_parser('list-digests', help="List generated digests, newest first")
+    list_digests.add_argument('--limit', type=int, default=30, help="Digests shown (default: 30)")
+    list_digests.set_defaults(handler=cmd_list_digests)
+
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # Global options may come first; the first other word names the command
+    position = 2 if argv[:1] == ['--config'] else 1 if argv[:1] and argv[0].startswith('--config=') else 0
+    rest = argv[position:]
+    if not rest or (rest[0] not in commands.choices and rest[0] not in ('-h', '--help')):
+        argv.insert(position, DEFAULT_COMMAND)
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    """Main execution function; returns the process exit status."""
+    args = parse_args(argv)
+    logger = logging.getLogger(__name__)
     try:
-        # Load environment variables
-        load_dotenv()
-        
-        # Setup logging
-        setup_logging()
-        logger = logging.getLogger(__name__)
-        
-        # Check environment
-        check_environment()
-        
-        # Create and run the crew
-        logger.info("Initializing AI Daily Digest generation...")
-        crew = AIDailyCrew()
-        digest = crew.run()
-        
-        logger.info("Digest generation completed successfully!")
-        return digest
-        
+        return args.handler(args)
     except Exception as e:
         logger.error(f"Error in main execution: {e}")
         raise
 
 if __name__ == "__main__":
     try:
-        digest = main()
-        print("\nDigest generated successfully!")
-        print(f"Output: {digest}")
+        exit_status = main()
     except Exception as e:
         print(f"\nError: {e}")
-        exit(1) 
\ No newline at end of file
+        exit_status = 1
+    sys.exit(exit_status)
@@ -0,0 +1,255 @@
+"""
+Concurrent article page fetcher that extracts the main text of news articles.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import requests
+from bs4 import BeautifulSoup
+
+from utils.config import AppConfig, ContentFetchSettings, get_config
+from utils.domain_policy import DomainPolicy
+from utils.http_client import HttpClient, get_http_client
+from utils.metrics import bind_metrics, get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Elements that never hold article body text
+_BOILERPLATE_TAGS = [
+    'script', 'style', 'noscript', 'template', 'svg', 'form', 'button',
+    'nav', 'header', 'footer', 'aside', 'iframe', 'figure',
+]
+
+@dataclass
+class CachedContent:
+    """Extracted article text plus the validators needed to revalidate it."""
+    url: str
+    text: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+class ContentCache:
+    """
+    On-disk store of extracted article text, keyed by URL.
+
+    Uses SQLite in WAL mode like the Serper response cache, so several
+    processes can share it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        Path(os.path.dirname(path) or '.').mkdir(parents=True, exist_ok=True)
+        self._connection().execute("""
+            CREATE TABLE IF NOT EXISTS content (
+                url TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL
+            )
+        """)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, url: str) -> Optional[CachedContent]:
+        row = self._connection().execute(
+            "SELECT url, text, etag, last_modified, fetched_at FROM content WHERE url = ?",
+            (url,)
+        ).fetchone()
+        return CachedContent(*row) if row else None
+
+    def put(self, entry: CachedContent) -> None:
+        self._connection().execute(
+            "INSERT OR REPLACE INTO content (url, text, etag, last_modified, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (entry.url, entry.text, entry.etag, entry.last_modified, entry.fetched_at)
+        )
+
+    def touch(self, url: str, fetched_at: float) -> None:
+        """Mark a cached entry as revalidated without changing its text."""
+        self._connection().execute(
+            "UPDATE content SET fetched_at = ? WHERE url = ?", (fetched_at, url)
+        )
+
+class _HostGate:
+    """Per-host politeness: a concurrency cap and a minimum gap between requests."""
+
+    def __init__(self, max_concurrent: int, min_interval: float):
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def __enter__(self):
+        self._slots.acquire()
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self._min_interval
+        if start > now:
+            time.sleep(start - now)
+        return self
+
+    def __exit__(self, *exc):
+        self._slots.release()
+
+def extract_main_text(html: str) -> str:
+    """
+    Extract the readable body of an article page.
+    Prefers <article>, then <main>, then the block with the most paragraph
+    text. Paragraphs are separated by blank lines.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(_BOILERPLATE_TAGS):
+        tag.decompose()
+
+    candidates = soup.find_all('article') or soup.find_all('main')
+    if not candidates:
+        # Score each paragraph's parent by the amount of paragraph text it holds
+        scores: Dict[int, int] = {}
+        parents = {}
+        for paragraph in soup.find_all('p'):
+            parent = paragraph.parent
+            if parent is None:
+                continue
+            scores[id(parent)] = scores.get(id(parent), 0) + len(paragraph.get_text(strip=True))
+            parents[id(parent)] = parent
+        if scores:
+            candidates = [parents[max(scores, key=scores.get)]]
+        else:
+            candidates = [soup.body or soup]
+
+    root = max(candidates, key=lambda node: len(node.get_text(strip=True)))
+    paragraphs = [
+        ' '.join(node.get_text(' ', strip=True).split())
+        for node in root.find_all(['p', 'h2', 'h3', 'li', 'blockquote'])
+    ]
+    paragraphs = [p for p in paragraphs if p]
+    if not paragraphs:
+        text = root.get_text('\n', strip=True)
+        paragraphs = [line for line in text.splitlines() if line.strip()]
+    return '\n\n'.join(paragraphs)
+
+class ArticleContentFetcher:
+    """
+    Downloads article pages concurrently and returns their extracted text.
+
+    Requests are capped per host and spaced out by a minimum interval.
+    Bodies are streamed and cut off at max_bytes. Extracted text is kept
+    on disk: a recently fetched URL is served from the cache without any
+    request, and an older one is revalidated with a conditional GET
+    (If-None-Match / If-Modified-Since), so an unchanged page is never
+    downloaded or parsed twice.
+    """
+
+    def __init__(
+        self,
+        settings: ContentFetchSettings,
+        http: Optional[HttpClient] = None,
+        cache: Optional[ContentCache] = None
+    ):
+        self.settings = settings
+        self._http = http or get_http_client()
+        self._cache = cache or ContentCache(settings.cache_path)
+        self._gates: Dict[str, _HostGate] = {}
+        self._gates_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Optional[AppConfig] = None) -> 'ArticleContentFetcher':
+        config = config or get_config()
+        return cls(config.content_fetch, http=get_http_client(config))
+
+    def _gate(self, url: str) -> _HostGate:
+        host = DomainPolicy.normalize_host(url)
+        with self._gates_lock:
+            gate = self._gates.get(host)
+            if gate is None:
+                gate = _HostGate(
+                    self.settings.max_per_host,
+                    self.settings.per_host_delay_seconds
+                )
+                self._gates[host] = gate
+            return gate
+
+    def fetch(self, url: str) -> Optional[str]:
+        """Return the extracted main text of the page at url, or None."""
+        cached = self._cache.get(url)
+        now = time.time()
+        if cached and now - cached.fetched_at < self.settings.revalidate_after_seconds:
+            get_metrics().record_cache('content', hit=True)
+            return cached.text or None
+
+        headers = {
+            'User-Agent': self.settings.user_agent,
+            'Accept': 'text/html,application/xhtml+xml',
+        }
+        if cached and cached.etag:
+            headers['If-None-Match'] = cached.etag
+        if cached and cached.last_modified:
+            headers['If-Modified-Since'] = cached.last_modified
+
+        try:
+            with self._gate(url):
+                response = self._http.get_capped(
+                    url, self.settings.max_bytes, headers=headers
+                )
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Error fetching article content from {url}: {e}")
+            return cached.text if cached and cached.text else None
+
+        if response.status_code == 304 and cached:
+            self._cache.touch(url, now)
+            get_metrics().record_cache('content', hit=True)
+            return cached.text or None
+        get_metrics().record_cache('content', hit=False)
+        if response.status_code != 200:
+            logger.warning(f"Article fetch for {url} returned status {response.status_code}")
+            return cached.text if cached and cached.text else None
+
+        content_type = response.headers.get('Content-Type', '')
+        if content_type and 'html' not in content_type:
+            logger.info(f"Skipping non-HTML article content at {url} ({content_type})")
+            text = ''
+        else:
+            try:
+                text = extract_main_text(response.text)
+            except Exception as e:
+                logger.warning(f"Error extracting article text from {url}: {e}")
+                text = ''
+            if len(text) < self.settings.min_text_chars:
+                text = ''
+
+        # Empty results are cached too, so pages without usable text are not refetched
+        self._cache.put(CachedContent(
+            url=url,
+            text=text,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified'),
+            fetched_at=now
+        ))
+        return text or None
+
+    def fetch_many(self, urls: Iterable[str]) -> List[Optional[str]]:
+        """Fetch several pages concurrently; results are in the order of urls."""
+        urls = list(urls)
+        if not urls:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.settings.max_workers, len(urls))) as pool:
+            return list(pool.map(bind_metrics(self.fetch), urls))
@@ -0,0 +1,251 @@
+"""
+Deterministic digest renderer: Markdown, HTML and JSON from verified summaries.
+"""
+
+import json
+import logging
+import os
+import re
+import tempfile
+from dataclasses import asdict
+from datetime import datetime
+from html import escape
+from pathlib import Path
+from string import Template
+from typing import TYPE_CHECKING, Dict, List, Optional
+from urllib.parse import quote
+
+import markdown2
+
+from utils.config import AppConfig, get_config
+
+if TYPE_CHECKING:
+    from agents.verifier_agent import VerifiedSummary
+
+logger = logging.getLogger(__name__)
+
+SUFFIXES = {'markdown': '.md', 'html': '.html', 'json': '.json'}
+_LINK_TEXT_RE = re.compile(r"([\\`*_{}\[\]()<>#!|])")
+# Characters a URL keeps as they are; spaces, parentheses and angle brackets
+# would end a Markdown link destination early
+_URL_SAFE = ":/?#[]@!$&'*+,;=%~"
+
+# Built-in templates; output.template_dir may hold files of the same names
+# to override them. Empty blocks collapse, so optional parts need no markup.
+TEMPLATES = {
+    'digest.md': """# $title
+
+*$date*
+
+$intro
+
+$stories
+""",
+    'story.md': """## [$title]($url)
+
+*$source, $published*
+
+$coverage
+
+$storyline
+
+$summary
+
+$key_points
+
+**Verification:** $status (confidence $confidence)
+
+$sources
+
+$related
+""",
+    'page.html': """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>$title</title>
+<style>
+body { font-family: -apple-system, "Segoe UI", Helvetica, Arial, sans-serif; line-height: 1.55; color: #1f2328; }
+main { max-width: 46rem; margin: 2rem auto; padding: 0 1rem; }
+h2 { margin-top: 2.2rem; font-size: 1.25rem; }
+a { color: #0969da; }
+</style>
+</head>
+<body>
+<main>
+$body
+</main>
+</body>
+</html>
+""",
+}
+
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+def _atomic_write(path: str, text: str) -> None:
+    """Write text to path via a temp file and rename, so readers never see a partial digest."""
+    Path(os.path.dirname(path) or '.').mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=f".{os.path.basename(path)}.")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+def digest_path(config: Optional[AppConfig] = None, date: Optional[datetime] = None) -> str:
+    """Where the Markdown digest for date (default today) is written, per the output settings."""
+    output = (config or get_config()).output
+    date = date or datetime.now()
+    return os.path.join(output.output_dir, output.filename_format.format(date=date.strftime("%Y-%m-%d")))
+
+def default_intro(stories: List['VerifiedSummary']) -> str:
+    return (
+        f"Today's digest covers {len(stories)} AI news "
+        f"{'story' if len(stories) == 1 else 'stories'}."
+    )
+
+def _link_text(text: str) -> str:
+    """Escape Markdown metacharacters in text shown as a link."""
+    return _LINK_TEXT_RE.sub(r"\\\1", " ".join(text.split()))
+
+def _link_url(url: str) -> str:
+    """Percent-encode what would break a URL out of a Markdown link."""
+    return quote(url.strip(), safe=_URL_SAFE)
+
+class DigestRenderer:
+    """
+    Lays out verified summaries with templates, without an LLM call.
+
+    One render produces the Markdown digest, an HTML page converted from it
+    with markdown2, and a JSON document of the structured stories; write()
+    saves the configured output.formats side by side, each atomically.
+    """
+
+    def __init__(self, config: Optional[AppConfig] = None):
+        self.config = config or get_config()
+        self._templates = {name: Template(text) for name, text in TEMPLATES.items()}
+        template_dir = self.config.output.template_dir
+        if template_dir:
+            for name in TEMPLATES:
+                path = Path(template_dir) / name
+                if path.exists():
+                    self._templates[name] = Template(path.read_text(encoding='utf-8'))
+
+    def paths(self, date: Optional[datetime] = None) -> Dict[str, str]:
+        """Output file of each configured format; HTML and JSON swap the Markdown file's suffix."""
+        markdown = digest_path(self.config, date)
+        stem = os.path.splitext(markdown)[0]
+        return {
+            fmt: markdown if fmt == 'markdown' else stem + SUFFIXES[fmt]
+            for fmt in self.config.output.formats
+        }
+
+    def _story(self, story: 'VerifiedSummary') -> str:
+        sources = []
+        for source in story.verification_sources:
+            url = source.get('url', '')
+            sources.append(
+                f"- [{_link_text(source.get('title') or url)}]({_link_url(url)})" if url
+                else f"- {source.get('title', '')}"
+            )
+        related = ''
+        if story.related_urls:
+            related = "Also reported at: " + ", ".join(f"<{_link_url(url)}>" for url in story.related_urls)
+        coverage = ''
+        if story.previous_coverage:
+            earlier = story.previous_coverage
+            coverage = f"*Previously covered on {earlier['date']}: [{_link_text(earlier['title'])}]({_link_url(earlier['url'])})*"
+        storyline = ''
+        if story.storyline and story.storyline['articles'] > 1:
+            thread = story.storyline
+            storyline = (
+                f"*Developing story since {thread['since']} "
+                f"({thread['articles']} articles): {thread['title']}*"
+            )
+        return self._templates['story.md'].safe_substitute(
+            title=_link_text(story.title),
+            url=_link_url(story.url),
+            source=story.source,
+            published=story.published_date.strftime('%Y-%m-%d'),
+            summary=story.summary.strip(),
+            key_points="\n".join(f"- {point}" for point in story.key_points),
+            status=story.verification_status,
+            confidence=f"{story.confidence_score:.0%}",
+            sources="\n".join(sources),
+            related=related,
+            coverage=coverage,
+            storyline=storyline
+        )
+
+    def markdown(
+        self,
+        stories: List['VerifiedSummary'],
+        title: str = "AI News Digest",
+        date: Optional[datetime] = None,
+        intro: Optional[str] = None
+    ) -> str:
+        """The Markdown digest; stories keep the order they are given in."""
+        date = date or datetime.now()
+        text = self._templates['digest.md'].safe_substitute(
+            title=title,
+            date=date.strftime('%B %d, %Y'),
+            intro=(intro or default_intro(stories)).strip(),
+            stories="\n\n".join(self._story(story) for story in stories)
+        )
+        return _BLANK_LINES.sub("\n\n", text).strip() + "\n"
+
+    def html(self, markdown: str, title: str = "AI News Digest") -> str:
+        """A standalone HTML page of a Markdown digest; raw HTML in the Markdown is escaped."""
+        body = markdown2.markdown(markdown, safe_mode='escape', extras=['cuddled-lists'])
+        return self._templates['page.html'].safe_substitute(title=escape(title), body=body.strip())
+
+    def json(
+        self,
+        stories: List['VerifiedSummary'],
+        title: str = "AI News Digest",
+        date: Optional[datetime] = None,
+        intro: Optional[str] = None
+    ) -> str:
+        date = date or datetime.now()
+        records = []
+        for story in stories:
+            record = asdict(story)
+            record['published_date'] = story.published_date.isoformat()
+            records.append(record)
+        return json.dumps({
+            'title': title,
+            'date': date.strftime('%Y-%m-%d'),
+            'intro': (intro or default_intro(stories)).strip(),
+            'stories': records,
+        }, indent=2, ensure_ascii=False) + "\n"
+
+    def render(
+        self,
+        stories: List['VerifiedSummary'],
+        title: str = "AI News Digest",
+        date: Optional[datetime] = None,
+        intro: Optional[str] = None
+    ) -> Dict[str, str]:
+        """Every configured format's document by format; Markdown is always included."""
+        date = date or datetime.now()
+        markdown = self.markdown(stories, title, date, intro)
+        documents = {'markdown': markdown}
+        formats = self.config.output.formats
+        if 'html' in formats:
+            documents['html'] = self.html(markdown, title)
+        if 'json' in formats:
+            documents['json'] = self.json(stories, title, date, intro)
+        return documents
+
+    def write(self, documents: Dict[str, str], date: Optional[datetime] = None) -> Dict[str, str]:
+        """Save the configured formats among documents; returns the written paths by format."""
+        written = {}
+        for fmt, path in self.paths(date).items():
+            if fmt in documents:
+                _atomic_write(path, documents[fmt])
+                written[fmt] = path
+        logger.info(f"Wrote digest: {', '.join(written.values())}")
+        return written
@@ -5,15 +5,19 @@ News scraper tool for fetching AI-related news articles using Serper.dev API.
 import os
 from datetime import datetime, timedelta
 import requests
-from typing import List, Dict, Optional, ClassVar
-from dataclasses import dataclass
-import yaml
+from typing import Callable, Iterator, List, Dict, Optional, ClassVar, Sequence
+from dataclasses import dataclass, field
 import logging
-from pathlib import Path
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field, PrivateAttr
-from urllib.parse import urlparse
 import json
+from utils.config import AppConfig, get_config
+from utils.domain_policy import DomainPolicy
+from utils.serper_client import SerperClient
+from tools.content_fetcher import ArticleContentFetcher
+from tools.source_harvester import QueryMemo, SourceHarvester
+from utils.dedup import DedupReport, StoryDeduplicator
+from utils.metrics import get_metrics
 
 @dataclass
 class NewsArticle:
@@ -24,6 +28,7 @@ class NewsArticle:
     published_date: datetime
     snippet: str
     content: Optional[str] = None
+    related_urls: List[str] = field(default_factory=list)
 
 class NewsScraperToolSchema(BaseModel):
     """Schema for the news scraper tool input."""
@@ -39,38 +44,46 @@ class NewsScraperTool(BaseTool):
     description: str = "Fetch recent AI news articles from trusted sources"
     args_schema: type[BaseModel] = NewsScraperToolSchema
     logger: ClassVar[logging.Logger] = logging.getLogger(__name__)
-    _config: Dict = PrivateAttr()
+    _config: AppConfig = PrivateAttr()
     _api_key: str = PrivateAttr()
+    _serper: SerperClient = PrivateAttr()
+    _fetcher: Optional[ArticleContentFetcher] = PrivateAttr(default=None)
+    _search: Callable[[Dict], List[Dict]] = PrivateAttr()
+    _harvester: SourceHarvester = PrivateAttr()
+    _deduplicator: Optional[StoryDeduplicator] = PrivateAttr(default=None)
+    _last_dedup_report: Optional[DedupReport] = PrivateAttr(default=None)
 
-    def __init__(self):
+    def __init__(self, config: Optional[AppConfig] = None, memo: Optional[QueryMemo] = None):
+        """memo, if given, shares news query results with other scrapers using it."""
         super().__init__()
-        self._config = self._load_config()
+        self._config = config or get_config()
         self._api_key = os.getenv("SERPER_API_KEY")
         if not self._api_key:
             raise ValueError("SERPER_API_KEY environment variable not set")
+        self._serper = SerperClient(self._api_key, self._config)
+        if self._config.content_fetch.enabled:
+            self._fetcher = ArticleContentFetcher.from_config(self._config)
+        self._search = self._search_news if memo is None else memo.wrap(self._search_news)
+        self._harvester = SourceHarvester(self._config, self._search, self._qualify)
+        dedup = self._config.dedup
+        if dedup.enabled:
+            self._deduplicator = StoryDeduplicator(
+                similarity_threshold=dedup.similarity_threshold,
+                num_permutations=dedup.num_permutations,
+                bands=dedup.bands
+            )
         self.logger.info("NewsScraperTool initialized with API key")
 
-    def _load_config(self) -> Dict:
-        """Load configuration from config.yaml."""
-        with open("config.yaml", 'r') as f:
-            return yaml.safe_load(f)
-
     def _extract_domain(self, url: str) -> str:
         """Extract domain from URL."""
-        try:
-            domain = urlparse(url).netloc
-            if domain.startswith('www.'):
-                domain = domain[4:]
-            return domain
-        except Exception as e:
-            self.logger.error(f"Error extracting domain from URL {url}: {e}")
-            return ""
+        domain = DomainPolicy.normalize_host(url)
+        if not domain:
+            self.logger.error(f"Error extracting domain from URL {url}")
+        return domain
 
     def _is_trusted_domain(self, url: str) -> bool:
-        """Check if the domain is in the trusted domains list."""
-        domain = self._extract_domain(url)
-        trusted_domains = self._config['verification']['trusted_domains']
-        return any(domain.endswith(trusted) for trusted in trusted_domains)
+        """Check if the domain falls under a trusted, non-denied domain."""
+        return self._config.verification.domain_policy.is_allowed(url)
 
     def _parse_date(self, date_str: str) -> Optional[datetime]:
         """Parse date string from Serper API."""
@@ -89,68 +102,153 @@ class NewsScraperTool(BaseTool):
             self.logger.error(f"Error parsing date {date_str}: {e}")
             return None
 
-    def _fetch_articles(self, query: str) -> List[NewsArticle]:
-        """Fetch articles from Serper API."""
-        self.logger.info(f"Starting news fetch with query: {query}")
-        
-        headers = {
-            "X-API-KEY": self._api_key,
-            "Content-Type": "application/json"
-        }
+    def _search_news(self, payload: Dict) -> List[Dict]:
+        """Run one Serper news query and return its raw result items."""
+        self.logger.info(f"Making Serper API request for query: {payload['q']}")
+        data = self._serper.search(self._config.api.serper.endpoint, payload)
+        self.logger.info(f"Raw response: {json.dumps(data)[:1000]}...")  # Log first 1000 chars
+        news_items = data.get('news', [])
+        self.logger.info(f"Received {len(news_items)} news items")
+        get_metrics().count('search_results', len(news_items))
+        return news_items
+
+    def _qualify(self, item: Dict) -> Optional[NewsArticle]:
+        """Turn a result item into a NewsArticle if it is trusted and recent enough."""
+        domain = self._extract_domain(item['link'])
+        self.logger.info(f"Processing article from domain: {domain}")
         
-        payload = {
-            "q": query,
-            "type": "news",
-            "num": 10
-        }
+        if not self._is_trusted_domain(item['link']):
+            get_metrics().count('filtered_untrusted')
+            return None
 
-        self.logger.info("Making Serper API request...")
-        try:
-            response = requests.post(
-                self._config['api']['serper']['endpoint'],
-                headers=headers,
-                json=payload
-            )
-            response.raise_for_status()
-            self.logger.info(f"Serper API response status: {response.status_code}")
-            self.logger.info(f"Raw response: {response.text[:1000]}...")  # Log first 1000 chars
-            
-            data = response.json()
-            news_items = data.get('news', [])
-            self.logger.info(f"Received {len(news_items)} news items")
-
-            articles = []
-            for item in news_items:
-                domain = self._extract_domain(item['link'])
-                self.logger.info(f"Processing article from domain: {domain}")
-                
-                if not self._is_trusted_domain(item['link']):
-                    continue
+        published_date = self._parse_date(item.get('date', ''))
+        if not published_date:
+            get_metrics().count('filtered_undated')
+            return None
 
-                published_date = self._parse_date(item.get('date', ''))
-                if not published_date:
-                    continue
+        lookback = timedelta(hours=self._config.time_settings.lookback_hours)
+        if datetime.now() - published_date > lookback:
+            get_metrics().count('filtered_stale')
+            return None
 
-                lookback_hours = self._config['time_settings']['lookback_hours']
-                if datetime.now() - published_date > timedelta(hours=lookback_hours):
-                    continue
+        return NewsArticle(
+            title=item['title'],
+            url=item['link'],
+            source=item.get('source', domain),
+            published_date=published_date,
+            snippet=item.get('snippet', ''),
+        )
 
-                article = NewsArticle(
-                    title=item['title'],
-                    url=item['link'],
-                    source=item.get('source', domain),
-                    published_date=published_date,
-                    snippet=item.get('snippet', ''),
-                )
-                articles.append(article)
+    def _fetch_articles(self, query: str) -> List[NewsArticle]:
+        """Fetch articles from Serper API."""
+        self.logger.info(f"Starting news fetch with query: {query}")
+        
+        try:
+            if self._config.harvest.mode == 'fanout':
+                articles = self._harvester.harvest(query)
+            else:
+                news_items = self._search({
+                    "q": query,
+                    "type": "news",
+                    "num": 10
+                })
+                articles = [a for a in map(self._qualify, news_items) if a is not None]
 
             self.logger.info(f"Successfully fetched {len(articles)} articles")
-            return articles[:self._config['article_limits']['max_articles_per_day']]
+            metrics = get_metrics()
+            metrics.count('candidates', len(articles))
+            articles = self.deduplicate(articles)
+            metrics.count('after_dedup', len(articles))
+            articles = articles[:self._config.article_limits.max_articles_per_day]
+            metrics.count('kept', len(articles))
+            self._fill_content(articles)
+            metrics.count('with_content', sum(1 for a in articles if a.content))
+            return articles
 
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Error fetching news: {e}")
             return []
 
+    def iter_articles(self, query: str, already: Sequence[NewsArticle] = ()) -> Iterator[NewsArticle]:
+        """
+        Yield qualified, de-duplicated articles as the queries return, up to
+        max_articles_per_day, without their content.
+        Unlike _fetch_articles this does not wait for the whole harvest:
+        duplicates are detected incrementally from titles and snippets, the
+        first copy of a story is kept, and closing the iterator stops the
+        queries still pending. Articles in already (kept earlier, say by a
+        run being resumed) count toward the limit and are not yielded again.
+        """
+        limit = self._config.article_limits.max_articles_per_day
+        if len(already) >= limit:
+            return
+        self.logger.info(f"Starting streaming news fetch with query: {query}")
+        if self._config.harvest.mode == 'fanout':
+            candidates = self._harvester.iter_candidates(query)
+        else:
+            try:
+                news_items = self._search({"q": query, "type": "news", "num": 10})
+            except requests.exceptions.RequestException as e:
+                self.logger.error(f"Error fetching news: {e}")
+                return
+            candidates = (a for a in map(self._qualify, news_items) if a is not None)
+
+        stream = self._deduplicator.stream() if self._deduplicator is not None else None
+        seen = {article.url for article in already}
+        if stream is not None:
+            for article in already:
+                stream.add(article)
+        metrics = get_metrics()
+        kept = len(already)
+        try:
+            for article in candidates:
+                if article.url in seen:
+                    continue
+                metrics.count('candidates')
+                if stream is not None and stream.add(article) is not None:
+                    continue
+                metrics.count('after_dedup')
+                metrics.count('kept')
+                kept += 1
+                yield article
+                if kept >= limit:
+                    break
+        finally:
+            if hasattr(candidates, 'close'):
+                candidates.close()
+        if stream is not None:
+            self.logger.info(
+                f"Streamed {kept} articles; {stream.duplicates_removed} duplicates dropped"
+            )
+
+    def priority_of(self, article: NewsArticle) -> int:
+        """Rank of the article's source (lower is better)."""
+        return self._harvester.priority_of(article)
+
+    def deduplicate(self, articles: List[NewsArticle]) -> List[NewsArticle]:
+        """
+        Collapse articles covering the same story into one, keeping the copy
+        from the highest-priority source and attributing the rest.
+        """
+        if self._deduplicator is None or len(articles) < 2:
+            return articles
+        articles, self._last_dedup_report = self._deduplicator.deduplicate(
+            articles, priority=self._harvester.priority_of
+        )
+        return articles
+
+    def _fill_content(self, articles: List[NewsArticle]) -> None:
+        """Download and attach the full text of each article concurrently."""
+        if self._fetcher is None or not articles:
+            return
+        contents = self._fetcher.fetch_many(article.url for article in articles)
+        for article, content in zip(articles, contents):
+            if content:
+                article.content = content
+        self.logger.info(
+            f"Fetched full content for {sum(1 for c in contents if c)} of {len(articles)} articles"
+        )
+
     def _run(self, query: str) -> str:
         """Run the news scraper tool."""
         articles = self._fetch_articles(query)
@@ -160,17 +258,26 @@ class NewsScraperTool(BaseTool):
         
         # Convert articles to JSON-serializable format
         articles_data = []
+        max_content_chars = self._config.content_fetch.max_tool_output_chars
         for article in articles:
-            articles_data.append({
+            article_data = {
                 "title": article.title,
                 "url": article.url,
                 "source": article.source,
                 "published_date": article.published_date.isoformat(),
                 "snippet": article.snippet
-            })
+            }
+            if article.related_urls:
+                article_data["related_urls"] = article.related_urls
+            if article.content and max_content_chars:
+                article_data["content"] = article.content[:max_content_chars]
+            articles_data.append(article_data)
         
         return json.dumps(articles_data)
 
     def get_article_content(self, article: NewsArticle) -> Optional[str]:
-        """Get the full content of an article (placeholder for future implementation)."""
-        return None 
\ No newline at end of file
+        """Get the full content of an article, or None if it cannot be fetched."""
+        if self._fetcher is None:
+            return None
+        return self._fetcher.fetch(article.url)
+ 
\ No newline at end of file
@@ -3,14 +3,18 @@ Search tool for verifying claims using Serper.dev API.
 """
 
 import os
-from typing import List, Dict, Optional
+import threading
+from typing import List, Dict, Optional, ClassVar
 import requests
 import logging
 from dataclasses import dataclass
 from datetime import datetime
-import yaml
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
+from utils.config import AppConfig, get_config
+from utils.domain_policy import DomainPolicy
+from utils.metrics import get_metrics
+from utils.serper_client import SerperClient
 
 @dataclass
 class SearchResult:
@@ -40,52 +44,63 @@ class VerifyClaimTool(BaseTool):
     description: str = "Verify a specific claim by searching trusted sources"
     args_schema: type[BaseModel] = VerifyClaimToolSchema
     
-    config: Dict = Field(default_factory=dict)
+    config: AppConfig = Field(default_factory=get_config)
     serper_api_key: Optional[str] = Field(default=None)
     
-    def __init__(self, config_path: str = "config.yaml", **data):
+    # Shared by every instance so the limit holds across all verifier tools;
+    # keyed by the limit so a reloaded config with a new one takes effect
+    _serper_slots: ClassVar[Dict[int, threading.BoundedSemaphore]] = {}
+    _serper_slots_lock: ClassVar[threading.Lock] = threading.Lock()
+    
+    def __init__(self, config: Optional[AppConfig] = None, **data):
         """Initialize the search tool."""
+        if config is not None:
+            data['config'] = config
         super().__init__(**data)
-        self._load_config(config_path)
         self.serper_api_key = os.getenv("SERPER_API_KEY")
         if not self.serper_api_key:
             raise ValueError("SERPER_API_KEY environment variable not set")
 
-    def _load_config(self, config_path: str) -> None:
-        """Load configuration from yaml file."""
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+    def _serper_slot(self) -> threading.BoundedSemaphore:
+        """The process-wide Serper concurrency limit this tool's config sets."""
+        limit = self.config.concurrency.verifier.max_concurrent_serper
+        with VerifyClaimTool._serper_slots_lock:
+            slots = VerifyClaimTool._serper_slots.get(limit)
+            if slots is None:
+                slots = VerifyClaimTool._serper_slots[limit] = threading.BoundedSemaphore(limit)
+            return slots
 
     def _run(self, claim: str) -> List[SearchResult]:
         """
         Search for verification of a specific claim.
-        Returns a list of relevant search results that can verify the claim.
+        Returns a list of relevant search results that can verify the claim;
+        if the search fails after its retries, or Serper's circuit breaker
+        is open, returns no results so the claim is left unverified rather
+        than failing the run.
         """
         logging.info(f"Verifying claim: {claim}")
-        num_sources = self.config['verification']['min_sources']
+        num_sources = self.config.verification.min_sources
         
         try:
-            response = requests.post(
-                self.config['api']['serper']['endpoint'],
-                headers={
-                    "X-API-KEY": self.serper_api_key,
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "q": claim,
-                    "num": num_sources
-                }
-            )
-            response.raise_for_status()
+            endpoint = self.config.api.serper.verification_endpoint
+            with self._serper_slot():
+                data = SerperClient(self.serper_api_key, self.config).search(
+                    endpoint,
+                    {
+                        "q": claim,
+                        "num": num_sources
+                    }
+                )
             
-            search_data = response.json().get("organic", [])
+            search_data = data.get("organic", [])
             results = []
             
             for item in search_data:
                 try:
                     # Check if the source domain is trusted
-                    domain = self._extract_domain(item.get("link", ""))
-                    if domain in self.config['verification']['trusted_domains']:
+                    link = item.get("link", "")
+                    domain = self._extract_domain(link)
+                    if self.config.verification.domain_policy.is_allowed(link):
                         result = SearchResult(
                             title=item.get("title", ""),
                             url=item.get("link", ""),
@@ -103,16 +118,13 @@ class VerifyClaimTool(BaseTool):
             return results
             
         except requests.exceptions.RequestException as e:
-            logging.error(f"Error performing verification search: {e}")
-            raise
+            logging.error(f"Error performing verification search, leaving the claim unverified: {e}")
+            get_metrics().count('verification_search_failed')
+            return []
 
     def _extract_domain(self, url: str) -> str:
         """Extract the domain from a URL."""
-        try:
-            from urllib.parse import urlparse
-            return urlparse(url).netloc
-        except Exception:
-            return url
+        return DomainPolicy.normalize_host(url) or url
 
     def _parse_date(self, date_str: Optional[str]) -> Optional[datetime]:
         """Parse date string into datetime object."""
@@ -138,5 +150,5 @@ class CheckVerificationTool(BaseTool):
         Returns True if the minimum number of trusted sources verify the claim.
         """
         results = self.verify_tool._run(claim)
-        min_sources = self.verify_tool.config['verification']['min_sources']
+        min_sources = self.verify_tool.config.verification.min_sources
         return len(results) >= min_sources 
\ No newline at end of file
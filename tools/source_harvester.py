@@ -0,0 +1,226 @@
+"""
+Concurrent multi-source news harvesting driven by the configured news_sources.
+"""
+
+import json
+import logging
+import math
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional
+
+from utils.config import AppConfig
+from utils.domain_policy import DomainPolicy
+from utils.metrics import bind_metrics
+
+if TYPE_CHECKING:
+    from tools.news_scraper_tool import NewsArticle
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class HarvestQuery:
+    """One Serper news query, optionally pinned to a configured source."""
+    q: str
+    priority: int
+    source: Optional[str] = None
+    page: int = 1
+
+class QueryMemo:
+    """
+    Single-flight memo of news queries shared by several harvests.
+
+    The first harvest to issue a query runs it; concurrent and later
+    harvests issuing the same payload wait for and reuse its result, so
+    editions with overlapping queries search once. Failures are not
+    remembered.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results: Dict[str, Future] = {}
+
+    def wrap(self, search: Callable[[Dict], List[Dict]]) -> Callable[[Dict], List[Dict]]:
+        def memoized(payload: Dict) -> List[Dict]:
+            key = json.dumps(payload, sort_keys=True)
+            with self._lock:
+                future = self._results.get(key)
+                owner = future is None
+                if owner:
+                    future = self._results[key] = Future()
+            if not owner:
+                return list(future.result())
+            try:
+                future.set_result(search(payload))
+            except BaseException as e:
+                with self._lock:
+                    del self._results[key]
+                future.set_exception(e)
+                raise
+            return list(future.result())
+        return memoized
+
+class SourceHarvester:
+    """
+    Fans a harvest out into per-source and per-topic queries run concurrently.
+
+    Each configured news source gets a site-restricted query and each
+    configured topic a general one. Result pages are merged as they arrive:
+    duplicates and unqualified results are dropped and the per-source cap is
+    applied immediately. Further pages are requested only while a query
+    keeps returning full pages, and the harvest stops once enough qualified
+    candidates have been collected that no outstanding query could outrank
+    by source priority.
+    """
+
+    def __init__(
+        self,
+        config: AppConfig,
+        search: Callable[[Dict], List[Dict]],
+        qualify: Callable[[Dict], Optional['NewsArticle']]
+    ):
+        self._config = config
+        self._settings = config.harvest
+        self._search = search
+        self._qualify = qualify
+        self._source_hosts = {
+            DomainPolicy.normalize_host(source.url): source.name
+            for source in config.news_sources
+        }
+        self._default_priority = len(config.news_sources) + 1
+
+    def queries(self, query: str) -> List[HarvestQuery]:
+        """First-page queries, highest priority first."""
+        queries = [
+            HarvestQuery(
+                q=f"{query} site:{DomainPolicy.normalize_host(source.url)}",
+                priority=source.priority,
+                source=source.name
+            )
+            for source in sorted(self._config.news_sources, key=lambda s: s.priority)
+        ]
+        for q in dict.fromkeys(self._topic_query(topic, query) for topic in self._settings.topics):
+            queries.append(HarvestQuery(q=q, priority=self._default_priority))
+        if not self._settings.topics:
+            queries.append(HarvestQuery(q=query, priority=self._default_priority))
+        return queries
+
+    @staticmethod
+    def _topic_query(topic: str, query: str) -> str:
+        """The topic narrowed by the words of query it does not already contain."""
+        words = {word.lower() for word in topic.split()}
+        return ' '.join([topic] + [word for word in query.split() if word.lower() not in words]).strip()
+
+    def source_of(self, article: 'NewsArticle') -> str:
+        """Configured source name for an article's host, else its own source label."""
+        labels = DomainPolicy.normalize_host(article.url).split('.')
+        for i in range(len(labels) - 1):
+            name = self._source_hosts.get('.'.join(labels[i:]))
+            if name:
+                return name
+        return article.source
+
+    def priority_of(self, article: 'NewsArticle') -> int:
+        priority = self._config.source_priority(self.source_of(article))
+        return priority if priority is not None else self._default_priority
+
+    @staticmethod
+    def _url_key(url: str) -> str:
+        return url.split('#', 1)[0].rstrip('/').lower()
+
+    def iter_candidates(self, query: str) -> Iterator['NewsArticle']:
+        """
+        Yield qualified, de-duplicated candidates in arrival order while the
+        queries run, enforcing the per-source cap as they are merged.
+
+        Queries return in no particular order, so the harvest only stops
+        early once the target number of candidates is reached counting only
+        those at least as high in source priority as every query still
+        outstanding: a fast low-priority topic query cannot take the place
+        of a slower high-priority source.
+        """
+        per_source_cap = self._config.article_limits.max_articles_per_source
+        target = math.ceil(
+            self._config.article_limits.max_articles_per_day * self._settings.candidate_multiplier
+        )
+        per_page = self._settings.results_per_page
+        seen = set()
+        per_source: Dict[str, int] = {}
+        per_priority: Dict[int, int] = {}
+        accepted = 0
+
+        search = bind_metrics(self._search)
+        with ThreadPoolExecutor(max_workers=self._settings.max_workers) as pool:
+            pending: Dict[Future, HarvestQuery] = {}
+
+            def submit(harvest_query: HarvestQuery) -> None:
+                payload = {"q": harvest_query.q, "type": "news", "num": per_page}
+                if harvest_query.page > 1:
+                    payload["page"] = harvest_query.page
+                pending[pool.submit(search, payload)] = harvest_query
+
+            for harvest_query in self.queries(query):
+                submit(harvest_query)
+
+            def settled() -> bool:
+                """Whether target candidates are in that no outstanding query can outrank."""
+                floor = min((q.priority for q in pending.values()), default=math.inf)
+                return sum(n for priority, n in per_priority.items() if priority <= floor) >= target
+
+            try:
+                while pending and not settled():
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        harvest_query = pending.pop(future)
+                        try:
+                            items = future.result()
+                        except Exception as e:
+                            logger.error(f"Harvest query failed ({harvest_query.q!r}): {e}")
+                            continue
+
+                        for item in items:
+                            key = self._url_key(item.get('link', ''))
+                            if not key or key in seen:
+                                continue
+                            seen.add(key)
+                            article = self._qualify(item)
+                            if article is None:
+                                continue
+                            source = self.source_of(article)
+                            if per_source.get(source, 0) >= per_source_cap:
+                                continue
+                            per_source[source] = per_source.get(source, 0) + 1
+                            priority = self.priority_of(article)
+                            per_priority[priority] = per_priority.get(priority, 0) + 1
+                            accepted += 1
+                            yield article
+
+                        source_full = (
+                            harvest_query.source is not None
+                            and per_source.get(harvest_query.source, 0) >= per_source_cap
+                        )
+                        if (
+                            not settled()
+                            and not source_full
+                            and len(items) >= per_page
+                            and harvest_query.page < self._settings.max_pages
+                        ):
+                            submit(replace(harvest_query, page=harvest_query.page + 1))
+                if pending:
+                    logger.info(f"Harvest stopped early with {accepted} candidates")
+            finally:
+                # Drop queries that have not started yet, whether we stopped
+                # early or the caller stopped consuming
+                for future in pending:
+                    future.cancel()
+
+    def harvest(self, query: str) -> List['NewsArticle']:
+        """All merged candidates, ordered by source priority and then recency."""
+        candidates = list(self.iter_candidates(query))
+        candidates.sort(key=lambda a: (self.priority_of(a), -a.published_date.timestamp()))
+        logger.info(
+            f"Harvested {len(candidates)} candidates from "
+            f"{len({self.source_of(a) for a in candidates})} sources"
+        )
+        return candidates
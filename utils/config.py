@@ -0,0 +1,382 @@
+"""
+Typed, validated configuration loaded once per process from config.yaml.
+"""
+
+import logging
+import threading
+from functools import cached_property
+from typing import Dict, FrozenSet, Optional, Tuple
+
+import yaml
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator, model_validator
+
+from utils.domain_policy import DomainPolicy
+
+DEFAULT_CONFIG_PATH = "config.yaml"
+
+class ConfigError(ValueError):
+    """Raised when the configuration file is missing or invalid."""
+
+class _Section(BaseModel):
+    """Base for config sections: unknown keys are errors and values are immutable."""
+    model_config = ConfigDict(extra='forbid', frozen=True)
+
+class NewsSource(_Section):
+    name: str
+    url: str
+    priority: int = Field(ge=1)
+
+class ArticleLimits(_Section):
+    max_articles_per_day: int = Field(ge=1)
+    max_articles_per_source: int = Field(ge=1)
+
+class HarvestSettings(_Section):
+    mode: str = Field(default="fanout", pattern=r"^(single|fanout)$")
+    query: str = "AI"
+    topics: Tuple[str, ...] = ()
+    max_workers: int = Field(default=8, ge=1)
+    results_per_page: int = Field(default=10, ge=1, le=100)
+    max_pages: int = Field(default=2, ge=1)
+    candidate_multiplier: float = Field(default=2.0, ge=1.0)
+
+class DedupSettings(_Section):
+    enabled: bool = True
+    similarity_threshold: float = Field(default=0.5, gt=0.0, le=1.0)
+    num_permutations: int = Field(default=64, ge=1)
+    bands: int = Field(default=32, ge=1)
+
+    @field_validator('bands')
+    @classmethod
+    def _bands_divide_permutations(cls, value: int, info) -> int:
+        permutations = info.data.get('num_permutations')
+        if permutations and permutations % value:
+            raise ValueError("bands must evenly divide num_permutations")
+        return value
+
+class SummarizerConcurrency(_Section):
+    max_concurrent: int = Field(default=4, ge=1)
+    timeout_seconds: Optional[float] = Field(default=120, gt=0)
+
+class VerifierConcurrency(_Section):
+    max_concurrent_llm: int = Field(default=4, ge=1)
+    max_concurrent_serper: int = Field(default=8, ge=1)
+    timeout_seconds: Optional[float] = Field(default=180, gt=0)
+
+class ConcurrencySettings(_Section):
+    summarizer: SummarizerConcurrency = SummarizerConcurrency()
+    verifier: VerifierConcurrency = VerifierConcurrency()
+
+class SummarizationSettings(_Section):
+    single_call_max_tokens: int = Field(default=3000, ge=100)
+    chunk_tokens: int = Field(default=2000, ge=100)
+    max_concurrent_chunks: int = Field(default=4, ge=1)
+    max_tokens_per_article: int = Field(default=12000, ge=100)
+    max_tokens_per_run: Optional[int] = Field(default=300000, ge=1)
+    batch_enabled: bool = True
+    batch_max_articles: int = Field(default=8, ge=2)
+    batch_max_tokens: int = Field(default=3000, ge=100)
+    batch_article_max_tokens: int = Field(default=400, ge=1)
+
+class StreamingSettings(_Section):
+    queue_size: int = Field(default=8, ge=1)
+
+class TimeSettings(_Section):
+    lookback_hours: int = Field(ge=1)
+    timezone: str = "UTC"
+
+class OutputSettings(_Section):
+    format: str = "markdown"
+    formats: Tuple[str, ...] = ("markdown", "html", "json")
+    output_dir: str = "./digests"
+    filename_format: str = "ai_digest_{date}.md"
+    template_dir: Optional[str] = None
+    llm_intro: bool = False
+
+    @field_validator('formats')
+    @classmethod
+    def _known_formats(cls, value: Tuple[str, ...]) -> Tuple[str, ...]:
+        unknown = [f for f in value if f not in ("markdown", "html", "json")]
+        if unknown:
+            raise ValueError(f"unknown output formats: {', '.join(unknown)}")
+        if not value:
+            raise ValueError("at least one output format is required")
+        return tuple(dict.fromkeys(value))
+
+    @field_validator('filename_format')
+    @classmethod
+    def _needs_date_placeholder(cls, value: str) -> str:
+        if '{date}' not in value:
+            raise ValueError("filename_format must contain a {date} placeholder")
+        return value
+
+class SerperSettings(_Section):
+    endpoint: str
+    search_endpoint: Optional[str] = None
+
+    @property
+    def verification_endpoint(self) -> str:
+        """Endpoint used for claim verification searches."""
+        return self.search_endpoint or self.endpoint
+
+class OpenAISettings(_Section):
+    model: str
+    temperature: float = Field(ge=0.0, le=2.0)
+
+class ApiSettings(_Section):
+    serper: SerperSettings
+    openai: OpenAISettings
+
+class HttpSettings(_Section):
+    connect_timeout: float = Field(default=5.0, gt=0)
+    read_timeout: float = Field(default=30.0, gt=0)
+    pool_connections: int = Field(default=10, ge=1)
+    pool_maxsize: int = Field(default=20, ge=1)
+    transport: str = Field(default="requests", pattern=r"^(requests|httpx)$")
+    http2: bool = False
+
+class RateLimitSettings(_Section):
+    enabled: bool = True
+    requests_per_second: Optional[float] = Field(default=None, gt=0)
+    burst: int = Field(default=5, ge=1)
+    max_concurrent: int = Field(default=8, ge=1)
+    min_concurrent: int = Field(default=1, ge=1)
+    max_retries: int = Field(default=4, ge=0)
+    backoff_base_seconds: float = Field(default=0.5, gt=0)
+    backoff_max_seconds: float = Field(default=30, gt=0)
+    max_retry_after_seconds: float = Field(default=60, ge=0)
+    failure_threshold: int = Field(default=5, ge=1)
+    reset_seconds: float = Field(default=30, gt=0)
+
+    @model_validator(mode='after')
+    def _concurrency_range(self) -> 'RateLimitSettings':
+        if self.min_concurrent > self.max_concurrent:
+            raise ValueError("min_concurrent must not exceed max_concurrent")
+        return self
+
+class RateLimitsSettings(_Section):
+    serper: RateLimitSettings = RateLimitSettings(requests_per_second=5, burst=10)
+    llm: RateLimitSettings = RateLimitSettings()
+
+class ResponseCacheSettings(_Section):
+    enabled: bool = True
+    path: str = ".cache/serper_responses.sqlite3"
+    max_entries: int = Field(default=5000, ge=1)
+    ttl_seconds: Dict[str, float] = Field(default_factory=lambda: {'default': 3600})
+
+class LLMCacheSettings(ResponseCacheSettings):
+    path: str = ".cache/llm_responses.sqlite3"
+    max_entries: int = Field(default=2000, ge=1)
+    ttl_seconds: Dict[str, float] = Field(default_factory=lambda: {'default': 604800})
+    cache_nondeterministic: bool = True
+
+class CacheSettings(_Section):
+    serper: ResponseCacheSettings = ResponseCacheSettings()
+    llm: LLMCacheSettings = LLMCacheSettings()
+
+class ContentFetchSettings(_Section):
+    enabled: bool = True
+    max_workers: int = Field(default=8, ge=1)
+    max_per_host: int = Field(default=2, ge=1)
+    per_host_delay_seconds: float = Field(default=0.5, ge=0)
+    max_bytes: int = Field(default=2_000_000, ge=1024)
+    min_text_chars: int = Field(default=200, ge=0)
+    max_tool_output_chars: int = Field(default=6000, ge=0)
+    cache_path: str = ".cache/article_content.sqlite3"
+    revalidate_after_seconds: float = Field(default=21600, ge=0)
+    user_agent: str = "AI-Daily-Digest/1.0"
+
+class ArticleStoreSettings(_Section):
+    enabled: bool = True
+    path: str = ".cache/articles.sqlite3"
+    retention_days: float = Field(default=14, gt=0)
+
+class DigestIndexSettings(_Section):
+    enabled: bool = True
+    path: str = ".cache/digest_index.sqlite3"
+    flag_covered: bool = True
+    covered_within_days: int = Field(default=30, ge=1)
+    title_similarity: float = Field(default=0.6, gt=0, le=1)
+
+class StorylineSettings(_Section):
+    enabled: bool = True
+    path: str = ".cache/storylines.sqlite3"
+    dimensions: int = Field(default=1024, ge=64)
+    similarity_threshold: float = Field(default=0.4, gt=0, le=1)
+    active_days: float = Field(default=14, gt=0)
+    batch_size: int = Field(default=512, ge=1)
+
+class MetricsSettings(_Section):
+    enabled: bool = True
+    report_dir: Optional[str] = ".cache/metrics"
+    prometheus_textfile: Optional[str] = ".cache/metrics/ai_digest.prom"
+
+class CheckpointSettings(_Section):
+    dir: str = ".cache/checkpoints"
+
+class VerificationSettings(_Section):
+    min_sources: int = Field(ge=1)
+    trusted_domains: Tuple[str, ...]
+    denied_domains: Tuple[str, ...] = ()
+
+    @field_validator('trusted_domains', 'denied_domains')
+    @classmethod
+    def _normalize_domains(cls, value: Tuple[str, ...]) -> Tuple[str, ...]:
+        domains = tuple(DomainPolicy.normalize_host(domain) for domain in value)
+        return tuple(domain for domain in domains if domain)
+
+    def model_post_init(self, __context) -> None:
+        # Derive lookup structures at load time so hot paths never rescan the list
+        self.trusted_domain_set
+        self.domain_policy
+
+    @cached_property
+    def trusted_domain_set(self) -> FrozenSet[str]:
+        return frozenset(self.trusted_domains)
+
+    @cached_property
+    def domain_policy(self) -> DomainPolicy:
+        """Suffix index over trusted_domains and denied_domains."""
+        return DomainPolicy(allowed=self.trusted_domains, denied=self.denied_domains)
+
+class EditionSettings(_Section):
+    """One digest of a batch run; unset fields keep the top-level settings."""
+    name: str = Field(pattern=r"^[A-Za-z0-9_-]+$")
+    title: str = "AI News Digest"
+    query: Optional[str] = None
+    topics: Optional[Tuple[str, ...]] = None
+    sources: Optional[Tuple[str, ...]] = None
+    max_articles_per_day: Optional[int] = Field(default=None, ge=1)
+    max_articles_per_source: Optional[int] = Field(default=None, ge=1)
+    filename_format: Optional[str] = None
+
+    @field_validator('filename_format')
+    @classmethod
+    def _needs_date_placeholder(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None and '{date}' not in value:
+            raise ValueError("filename_format must contain a {date} placeholder")
+        return value
+
+class ScheduleSettings(_Section):
+    times: Tuple[str, ...] = ("06:00",)
+    mode: str = Field(default="pipeline", pattern=r"^(crew|pipeline|streaming|batch)$")
+    editions: Tuple[str, ...] = ()
+    http_host: str = "127.0.0.1"
+    http_port: int = Field(default=8765, ge=0, le=65535)
+    reload_check_seconds: float = Field(default=5.0, gt=0)
+
+    @field_validator('times')
+    @classmethod
+    def _valid_times(cls, value: Tuple[str, ...]) -> Tuple[str, ...]:
+        for time_of_day in value:
+            hours, _, minutes = time_of_day.partition(':')
+            if not (hours.isdigit() and minutes.isdigit() and int(hours) < 24 and int(minutes) < 60):
+                raise ValueError(f"invalid time of day {time_of_day!r}; use HH:MM")
+        return tuple(sorted(value, key=lambda t: tuple(map(int, t.split(':')))))
+
+class LoggingSettings(_Section):
+    level: str = "INFO"
+    file: str = "logs/ai_digest.log"
+
+    @field_validator('level')
+    @classmethod
+    def _known_level(cls, value: str) -> str:
+        value = value.upper()
+        if not isinstance(logging.getLevelName(value), int):
+            raise ValueError(f"unknown logging level {value!r}")
+        return value
+
+class AppConfig(_Section):
+    """The complete application configuration."""
+    news_sources: Tuple[NewsSource, ...] = ()
+    article_limits: ArticleLimits
+    harvest: HarvestSettings = HarvestSettings()
+    dedup: DedupSettings = DedupSettings()
+    concurrency: ConcurrencySettings = ConcurrencySettings()
+    summarization: SummarizationSettings = SummarizationSettings()
+    streaming: StreamingSettings = StreamingSettings()
+    time_settings: TimeSettings
+    output: OutputSettings = OutputSettings()
+    api: ApiSettings
+    http: HttpSettings = HttpSettings()
+    rate_limits: RateLimitsSettings = RateLimitsSettings()
+    cache: CacheSettings = CacheSettings()
+    content_fetch: ContentFetchSettings = ContentFetchSettings()
+    article_store: ArticleStoreSettings = ArticleStoreSettings()
+    digest_index: DigestIndexSettings = DigestIndexSettings()
+    storylines: StorylineSettings = StorylineSettings()
+    checkpoints: CheckpointSettings = CheckpointSettings()
+    metrics: MetricsSettings = MetricsSettings()
+    verification: VerificationSettings
+    editions: Tuple[EditionSettings, ...] = ()
+    schedule: ScheduleSettings = ScheduleSettings()
+    logging: LoggingSettings = LoggingSettings()
+
+    @model_validator(mode='after')
+    def _editions_are_consistent(self) -> 'AppConfig':
+        names = [edition.name for edition in self.editions]
+        if len(names) != len(set(names)):
+            raise ValueError("edition names must be unique")
+        known = {source.name.lower() for source in self.news_sources}
+        for edition in self.editions:
+            unknown = [s for s in edition.sources or () if s.lower() not in known]
+            if unknown:
+                raise ValueError(f"edition {edition.name!r} lists unknown sources: {', '.join(unknown)}")
+        unknown = [name for name in self.schedule.editions if name not in names]
+        if unknown:
+            raise ValueError(f"schedule lists unknown editions: {', '.join(unknown)}")
+        return self
+
+    def model_post_init(self, __context) -> None:
+        # Built at load time like VerificationSettings.trusted_domain_set
+        self.source_priorities
+
+    @cached_property
+    def source_priorities(self) -> Dict[str, int]:
+        """Configured priority by lower-cased news source name."""
+        return {source.name.lower(): source.priority for source in self.news_sources}
+
+    def source_priority(self, source_name: str) -> Optional[int]:
+        """Configured priority for a news source name, or None if unlisted."""
+        return self.source_priorities.get(source_name.lower())
+
+def load_config(path: str = DEFAULT_CONFIG_PATH) -> AppConfig:
+    """
+    Read and validate a configuration file.
+    Raises ConfigError describing every invalid field.
+    """
+    try:
+        with open(path, 'r') as f:
+            raw = yaml.safe_load(f)
+    except OSError as e:
+        raise ConfigError(f"Cannot read configuration file {path}: {e}") from e
+    except yaml.YAMLError as e:
+        raise ConfigError(f"Configuration file {path} is not valid YAML: {e}") from e
+
+    if not isinstance(raw, dict):
+        raise ConfigError(f"Configuration file {path} must contain a mapping")
+
+    try:
+        return AppConfig.model_validate(raw)
+    except ValidationError as e:
+        problems = "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+            for error in e.errors()
+        )
+        raise ConfigError(f"Invalid configuration in {path}: {problems}") from e
+
+_config: Optional[AppConfig] = None
+_config_lock = threading.Lock()
+
+def get_config() -> AppConfig:
+    """Return the process-wide configuration, loading config.yaml on first use."""
+    global _config
+    with _config_lock:
+        if _config is None:
+            _config = load_config()
+        return _config
+
+def set_config(config: AppConfig) -> None:
+    """Install config as the process-wide configuration."""
+    global _config
+    with _config_lock:
+        _config = config
@@ -0,0 +1,278 @@
+"""
+Near-duplicate story detection with MinHash signatures and LSH banding.
+"""
+
+import hashlib
+import logging
+import random
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from tools.news_scraper_tool import NewsArticle
+
+logger = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_WORD_RE = re.compile(r"[\w$][\w'$.-]*")
+# (names an article uses, every word in it), for the naming check
+_Mentions = Tuple[FrozenSet[str], FrozenSet[str]]
+_STOPWORDS = frozenset("""
+    a an and are as at be by for from has have how in is it its of on or says
+    said that the their this to was were what when who why will with new after
+    over into about more than report reports exclusive
+""".split())
+
+# Each summarized article costs one summarizer call and one verifier call
+LLM_CALLS_PER_ARTICLE = 2
+
+@dataclass
+class DedupReport:
+    """Outcome of one deduplication pass."""
+    candidates: int
+    clusters: int
+    duplicates_removed: int
+    llm_calls_saved: int
+
+def _tokens(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS and len(t) > 1]
+
+def _names(text: str) -> FrozenSet[str]:
+    """
+    Capitalized words and words with digits: the companies, products,
+    people and figures a sentence-case text names. A capitalized stopword
+    ("The", "After") is only the start of a sentence.
+    """
+    names = set()
+    for word in _WORD_RE.findall(text):
+        if any(c.isdigit() for c in word) or (word[0].isupper() and word.lower() not in _STOPWORDS):
+            names.add(word.lower())
+    return frozenset(names)
+
+def _is_title_case(title: str) -> bool:
+    words = [word for word in _WORD_RE.findall(title) if len(word) > 3]
+    return bool(words) and sum(word[0].isupper() for word in words) * 2 >= len(words)
+
+def names(title: str, snippet: str) -> FrozenSet[str]:
+    """
+    What an article's title and snippet name (see _names); a title in
+    title case capitalizes every word, so only its snippet counts. A word
+    the article also writes in lower case is no name ("Models" starting
+    a headline about models).
+    """
+    found = _names(snippet)
+    if not _is_title_case(title):
+        found |= _names(title)
+    lower = {word for word in _WORD_RE.findall(f"{title} {snippet}") if word.islower()}
+    return frozenset(found - lower)
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=4).digest(), 'big')
+
+class MinHasher:
+    """MinHash signatures over token sets with a fixed family of hash functions."""
+
+    def __init__(self, num_permutations: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.permutations: List[Tuple[int, int]] = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_permutations)
+        ]
+
+    def signature(self, tokens: FrozenSet[str]) -> Tuple[int, ...]:
+        hashes = [_token_hash(t) for t in tokens] or [0]
+        prime = _MERSENNE_PRIME
+        return tuple(
+            min([(a * h + b) % prime for h in hashes])
+            for a, b in self.permutations
+        )
+
+    @staticmethod
+    def similarity(left: Sequence[int], right: Sequence[int]) -> float:
+        """Estimated Jaccard similarity of the two underlying token sets."""
+        return sum(1 for x, y in zip(left, right) if x == y) / len(left)
+
+class StoryDeduplicator:
+    """
+    Groups articles that report the same story and keeps one per group.
+
+    Articles are fingerprinted with MinHash over the tokens of their title
+    and snippet; deduplication runs before any content is fetched, so that
+    is all there is to compare. LSH banding puts likely duplicates in shared
+    buckets, so only those pairs are compared and a pass over n articles
+    costs roughly O(n) rather than O(n^2).
+
+    Word overlap alone merges rival stories told in the same words ("Nvidia
+    stock falls after..." and "AMD stock falls after..."), so a pair above
+    the threshold is still kept apart when each article names something
+    (a capitalized word or a figure) that the other never mentions. Matching
+    pairs are merged with union-find; each group keeps its best article by
+    source priority and records the other URLs as extra attribution.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.5,
+        num_permutations: int = 64,
+        bands: int = 32
+    ):
+        if num_permutations % bands:
+            raise ValueError("num_permutations must be a multiple of bands")
+        self.similarity_threshold = similarity_threshold
+        self.bands = bands
+        self.rows = num_permutations // bands
+        self._hasher = MinHasher(num_permutations)
+
+    def stream(self) -> 'DedupStream':
+        """An incremental deduplicator for articles that arrive one at a time."""
+        return DedupStream(self)
+
+    def features(self, article: 'NewsArticle') -> FrozenSet[str]:
+        return frozenset(_tokens(article.title) + _tokens(article.snippet or ''))
+
+    @staticmethod
+    def mentions(article: 'NewsArticle') -> _Mentions:
+        """What names_conflict() compares."""
+        snippet = article.snippet or ''
+        words = frozenset(_TOKEN_RE.findall(f"{article.title} {snippet}".lower()))
+        return names(article.title, snippet), words
+
+    @staticmethod
+    def names_conflict(left: _Mentions, right: _Mentions) -> bool:
+        """True if each article names something the other does not mention."""
+        def unmatched(names: FrozenSet[str], words: FrozenSet[str]) -> bool:
+            return any(not set(_TOKEN_RE.findall(name)) <= words for name in names)
+        return unmatched(left[0], right[1]) and unmatched(right[0], left[1])
+
+    def same_story(self, similarity: float, left: _Mentions, right: _Mentions) -> bool:
+        """Whether two articles, with their mentions(), are one story."""
+        return similarity >= self.similarity_threshold and not self.names_conflict(left, right)
+
+    def clusters(self, articles: Sequence['NewsArticle']) -> List[List[int]]:
+        """Indices of articles grouped by story, in first-seen order."""
+        signatures = [self._hasher.signature(self.features(a)) for a in articles]
+        mentions = [self.mentions(a) for a in articles]
+        parent = list(range(len(articles)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        compared = set()
+        for band in range(self.bands):
+            buckets: Dict[Tuple[int, ...], List[int]] = defaultdict(list)
+            lo = band * self.rows
+            for index, signature in enumerate(signatures):
+                buckets[signature[lo:lo + self.rows]].append(index)
+            for members in buckets.values():
+                # Every pair: a near-duplicate of a later member may miss the first
+                for position, first in enumerate(members):
+                    for other in members[position + 1:]:
+                        pair = (first, other)
+                        if pair in compared:
+                            continue
+                        compared.add(pair)
+                        similarity = MinHasher.similarity(signatures[first], signatures[other])
+                        if self.same_story(similarity, mentions[first], mentions[other]):
+                            parent[find(other)] = find(first)
+
+        groups: Dict[int, List[int]] = {}
+        for index in range(len(articles)):
+            groups.setdefault(find(index), []).append(index)
+        return list(groups.values())
+
+    def deduplicate(
+        self,
+        articles: Sequence['NewsArticle'],
+        priority: Optional[Callable[['NewsArticle'], int]] = None
+    ) -> Tuple[List['NewsArticle'], DedupReport]:
+        """
+        Keep the best article of each story, preserving input order.
+        priority ranks articles within a group (lower is better); ties go to
+        the earlier one in the input.
+        """
+        priority = priority or (lambda article: 0)
+        kept = []
+        for group in self.clusters(articles):
+            best = min(
+                group,
+                key=lambda i: (priority(articles[i]), i)
+            )
+            representative = articles[best]
+            for index in group:
+                url = articles[index].url
+                if index != best and url not in representative.related_urls:
+                    representative.related_urls.append(url)
+            kept.append((best, representative))
+
+        kept.sort(key=lambda pair: pair[0])
+        survivors = [article for _, article in kept]
+        removed = len(articles) - len(survivors)
+        report = DedupReport(
+            candidates=len(articles),
+            clusters=len(survivors),
+            duplicates_removed=removed,
+            llm_calls_saved=removed * LLM_CALLS_PER_ARTICLE
+        )
+        logger.info(
+            f"Deduplicated {report.candidates} candidates into {report.clusters} stories; "
+            f"saved {report.llm_calls_saved} LLM calls"
+        )
+        return survivors, report
+
+class DedupStream:
+    """
+    Incremental form of StoryDeduplicator for articles that arrive one at a time.
+
+    Each kept article's LSH bands are indexed as it arrives, so checking a
+    new article costs one signature and a few bucket lookups. The first
+    article of a story is kept, since it may already be on its way
+    downstream; later copies are recorded in its related_urls.
+    """
+
+    def __init__(self, deduplicator: StoryDeduplicator):
+        self._dedup = deduplicator
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+        self._signatures: List[Tuple[int, ...]] = []
+        self._mentions: List[_Mentions] = []
+        self.kept: List['NewsArticle'] = []
+        self.duplicates_removed = 0
+
+    def add(self, article: 'NewsArticle') -> Optional['NewsArticle']:
+        """
+        Index article and return None if it is a new story, or the kept
+        article it duplicates.
+        """
+        dedup = self._dedup
+        signature = dedup._hasher.signature(dedup.features(article))
+        mentions = dedup.mentions(article)
+        bands = [
+            (band, signature[band * dedup.rows:(band + 1) * dedup.rows])
+            for band in range(dedup.bands)
+        ]
+        checked = set()
+        for key in bands:
+            for index in self._buckets.get(key, ()):
+                if index in checked:
+                    continue
+                checked.add(index)
+                similarity = MinHasher.similarity(self._signatures[index], signature)
+                if dedup.same_story(similarity, self._mentions[index], mentions):
+                    representative = self.kept[index]
+                    if article.url not in representative.related_urls:
+                        representative.related_urls.append(article.url)
+                    self.duplicates_removed += 1
+                    return representative
+
+        index = len(self.kept)
+        self.kept.append(article)
+        self._signatures.append(signature)
+        self._mentions.append(mentions)
+        for key in bands:
+            self._buckets[key].append(index)
+        return None
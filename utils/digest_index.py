@@ -0,0 +1,377 @@
+"""
+Incrementally maintained full-text index over the archive of generated digests.
+"""
+
+import hashlib
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date as Date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.config import AppConfig, get_config
+from utils.domain_policy import normalize_url
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_URL_RE = re.compile(r"https?://\S+|<[^>\s]+>")
+_HEADING_RE = re.compile(r"^#{2,3}[ \t]+(.+)$", re.MULTILINE)
+_LINK_RE = re.compile(r"\[([^\]]+)\]\((\S+?)\)")
+_BYLINE_RE = re.compile(r"^\*([^*\n]+?),\s*(\d{4}-\d{2}-\d{2})\*$", re.MULTILINE)
+_STOPWORDS = frozenset("""
+    a an and are as at be by for from has have how in is it its of on or that
+    the their this to was were what when who why will with
+""".split())
+
+# Title terms count this many times toward a story's term frequency
+TITLE_WEIGHT = 3
+BM25_K1 = 1.2
+BM25_B = 0.75
+EXCERPT_CHARS = 240
+
+def tokens(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+def _plain(markdown: str) -> str:
+    """Markdown text with links reduced to their text and bare URLs dropped."""
+    return ' '.join(_URL_RE.sub(' ', _LINK_RE.sub(r"\1", markdown)).split())
+
+def digest_files(config: AppConfig) -> List[Tuple[str, Path]]:
+    """
+    (date, path) of every Markdown digest in output.output_dir named by
+    output.filename_format or an edition's, newest first.
+    """
+    formats = {config.output.filename_format}
+    formats.update(e.filename_format for e in config.editions if e.filename_format)
+    output_dir = Path(config.output.output_dir)
+    found = {}
+    for filename_format in sorted(formats):
+        pattern = re.compile(
+            re.escape(filename_format).replace(re.escape('{date}'), r"(\d{4}-\d{2}-\d{2})") + '$'
+        )
+        for path in output_dir.glob(filename_format.replace('{date}', '*')):
+            match = pattern.match(path.name)
+            if match:
+                found[path] = match.group(1)
+    digests = [(date, path) for path, date in found.items()]
+    digests.sort(key=lambda item: (item[0], item[1].name), reverse=True)
+    return digests
+
+@dataclass
+class IndexedStory:
+    """One story section of a digest file."""
+    title: str
+    url: str
+    source: str
+    body: str
+
+def parse_digest(markdown: str) -> List[IndexedStory]:
+    """
+    Story sections of a Markdown digest: each second- or third-level
+    heading with a link, in the heading or its section, starts a story.
+    Works for the rendered layout and, loosely, for LLM-written digests.
+    """
+    stories = []
+    headings = list(_HEADING_RE.finditer(markdown))
+    for i, heading in enumerate(headings):
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(markdown)
+        section = markdown[heading.end():end].strip()
+        text = heading.group(1).strip()
+        link = _LINK_RE.search(text) or _LINK_RE.search(section)
+        if link is None:
+            continue
+        title = _LINK_RE.sub(r"\1", text).strip('*_ ')
+        byline = _BYLINE_RE.search(section)
+        stories.append(IndexedStory(
+            title=title,
+            url=link.group(2),
+            source=byline.group(1).strip() if byline else '',
+            body=section
+        ))
+    return stories
+
+@dataclass
+class SearchHit:
+    """One ranked story from the archive."""
+    score: float
+    date: str
+    title: str
+    url: str
+    source: str
+    digest: str
+    excerpt: str
+
+class DigestIndex:
+    """
+    SQLite inverted index over the stories of past digests.
+
+    Postings hold (term, story, term frequency) with title terms weighted up,
+    in a WITHOUT ROWID table keyed by term, so a lookup reads only the
+    postings of the query's terms; stories keep their title, URL, source,
+    date and a short excerpt, not the full text. Files are re-read only when
+    their size or modification time changes, and re-indexed only when their
+    content hash does. Queries rank stories with BM25. Uses WAL mode so the
+    pipeline and the CLI can share the file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        Path(os.path.dirname(path) or '.').mkdir(parents=True, exist_ok=True)
+        conn = self._connection()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                date TEXT NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                indexed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS stories (
+                id INTEGER PRIMARY KEY,
+                path TEXT NOT NULL,
+                date TEXT NOT NULL,
+                title TEXT NOT NULL,
+                url TEXT NOT NULL,
+                url_key TEXT NOT NULL,
+                source TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                excerpt TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_stories_path ON stories(path);
+            CREATE INDEX IF NOT EXISTS idx_stories_date ON stories(date);
+            CREATE INDEX IF NOT EXISTS idx_stories_url_key ON stories(url_key);
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                story INTEGER NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (term, story)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_postings_story ON postings(story);
+        """)
+
+    @classmethod
+    def from_config(cls, config: Optional[AppConfig] = None) -> Optional['DigestIndex']:
+        """Open the configured index, or return None if it is disabled."""
+        settings = (config or get_config()).digest_index
+        if not settings.enabled:
+            return None
+        return cls(settings.path)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _remove(self, conn: sqlite3.Connection, path: str) -> None:
+        conn.execute(
+            "DELETE FROM postings WHERE story IN (SELECT id FROM stories WHERE path = ?)", (path,)
+        )
+        conn.execute("DELETE FROM stories WHERE path = ?", (path,))
+        conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def _index_file(self, conn: sqlite3.Connection, path: str, date: str, text: str, stat, sha: str) -> int:
+        self._remove(conn, path)
+        stories = parse_digest(text)
+        for story in stories:
+            body = _plain(_BYLINE_RE.sub('', story.body))
+            counts = Counter(tokens(body))
+            for term in tokens(story.title):
+                counts[term] += TITLE_WEIGHT
+            for term in tokens(story.source):
+                counts[term] += 1
+            story_id = conn.execute(
+                "INSERT INTO stories (path, date, title, url, url_key, source, length, excerpt) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, date, story.title, story.url, normalize_url(story.url), story.source,
+                 sum(counts.values()), body[:EXCERPT_CHARS])
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO postings (term, story, tf) VALUES (?, ?, ?)",
+                [(term, story_id, tf) for term, tf in counts.items()]
+            )
+        conn.execute(
+            "INSERT INTO files (path, date, mtime_ns, size, sha256, indexed_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (path, date, stat.st_mtime_ns, stat.st_size, sha, time.time())
+        )
+        return len(stories)
+
+    def update(self, files: Iterable[Tuple[str, Path]], prune: bool = True) -> Dict[str, int]:
+        """
+        Bring the index up to date with files, (date, path) pairs such as
+        digest_files() returns. Unchanged files are skipped by size and
+        modification time, then by content hash; with prune, indexed files
+        that are not in files any more are dropped.
+        Returns counts of files 'indexed', 'unchanged' and 'removed'.
+        """
+        conn = self._connection()
+        known = {
+            row[0]: row[1:] for row in
+            conn.execute("SELECT path, mtime_ns, size, sha256 FROM files")
+        }
+        report = {'indexed': 0, 'unchanged': 0, 'removed': 0}
+        seen = set()
+        for date, path in files:
+            path = str(path)
+            seen.add(path)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            previous = known.get(path)
+            if previous is not None and previous[:2] == (stat.st_mtime_ns, stat.st_size):
+                report['unchanged'] += 1
+                continue
+            data = Path(path).read_bytes()
+            sha = hashlib.sha256(data).hexdigest()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if previous is not None and previous[2] == sha:
+                    conn.execute(
+                        "UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?",
+                        (stat.st_mtime_ns, stat.st_size, path)
+                    )
+                    report['unchanged'] += 1
+                else:
+                    count = self._index_file(conn, path, date, data.decode('utf-8', 'replace'), stat, sha)
+                    report['indexed'] += 1
+                    logger.info(f"Indexed {count} stories from {path}")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        if prune:
+            for path in set(known) - seen:
+                conn.execute("BEGIN IMMEDIATE")
+                self._remove(conn, path)
+                conn.execute("COMMIT")
+                report['removed'] += 1
+        return report
+
+    def update_from_config(self, config: Optional[AppConfig] = None) -> Dict[str, int]:
+        """Index new and changed digests in the configured output directory."""
+        return self.update(digest_files(config or get_config()))
+
+    def search(
+        self,
+        query: str,
+        days: Optional[int] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        source: Optional[str] = None,
+        limit: int = 20
+    ) -> List[SearchHit]:
+        """
+        Stories matching any term of query, best BM25 score first.
+        days keeps digests from the last days days (today included); since
+        and until bound the digest date (YYYY-MM-DD, inclusive); source
+        keeps stories whose source contains it.
+        """
+        terms = list(dict.fromkeys(tokens(query)))
+        if not terms:
+            return []
+        if days is not None:
+            cutoff = (Date.today() - timedelta(days=days - 1)).isoformat()
+            since = max(since or cutoff, cutoff)
+        conn = self._connection()
+        total, average = conn.execute("SELECT COUNT(*), AVG(length) FROM stories").fetchone()
+        if not total:
+            return []
+        marks = ','.join('?' * len(terms))
+        df = dict(conn.execute(
+            f"SELECT term, COUNT(*) FROM postings WHERE term IN ({marks}) GROUP BY term", terms
+        ))
+
+        filters, params = [], list(terms)
+        if since:
+            filters.append("s.date >= ?")
+            params.append(since)
+        if until:
+            filters.append("s.date <= ?")
+            params.append(until)
+        if source:
+            filters.append("LOWER(s.source) LIKE ?")
+            params.append(f"%{source.lower()}%")
+        where = ''.join(f" AND {f}" for f in filters)
+        rows = conn.execute(
+            f"SELECT p.story, p.term, p.tf, s.length FROM postings p JOIN stories s ON s.id = p.story "
+            f"WHERE p.term IN ({marks}){where}",
+            params
+        )
+
+        scores: Dict[int, float] = {}
+        for story, term, tf, length in rows:
+            idf = math.log(1 + (total - df[term] + 0.5) / (df[term] + 0.5))
+            norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * length / (average or 1))
+            scores[story] = scores.get(story, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return self._hits(conn, best)
+
+    def _hits(self, conn: sqlite3.Connection, ranked: List[Tuple[int, float]]) -> List[SearchHit]:
+        if not ranked:
+            return []
+        rows = {
+            row[0]: row[1:] for row in conn.execute(
+                f"SELECT id, date, title, url, source, path, excerpt FROM stories "
+                f"WHERE id IN ({','.join('?' * len(ranked))})",
+                [story for story, _ in ranked]
+            )
+        }
+        return [SearchHit(score, *rows[story]) for story, score in ranked if story in rows]
+
+    def previous_coverage(
+        self,
+        title: str,
+        url: str,
+        before: str,
+        since: Optional[str] = None,
+        title_similarity: float = 0.6
+    ) -> Optional[SearchHit]:
+        """
+        The most recent earlier story, in a digest dated before `before`
+        (and on or after since), with the same normalized URL or a title
+        whose term set overlaps title's by at least title_similarity
+        (Jaccard); None if the story is new.
+        """
+        conn = self._connection()
+        bounds, params = "date < ?", [before]
+        if since:
+            bounds += " AND date >= ?"
+            params.append(since)
+        row = conn.execute(
+            f"SELECT id FROM stories WHERE url_key = ? AND {bounds} ORDER BY date DESC LIMIT 1",
+            [normalize_url(url)] + params
+        ).fetchone()
+        if row is not None:
+            return self._hits(conn, [(row[0], 1.0)])[0]
+
+        wanted = set(tokens(title))
+        if not wanted:
+            return None
+        until = (Date.fromisoformat(before) - timedelta(days=1)).isoformat()
+        for hit in self.search(title, since=since, until=until, limit=10):
+            theirs = set(tokens(hit.title))
+            if len(wanted & theirs) / len(wanted | theirs) >= title_similarity:
+                return hit
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        conn = self._connection()
+        return {
+            'files': conn.execute("SELECT COUNT(*) FROM files").fetchone()[0],
+            'stories': conn.execute("SELECT COUNT(*) FROM stories").fetchone()[0],
+            'terms': conn.execute("SELECT COUNT(DISTINCT term) FROM postings").fetchone()[0],
+        }
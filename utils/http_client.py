@@ -0,0 +1,240 @@
+"""
+Shared HTTP client with keep-alive connection pooling for all tools.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import httpx
+except ImportError:  # httpx is optional; the requests transport is always available
+    httpx = None
+
+from utils.config import AppConfig, HttpSettings, get_config
+from utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+class HttpClient:
+    """
+    Pooled HTTP client shared by every tool in the process.
+
+    Connections are kept alive per host, so repeated calls to the same API
+    reuse one TCP+TLS connection instead of opening a new one each time.
+    Responses and errors are always requests objects, whichever transport
+    is configured, so callers keep handling requests.exceptions as before.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        pool_connections: int = 10,
+        pool_maxsize: int = 20,
+        transport: str = 'requests',
+        http2: bool = False
+    ):
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.pool_maxsize = pool_maxsize
+        self.http2 = http2
+        self.transport = transport
+        if transport == 'httpx' and httpx is None:
+            logger.warning("httpx is not installed; falling back to the requests transport")
+            self.transport = 'requests'
+        if transport not in ('requests', 'httpx'):
+            raise ValueError(f"Unknown HTTP transport: {transport}")
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=0
+        )
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+        self._httpx_client = None
+        if self.transport == 'httpx':
+            self._httpx_client = httpx.Client(
+                http2=self._http2_available(),
+                timeout=self._httpx_timeout(self.timeout),
+                limits=self._httpx_limits()
+            )
+
+    @classmethod
+    def from_settings(cls, settings: HttpSettings) -> 'HttpClient':
+        """Build a client from the `http` section of the configuration."""
+        return cls(
+            connect_timeout=settings.connect_timeout,
+            read_timeout=settings.read_timeout,
+            pool_connections=settings.pool_connections,
+            pool_maxsize=settings.pool_maxsize,
+            transport=settings.transport,
+            http2=settings.http2
+        )
+
+    def _http2_available(self) -> bool:
+        """HTTP/2 needs the optional h2 package alongside httpx."""
+        if not self.http2:
+            return False
+        try:
+            import h2  # noqa: F401
+            return True
+        except ImportError:
+            logger.warning("HTTP/2 requested but h2 is not installed; using HTTP/1.1")
+            return False
+
+    def _httpx_limits(self):
+        return httpx.Limits(
+            max_connections=self.pool_maxsize,
+            max_keepalive_connections=self.pool_maxsize
+        )
+
+    @staticmethod
+    def _httpx_timeout(timeout: Tuple[float, float]):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+
+    @staticmethod
+    def _to_requests_response(response) -> requests.Response:
+        """Convert an httpx response so callers only ever see requests objects."""
+        converted = requests.Response()
+        converted.status_code = response.status_code
+        converted._content = response.content
+        converted.headers = CaseInsensitiveDict(response.headers)
+        converted.url = str(response.url)
+        converted.encoding = response.encoding
+        converted.reason = response.reason_phrase
+        return converted
+
+    @staticmethod
+    def _to_requests_error(error: Exception) -> requests.exceptions.RequestException:
+        """Map httpx transport errors onto the equivalent requests exception."""
+        if isinstance(error, httpx.TimeoutException):
+            return requests.exceptions.Timeout(str(error))
+        if isinstance(error, httpx.ConnectError):
+            return requests.exceptions.ConnectionError(str(error))
+        return requests.exceptions.RequestException(str(error))
+
+    @staticmethod
+    @contextmanager
+    def _timed(method: str, url: str) -> Iterator[List[Any]]:
+        """Record the call's latency and status; the body sets status[0]."""
+        status: List[Any] = ['error']
+        start = time.perf_counter()
+        try:
+            yield status
+        finally:
+            get_metrics().record_http(method, url, status[0], time.perf_counter() - start)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        timeout: Optional[Tuple[float, float]] = None,
+        **kwargs
+    ) -> requests.Response:
+        """Send a request over the shared connection pool."""
+        timeout = timeout or self.timeout
+        with self._timed(method, url) as status:
+            if self._httpx_client is None:
+                response = self._session.request(method, url, timeout=timeout, **kwargs)
+                status[0] = response.status_code
+                return response
+            try:
+                response = self._httpx_client.request(
+                    method, url, timeout=self._httpx_timeout(timeout), **kwargs
+                )
+            except httpx.HTTPError as e:
+                raise self._to_requests_error(e) from e
+            status[0] = response.status_code
+            return self._to_requests_response(response)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Send a POST request over the shared connection pool."""
+        return self.request('POST', url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request over the shared connection pool."""
+        return self.request('GET', url, **kwargs)
+
+    def get_capped(
+        self,
+        url: str,
+        max_bytes: int,
+        timeout: Optional[Tuple[float, float]] = None,
+        **kwargs
+    ) -> requests.Response:
+        """
+        Stream a GET response and stop reading after max_bytes.
+        The returned response holds at most max_bytes of body; the rest of
+        the body is never downloaded.
+        """
+        timeout = timeout or self.timeout
+        chunks = []
+        received = 0
+        with self._timed('GET', url) as status:
+            if self._httpx_client is None:
+                response = self._session.get(url, stream=True, timeout=timeout, **kwargs)
+                try:
+                    for chunk in response.iter_content(chunk_size=16384):
+                        chunks.append(chunk)
+                        received += len(chunk)
+                        if received >= max_bytes:
+                            break
+                finally:
+                    response.close()
+                response._content = b''.join(chunks)[:max_bytes]
+                status[0] = response.status_code
+                return response
+            try:
+                with self._httpx_client.stream(
+                    'GET', url, timeout=self._httpx_timeout(timeout), **kwargs
+                ) as response:
+                    for chunk in response.iter_bytes(chunk_size=16384):
+                        chunks.append(chunk)
+                        received += len(chunk)
+                        if received >= max_bytes:
+                            break
+            except httpx.HTTPError as e:
+                raise self._to_requests_error(e) from e
+            converted = requests.Response()
+            converted.status_code = response.status_code
+            converted._content = b''.join(chunks)[:max_bytes]
+            converted.headers = CaseInsensitiveDict(response.headers)
+            converted.url = str(response.url)
+            # The body was only partly read, so use the declared charset alone
+            converted.encoding = response.charset_encoding
+            converted.reason = response.reason_phrase
+            status[0] = response.status_code
+            return converted
+
+    def close(self) -> None:
+        """Close every pooled connection held by this client."""
+        self._session.close()
+        if self._httpx_client is not None:
+            self._httpx_client.close()
+
+_shared_client: Optional[HttpClient] = None
+_shared_client_lock = threading.Lock()
+
+def get_http_client(config: Optional[AppConfig] = None) -> HttpClient:
+    """
+    Return the process-wide HTTP client, creating it from config on first use.
+    """
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = HttpClient.from_settings((config or get_config()).http)
+            logger.info(
+                f"HTTP client initialized (transport={_shared_client.transport}, "
+                f"timeout={_shared_client.timeout})"
+            )
+        return _shared_client
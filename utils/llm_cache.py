@@ -0,0 +1,233 @@
+"""
+Content-addressed cache for LLM responses, layered over the shared response cache.
+"""
+
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from crewai import LLM
+from crewai.llms.base_llm import BaseLLM, call_stop_override
+from pydantic import BaseModel, PrivateAttr
+
+from utils.config import AppConfig, get_config
+from utils.metrics import get_metrics
+from utils.rate_limit import RateController, get_rate_controller
+from utils.response_cache import ResponseCache, get_response_cache
+
+logger = logging.getLogger(__name__)
+
+# Name under which LLM entries are stored, aged and counted in the cache
+CACHE_ENDPOINT = 'llm'
+
+def _normalize_text(text: str) -> str:
+    """Collapse whitespace so re-indented prompts share an entry."""
+    return ' '.join(text.split())
+
+def normalize_messages(messages: Any) -> List[Dict[str, Any]]:
+    """Messages in a canonical form for hashing."""
+    if isinstance(messages, str):
+        messages = [{'role': 'user', 'content': messages}]
+    normalized = []
+    for message in messages:
+        message = dict(message)
+        if isinstance(message.get('content'), str):
+            message['content'] = _normalize_text(message['content'])
+        normalized.append(message)
+    return normalized
+
+def _tool_name(tool: Any) -> str:
+    if isinstance(tool, dict):
+        return tool.get('function', {}).get('name') or tool.get('name', '')
+    return getattr(tool, 'name', str(tool))
+
+class CachedLLM(BaseLLM):
+    """
+    Wraps a CrewAI LLM and serves repeated requests from a ResponseCache.
+
+    Entries are keyed on the normalized messages, model, temperature, stop
+    words, tool set and response schema, so the same prompt sent by a rerun,
+    a resumed run or another edition is answered without an API call.
+    Sampled calls (temperature above 0) are cached too, replaying the first
+    sample, unless cache_nondeterministic is off; responses that are tool
+    calls rather than text or structured output always bypass the cache. Expiry and
+    least-recently-used eviction come from the underlying ResponseCache.
+    Calls that miss the cache go through controller, if given, which paces
+    and retries them (see utils.rate_limit); cache may be None to use the
+    wrapper for rate control alone.
+    """
+
+    llm: BaseLLM
+    cache_nondeterministic: bool = True
+    _cache: Optional[ResponseCache] = PrivateAttr(default=None)
+    _controller: Optional[RateController] = PrivateAttr(default=None)
+
+    def __init__(
+        self,
+        llm: BaseLLM,
+        cache: Optional[ResponseCache],
+        cache_nondeterministic: bool = True,
+        controller: Optional[RateController] = None
+    ):
+        super().__init__(
+            llm=llm,
+            model=llm.model,
+            temperature=llm.temperature,
+            provider=llm.provider,
+            stop=list(llm.stop),
+            cache_nondeterministic=cache_nondeterministic
+        )
+        self._cache = cache
+        self._controller = controller
+
+    def cache_params(
+        self,
+        messages: Any,
+        tools: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+        response_model: Optional[type] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Request fields the cache key is built from, or None if uncacheable."""
+        temperature = self.llm.temperature or 0.0
+        if self._cache is None or (temperature > 0 and not self.cache_nondeterministic):
+            return None
+        tool_names = {_tool_name(tool) for tool in tools or []}
+        tool_names.update(available_functions or {})
+        return {
+            'model': self.llm.model,
+            'temperature': temperature,
+            'messages': normalize_messages(messages),
+            'stop': sorted(self.stop_sequences),
+            'tools': sorted(tool_names),
+            'response_model': response_model.__name__ if response_model else None,
+        }
+
+    @staticmethod
+    def _encode(result: Any) -> Optional[Dict[str, Any]]:
+        if isinstance(result, str):
+            return {'text': result}
+        if isinstance(result, BaseModel):
+            return {'structured': result.model_dump(mode='json')}
+        return None
+
+    @staticmethod
+    def _decode(entry: Dict[str, Any], response_model: Optional[type]) -> Any:
+        if 'structured' in entry:
+            if response_model is None:
+                return json.dumps(entry['structured'])
+            return response_model.model_validate(entry['structured'])
+        return entry['text']
+
+    def _lookup(self, params: Optional[Dict[str, Any]], response_model: Optional[type]) -> Any:
+        if params is None:
+            return None
+        entry = self._cache.get(CACHE_ENDPOINT, params)
+        if entry is None:
+            return None
+        try:
+            return self._decode(entry, response_model)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable LLM cache entry: {e}")
+            return None
+
+    def _store(self, params: Optional[Dict[str, Any]], result: Any) -> None:
+        entry = self._encode(result)
+        if params is not None and entry is not None:
+            self._cache.put(CACHE_ENDPOINT, params, entry)
+
+    def call(
+        self,
+        messages: Any,
+        tools: Optional[List[Any]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+        from_task: Any = None,
+        from_agent: Any = None,
+        response_model: Optional[type] = None
+    ) -> Any:
+        params = self.cache_params(messages, tools, available_functions, response_model)
+        start = time.perf_counter()
+        cached = self._lookup(params, response_model)
+        if cached is not None:
+            get_metrics().record_llm_call('cached', time.perf_counter() - start)
+            return cached
+        try:
+            with call_stop_override(self.llm, self.stop_sequences):
+                kwargs = dict(
+                    tools=tools, callbacks=callbacks, available_functions=available_functions,
+                    from_task=from_task, from_agent=from_agent, response_model=response_model
+                )
+                if self._controller is None:
+                    result = self.llm.call(messages, **kwargs)
+                else:
+                    result = self._controller.call(self.llm.call, messages, **kwargs)
+        except Exception:
+            get_metrics().record_llm_call('error', time.perf_counter() - start)
+            raise
+        get_metrics().record_llm_call('api', time.perf_counter() - start)
+        self._store(params, result)
+        return result
+
+    async def acall(
+        self,
+        messages: Any,
+        tools: Optional[List[Any]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+        from_task: Any = None,
+        from_agent: Any = None,
+        response_model: Optional[type] = None
+    ) -> Any:
+        params = self.cache_params(messages, tools, available_functions, response_model)
+        start = time.perf_counter()
+        cached = self._lookup(params, response_model)
+        if cached is not None:
+            get_metrics().record_llm_call('cached', time.perf_counter() - start)
+            return cached
+        try:
+            with call_stop_override(self.llm, self.stop_sequences):
+                kwargs = dict(
+                    tools=tools, callbacks=callbacks, available_functions=available_functions,
+                    from_task=from_task, from_agent=from_agent, response_model=response_model
+                )
+                if self._controller is None:
+                    result = await self.llm.acall(messages, **kwargs)
+                else:
+                    result = await self._controller.acall(self.llm.acall, messages, **kwargs)
+        except Exception:
+            get_metrics().record_llm_call('error', time.perf_counter() - start)
+            raise
+        get_metrics().record_llm_call('api', time.perf_counter() - start)
+        self._store(params, result)
+        return result
+
+    def supports_function_calling(self) -> bool:
+        return self.llm.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self.llm.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.llm.get_context_window_size()
+
+    def get_token_usage_summary(self):
+        """Usage of the wrapped LLM; cache hits cost no tokens."""
+        return self.llm.get_token_usage_summary()
+
+def build_llm(config: Optional[AppConfig] = None) -> BaseLLM:
+    """
+    The LLM configured under api.openai, wrapped in the response cache
+    unless cache.llm is disabled and in the model's rate controller unless
+    rate_limits.llm is.
+    """
+    config = config or get_config()
+    settings = config.api.openai
+    llm = LLM(model=settings.model, temperature=settings.temperature)
+    cache = get_response_cache(config, name='llm')
+    controller = get_rate_controller('llm', settings.model, config)
+    if cache is None and controller is None:
+        return llm
+    return CachedLLM(
+        llm, cache, cache_nondeterministic=config.cache.llm.cache_nondeterministic, controller=controller
+    )
@@ -0,0 +1,265 @@
+"""
+Per-run metrics: stage and article timings, HTTP and LLM calls, cache hit rates.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+PROMETHEUS_PREFIX = 'ai_digest'
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    return {
+        'count': len(values),
+        'total_seconds': round(sum(values), 6),
+        'p50_seconds': round(_percentile(values, 0.50), 6),
+        'p95_seconds': round(_percentile(values, 0.95), 6),
+        'max_seconds': round(max(values, default=0.0), 6),
+    }
+
+def _label_value(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _atomic_write(path: str, text: str) -> None:
+    Path(os.path.dirname(path) or '.').mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=f".{os.path.basename(path)}.")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+class RunMetrics:
+    """
+    Thread-safe collector for the measurements of one digest run.
+
+    Tools and agents record into the collector get_metrics() returns, which
+    is held in a context variable: start_run() gives each run its own, so
+    concurrent runs in separate threads or tasks never mix measurements,
+    and bind_metrics() carries it into thread-pool workers. Code outside
+    any run records into a shared fallback collector that is never
+    exported. AIDailyCrew exports its run's collector as a JSON report and
+    a Prometheus textfile when the run ends.
+    """
+
+    def __init__(self, run_id: Optional[str] = None):
+        self.run_id = run_id
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.status = 'running'
+        self._lock = threading.Lock()
+        self._stages: Dict[str, float] = {}
+        self._articles: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._http: Dict[tuple, List[float]] = defaultdict(list)
+        self._llm_calls: Dict[str, List[float]] = defaultdict(list)
+        self._llm_tokens: Dict[str, int] = defaultdict(int)
+        self._cache: Dict[str, Dict[str, int]] = defaultdict(lambda: {'hits': 0, 'misses': 0})
+        self._counts: Dict[str, int] = defaultdict(int)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a pipeline stage; repeated entries add up."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(name, time.perf_counter() - start)
+
+    def record_stage(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._stages[name] = self._stages.get(name, 0.0) + seconds
+
+    @contextmanager
+    def article(self, url: str, stage: str) -> Iterator[None]:
+        """Time the work one stage does on one article."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_article(url, stage, time.perf_counter() - start)
+
+    def record_article(self, url: str, stage: str, seconds: float) -> None:
+        with self._lock:
+            self._articles[url][stage] = self._articles[url].get(stage, 0.0) + seconds
+
+    def record_http(self, method: str, url: str, status: Any, seconds: float) -> None:
+        """Record one HTTP call; status is the response code or 'error'."""
+        host = urlsplit(url).hostname or url
+        with self._lock:
+            self._http[(host, method.upper(), str(status))].append(seconds)
+
+    def record_llm_call(self, outcome: str, seconds: float) -> None:
+        """Record one LLM request; outcome is 'api', 'cached' or 'error'."""
+        with self._lock:
+            self._llm_calls[outcome].append(seconds)
+
+    def record_llm_usage(self, prompt_tokens: int, completion_tokens: int, requests: int = 0) -> None:
+        with self._lock:
+            self._llm_tokens['prompt'] += prompt_tokens
+            self._llm_tokens['completion'] += completion_tokens
+            self._llm_tokens['requests'] += requests
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        with self._lock:
+            self._cache[cache]['hits' if hit else 'misses'] += 1
+
+    def count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += value
+
+    def finish(self, status: str) -> None:
+        self.status = status
+        self.finished_at = time.time()
+
+    def report(self) -> Dict[str, Any]:
+        """Everything recorded so far as a JSON-ready dict."""
+        with self._lock:
+            http: Dict[str, Any] = {}
+            for (host, method, status), values in sorted(self._http.items()):
+                entry = http.setdefault(host, {'by_status': {}, 'latency': []})
+                entry['by_status'][f"{method} {status}"] = len(values)
+                entry['latency'].extend(values)
+            for entry in http.values():
+                entry['latency'] = _summary(entry['latency'])
+
+            article_times = defaultdict(list)
+            for stages in self._articles.values():
+                for stage, seconds in stages.items():
+                    article_times[stage].append(seconds)
+
+            return {
+                'run_id': self.run_id,
+                'status': self.status,
+                'started_at': self.started_at,
+                'duration_seconds': round((self.finished_at or time.time()) - self.started_at, 6),
+                'stages': {name: round(seconds, 6) for name, seconds in self._stages.items()},
+                'articles': {
+                    'per_stage': {stage: _summary(values) for stage, values in article_times.items()},
+                    'by_url': {url: {k: round(v, 6) for k, v in stages.items()}
+                               for url, stages in self._articles.items()},
+                },
+                'http': http,
+                'llm': {
+                    'calls': {outcome: _summary(values) for outcome, values in self._llm_calls.items()},
+                    'tokens': dict(self._llm_tokens),
+                },
+                'cache': {
+                    name: dict(counts, hit_rate=round(
+                        counts['hits'] / max(1, counts['hits'] + counts['misses']), 4
+                    ))
+                    for name, counts in self._cache.items()
+                },
+                'counts': dict(self._counts),
+            }
+
+    def prometheus(self) -> str:
+        """The run's metrics in the Prometheus text exposition format."""
+        report = self.report()
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List[tuple]) -> None:
+            full = f"{PROMETHEUS_PREFIX}_{name}"
+            lines.append(f"# HELP {full} {help_text}")
+            lines.append(f"# TYPE {full} {kind}")
+            for labels, value in samples:
+                label_text = ','.join(f'{k}="{_label_value(v)}"' for k, v in labels.items())
+                lines.append(f"{full}{{{label_text}}} {value}" if label_text else f"{full} {value}")
+
+        metric('last_run_timestamp_seconds', 'gauge', "Start time of the last run.",
+               [({}, report['started_at'])])
+        metric('last_run_duration_seconds', 'gauge', "Wall time of the last run.",
+               [({}, report['duration_seconds'])])
+        metric('last_run_success', 'gauge', "1 if the last run completed, else 0.",
+               [({}, int(report['status'] == 'completed'))])
+        metric('stage_duration_seconds', 'gauge', "Wall time per stage in the last run.",
+               [({'stage': stage}, seconds) for stage, seconds in report['stages'].items()])
+        metric('article_stage_seconds', 'gauge', "Per-article stage time in the last run.",
+               [({'stage': stage, 'quantile': q}, summary[f'p{int(q * 100)}_seconds'])
+                for stage, summary in report['articles']['per_stage'].items() for q in (0.5, 0.95)])
+        with self._lock:
+            http_items = sorted(self._http.items())
+            llm_items = sorted(self._llm_calls.items())
+        metric('http_requests', 'gauge', "HTTP calls in the last run.",
+               [({'host': host, 'method': method, 'status': status}, len(values))
+                for (host, method, status), values in http_items])
+        metric('http_request_seconds_sum', 'gauge', "Total HTTP call time in the last run.",
+               [({'host': host, 'method': method, 'status': status}, round(sum(values), 6))
+                for (host, method, status), values in http_items])
+        metric('llm_calls', 'gauge', "LLM requests in the last run by outcome.",
+               [({'outcome': outcome}, len(values)) for outcome, values in llm_items])
+        metric('llm_tokens', 'gauge', "LLM tokens used in the last run.",
+               [({'kind': kind}, value) for kind, value in report['llm']['tokens'].items()
+                if kind != 'requests'])
+        metric('cache_requests', 'gauge', "Cache lookups in the last run.",
+               [({'cache': name, 'result': result}, counts[key])
+                for name, counts in report['cache'].items()
+                for result, key in (('hit', 'hits'), ('miss', 'misses'))])
+        metric('articles', 'gauge', "Article counts at each point of the last run.",
+               [({'stage': name}, value) for name, value in report['counts'].items()])
+        return '\n'.join(lines) + '\n'
+
+    def export(self, report_dir: Optional[str], textfile: Optional[str]) -> None:
+        """Write the JSON report and/or the Prometheus textfile atomically."""
+        try:
+            if report_dir:
+                path = os.path.join(report_dir, f"{self.run_id or 'run'}.json")
+                _atomic_write(path, json.dumps(self.report(), indent=2))
+                logger.info(f"Metrics report written to {path}")
+            if textfile:
+                _atomic_write(textfile, self.prometheus())
+        except OSError as e:
+            logger.error(f"Error writing metrics: {e}")
+
+# Scoped to the thread or task that started the run (and the tasks it starts),
+# so runs in one process, such as concurrent editions, keep separate metrics;
+# calls outside any run go to a process-wide collector
+_current: ContextVar[RunMetrics] = ContextVar('run_metrics', default=RunMetrics())
+
+def get_metrics() -> RunMetrics:
+    """The collector of the run in progress in this thread or task."""
+    return _current.get()
+
+def start_run(run_id: Optional[str] = None) -> RunMetrics:
+    """Start collecting metrics for a new run in this thread or task."""
+    metrics = RunMetrics(run_id)
+    _current.set(metrics)
+    return metrics
+
+def bind_metrics(fn: Callable[..., T]) -> Callable[..., T]:
+    """
+    fn recording to the caller's run wherever it is called. Thread pools do
+    not carry context variables over to their workers, so work handed to
+    one is wrapped with this.
+    """
+    metrics = get_metrics()
+
+    @wraps(fn)
+    def bound(*args: Any, **kwargs: Any) -> T:
+        token = _current.set(metrics)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return bound
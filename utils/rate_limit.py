@@ -0,0 +1,358 @@
+"""
+Shared rate control for outbound API calls: pacing, retries, adaptive concurrency and circuit breaking.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from utils.config import AppConfig, RateLimitSettings, get_config
+from utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit breaker is open."""
+
+class TokenBucket:
+    """
+    Paces calls to `rate` per second with bursts of up to `burst`.
+
+    reserve() always takes a token and returns how long the caller has to
+    wait for it, so waiting happens outside the lock and works the same for
+    threads and coroutines.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = float(max(1, burst))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take a token; returns the seconds to wait before using it."""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def hold(self, seconds: float) -> None:
+        """Hand out no token for the next `seconds` (a server's Retry-After)."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+class AdaptiveConcurrency:
+    """
+    Concurrency limit adjusted by AIMD: each success adds 1/limit (about one
+    slot per limit's worth of calls) up to maximum, and throttling halves it
+    down to minimum, at most once per cooldown so one burst of rejected
+    in-flight calls counts once.
+    """
+
+    def __init__(self, minimum: int, maximum: int, decrease: float = 0.5, cooldown: float = 1.0):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.limit = float(maximum)
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def try_acquire(self) -> bool:
+        with self._condition:
+            if self._in_flight < int(self.limit):
+                self._in_flight += 1
+                return True
+            return False
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self._in_flight >= int(self.limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    async def acquire_async(self) -> None:
+        """acquire() for coroutines; polls so that no event loop thread blocks."""
+        delay = 0.005
+        while not self.try_acquire():
+            await asyncio.sleep(delay)
+            delay = min(0.1, delay * 2)
+
+    def release(self) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+    def on_success(self) -> None:
+        with self._condition:
+            before = int(self.limit)
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            if int(self.limit) > before:
+                self._condition.notify()
+
+    def on_throttle(self) -> None:
+        with self._condition:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.cooldown:
+                self.limit = max(self.minimum, self.limit * self.decrease)
+                self._last_decrease = now
+                logger.info(f"Throttled; concurrency limit lowered to {int(self.limit)}")
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures, rejecting calls
+    with CircuitOpenError; after reset_seconds one trial call is let
+    through, which closes the circuit again if it succeeds.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if self._probing or time.monotonic() - self._opened_at >= self.reset_seconds:
+                return 'half_open'
+            return 'open'
+
+    def allow(self) -> bool:
+        """
+        Raise CircuitOpenError unless a call may go through now; returns
+        True if the call is the half-open trial.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if not self._probing and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self._probing = True
+                logger.info(f"Circuit for {self.name} half-open; sending a trial call")
+                return True
+        get_metrics().count('circuit_rejections')
+        raise CircuitOpenError(f"Circuit for {self.name} is open after repeated failures")
+
+    def abandon_trial(self) -> None:
+        """The trial call ended without an outcome (it was cancelled); let the next call try."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info(f"Circuit for {self.name} closed")
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or (self._opened_at is None and self._failures >= self.failure_threshold):
+                logger.warning(f"Circuit for {self.name} opened after {self._failures} failures")
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+def classify(error: BaseException) -> Optional[str]:
+    """
+    'throttled' for rate limiting (HTTP 429), 'transient' for timeouts,
+    connection errors and 5xx responses, None for errors a retry will not
+    fix. Works for requests, httpx, OpenAI and LiteLLM errors alike, by
+    status code where the error carries one and by type name otherwise.
+    """
+    status = getattr(error, 'status_code', None)
+    response = getattr(error, 'response', None)
+    if not isinstance(status, int) and response is not None:
+        status = getattr(response, 'status_code', None)
+    if isinstance(status, int):
+        if status == 429:
+            return 'throttled'
+        return 'transient' if status >= 500 or status == 408 else None
+    name = type(error).__name__
+    if 'RateLimit' in name:
+        return 'throttled'
+    if isinstance(error, (TimeoutError, ConnectionError)) or 'Timeout' in name or 'Connection' in name:
+        return 'transient'
+    return None
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the server asked to wait (Retry-After or retry-after-ms), if it did."""
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if not headers:
+        return None
+    try:
+        if headers.get('retry-after-ms'):
+            return max(0.0, float(headers['retry-after-ms']) / 1000)
+        value = headers.get('retry-after')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class RateController:
+    """
+    Runs calls to one endpoint under a token bucket, an AIMD concurrency
+    limit and a circuit breaker, retrying throttled and transient failures.
+
+    Retries wait as long as the server's Retry-After asks, which also holds
+    back every other caller of the endpoint, or else an exponential backoff
+    with full jitter. Other errors are raised at once. Once the circuit is
+    open, calls fail fast with CircuitOpenError so callers can degrade
+    instead of queueing behind a dead endpoint.
+    """
+
+    def __init__(self, name: str, settings: RateLimitSettings):
+        self.name = name
+        self.settings = settings
+        self.bucket = None
+        if settings.requests_per_second:
+            self.bucket = TokenBucket(settings.requests_per_second, settings.burst)
+        self.concurrency = AdaptiveConcurrency(settings.min_concurrent, settings.max_concurrent)
+        self.breaker = CircuitBreaker(name, settings.failure_threshold, settings.reset_seconds)
+
+    def _succeeded(self) -> None:
+        self.concurrency.on_success()
+        self.breaker.record_success()
+
+    def _failed(self, attempt: int, error: BaseException, trial: bool) -> Optional[float]:
+        """
+        Record a failed attempt; returns the delay before retrying, or None to
+        give up. The breaker counts calls, not attempts: a transient error
+        counts once, when the call gives up on it, so a single call retrying
+        a flaky endpoint cannot open the circuit by itself. A half-open trial
+        gives up on its first transient error.
+        """
+        kind = classify(error)
+        if kind != 'transient':
+            # The endpoint answered, so it is up
+            self.breaker.record_success()
+        if kind == 'throttled':
+            self.concurrency.on_throttle()
+            get_metrics().count('throttled')
+        delay = None
+        if kind is not None and not (trial and kind == 'transient'):
+            delay = self._retry_delay(attempt, error, kind)
+        if delay is None and kind == 'transient':
+            self.breaker.record_failure()
+        return delay
+
+    def _retry_delay(self, attempt: int, error: BaseException, kind: str) -> Optional[float]:
+        """The wait before retry attempt + 1, or None if the call should give up."""
+        if attempt >= self.settings.max_retries:
+            return None
+        settings = self.settings
+        wait = retry_after(error)
+        if wait is not None:
+            if wait > settings.max_retry_after_seconds:
+                return None
+            if self.bucket is not None:
+                self.bucket.hold(wait)
+            delay = wait + random.uniform(0, settings.backoff_base_seconds)
+        else:
+            delay = random.uniform(0, min(settings.backoff_max_seconds, settings.backoff_base_seconds * 2 ** attempt))
+        get_metrics().count('retries')
+        logger.warning(
+            f"{self.name} call failed ({kind}: {error}); retry {attempt + 1}/{settings.max_retries} in {delay:.2f}s"
+        )
+        return delay
+
+    def call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """fn(*args, **kwargs) under the endpoint's limits, retried as needed."""
+        attempt = 0
+        while True:
+            trial = self.breaker.allow()
+            self.concurrency.acquire()
+            try:
+                if self.bucket is not None:
+                    time.sleep(self.bucket.reserve())
+                result = fn(*args, **kwargs)
+            except Exception as error:
+                delay = self._failed(attempt, error, trial)
+                if delay is None:
+                    raise
+            except BaseException:
+                if trial:
+                    self.breaker.abandon_trial()
+                raise
+            else:
+                self._succeeded()
+                return result
+            finally:
+                self.concurrency.release()
+            time.sleep(delay)
+            attempt += 1
+
+    async def acall(self, fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        """call() for coroutine functions."""
+        attempt = 0
+        while True:
+            trial = self.breaker.allow()
+            try:
+                await self.concurrency.acquire_async()
+            except BaseException:
+                if trial:
+                    self.breaker.abandon_trial()
+                raise
+            try:
+                if self.bucket is not None:
+                    await asyncio.sleep(self.bucket.reserve())
+                result = await fn(*args, **kwargs)
+            except Exception as error:
+                delay = self._failed(attempt, error, trial)
+                if delay is None:
+                    raise
+            except BaseException:
+                # Cancelled (say, by asyncio.wait_for) before an outcome
+                if trial:
+                    self.breaker.abandon_trial()
+                raise
+            else:
+                self._succeeded()
+                return result
+            finally:
+                self.concurrency.release()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+_controllers: Dict[Tuple[str, str], RateController] = {}
+_controllers_lock = threading.Lock()
+
+def get_rate_controller(name: str, key: str = '', config: Optional[AppConfig] = None) -> Optional[RateController]:
+    """
+    The process-wide controller for key (an endpoint or model) under the
+    rate_limits.<name> settings, created on first use and replaced when
+    those settings change (say, on a daemon's config reload); None if
+    disabled.
+    """
+    settings: RateLimitSettings = getattr((config or get_config()).rate_limits, name)
+    if not settings.enabled:
+        return None
+    with _controllers_lock:
+        controller = _controllers.get((name, key))
+        if controller is None or controller.settings != settings:
+            controller = _controllers[(name, key)] = RateController(f"{name} {key}".strip(), settings)
+        return controller
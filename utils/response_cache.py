@@ -0,0 +1,183 @@
+"""
+Persistent TTL cache for API responses, backed by SQLite in WAL mode.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+from utils.config import AppConfig, ResponseCacheSettings, get_config
+from utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """
+    On-disk response cache keyed by endpoint and request parameters.
+
+    Entries expire after a per-endpoint TTL and the least recently used
+    entries are evicted once max_entries is exceeded. Several processes can
+    share one cache file: SQLite runs in WAL mode, so readers never block
+    the writer, and writers wait on a busy timeout instead of failing.
+    Hit and miss counters are kept per endpoint in the database itself.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: Optional[Dict[str, float]] = None,
+        max_entries: int = 5000
+    ):
+        self.path = path
+        self.ttl_seconds = dict(ttl_seconds or {})
+        self.max_entries = max_entries
+        self._local = threading.local()
+        Path(os.path.dirname(path) or '.').mkdir(parents=True, exist_ok=True)
+        self._create_schema()
+
+    @classmethod
+    def from_settings(cls, settings: ResponseCacheSettings) -> 'ResponseCache':
+        """Build a cache from one entry of the `cache` configuration section."""
+        return cls(
+            path=settings.path,
+            ttl_seconds=settings.ttl_seconds,
+            max_entries=settings.max_entries
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection; sqlite3 connections are not shared."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self) -> None:
+        conn = self._connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS stats (
+                endpoint TEXT PRIMARY KEY,
+                hits INTEGER NOT NULL DEFAULT 0,
+                misses INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+
+    @staticmethod
+    def endpoint_name(endpoint: str) -> str:
+        """Name used for TTL lookup and stats, e.g. 'news' for .../news."""
+        path = urlparse(endpoint).path.strip('/')
+        return path.rsplit('/', 1)[-1] or endpoint
+
+    @staticmethod
+    def make_key(endpoint: str, params: Dict[str, Any]) -> str:
+        """Stable key for an endpoint and its request parameters."""
+        raw = json.dumps({'endpoint': endpoint, 'params': params}, sort_keys=True)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def ttl_for(self, endpoint: str) -> float:
+        name = self.endpoint_name(endpoint)
+        return float(self.ttl_seconds.get(name, self.ttl_seconds.get('default', 3600)))
+
+    def _count(self, endpoint: str, column: str) -> None:
+        self._connection().execute(
+            f"INSERT INTO stats (endpoint, {column}) VALUES (?, 1) "
+            f"ON CONFLICT(endpoint) DO UPDATE SET {column} = {column} + 1",
+            (self.endpoint_name(endpoint),)
+        )
+
+    def get(self, endpoint: str, params: Dict[str, Any]) -> Optional[Any]:
+        """Return the cached response, or None if missing or expired."""
+        key = self.make_key(endpoint, params)
+        now = time.time()
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] <= now:
+            if row is not None:
+                conn.execute("DELETE FROM entries WHERE key = ? AND expires_at <= ?", (key, now))
+            self._count(endpoint, 'misses')
+            get_metrics().record_cache(self.endpoint_name(endpoint), hit=False)
+            return None
+        conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+        self._count(endpoint, 'hits')
+        get_metrics().record_cache(self.endpoint_name(endpoint), hit=True)
+        return json.loads(row[0])
+
+    def put(self, endpoint: str, params: Dict[str, Any], value: Any) -> None:
+        """Store a response and evict expired and least recently used entries."""
+        key = self.make_key(endpoint, params)
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, endpoint, value, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, self.endpoint_name(endpoint), json.dumps(value),
+                 now, now + self.ttl_for(endpoint), now)
+            )
+            conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+            conn.execute(
+                "DELETE FROM entries WHERE key IN ("
+                "SELECT key FROM entries ORDER BY last_access ASC "
+                "LIMIT max(0, (SELECT COUNT(*) FROM entries) - ?))",
+                (self.max_entries,)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit and miss counters per endpoint, across every process using the cache."""
+        rows = self._connection().execute("SELECT endpoint, hits, misses FROM stats").fetchall()
+        return {endpoint: {'hits': hits, 'misses': misses} for endpoint, hits, misses in rows}
+
+    def clear(self) -> None:
+        """Remove every cached entry and reset the counters."""
+        conn = self._connection()
+        conn.execute("DELETE FROM entries")
+        conn.execute("DELETE FROM stats")
+
+_shared_caches: Dict[str, ResponseCache] = {}
+_shared_caches_lock = threading.Lock()
+
+def get_response_cache(
+    config: Optional[AppConfig] = None,
+    name: str = 'serper'
+) -> Optional[ResponseCache]:
+    """
+    Return the process-wide cache for a `cache` config entry, or None if disabled.
+    """
+    settings: ResponseCacheSettings = getattr((config or get_config()).cache, name)
+    if not settings.enabled:
+        return None
+    with _shared_caches_lock:
+        cache = _shared_caches.get(name)
+        if cache is None:
+            cache = ResponseCache.from_settings(settings)
+            _shared_caches[name] = cache
+            logger.info(f"Response cache '{name}' opened at {cache.path}")
+        return cache
@@ -0,0 +1,70 @@
+"""
+Serper.dev API client shared by the news and verification tools.
+"""
+
+import logging
+from typing import Any, Dict
+
+import requests
+
+from utils.config import AppConfig
+from utils.http_client import get_http_client
+from utils.rate_limit import CircuitOpenError, get_rate_controller
+from utils.response_cache import get_response_cache
+
+logger = logging.getLogger(__name__)
+
+class SerperClient:
+    """
+    Sends Serper queries over the shared HTTP pool and caches the responses.
+
+    Identical queries to the same endpoint are answered from the on-disk
+    response cache until that endpoint's TTL expires. Requests that do go
+    out are paced and retried per endpoint by the rate_limits.serper
+    controller (see utils.rate_limit).
+    """
+
+    def __init__(self, api_key: str, config: AppConfig):
+        self._api_key = api_key
+        self._config = config
+        self._http = get_http_client(config)
+        self._cache = get_response_cache(config, 'serper')
+
+    def _post(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        response = self._http.post(
+            endpoint,
+            headers={
+                "X-API-KEY": self._api_key,
+                "Content-Type": "application/json"
+            },
+            json=payload
+        )
+        response.raise_for_status()
+        logger.info(f"Serper API response status: {response.status_code}")
+        return response.json()
+
+    def search(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run a Serper query and return the decoded JSON response.
+        Raises requests.exceptions.RequestException on transport or HTTP errors
+        that retrying did not fix, and requests.exceptions.RetryError without
+        a call while the endpoint's circuit breaker is open.
+        """
+        if self._cache is not None:
+            cached = self._cache.get(endpoint, payload)
+            if cached is not None:
+                logger.info(f"Serper cache hit for {endpoint} query: {payload.get('q')}")
+                return cached
+
+        controller = get_rate_controller('serper', endpoint, self._config)
+        if controller is None:
+            data = self._post(endpoint, payload)
+        else:
+            try:
+                data = controller.call(self._post, endpoint, payload)
+            except CircuitOpenError as e:
+                raise requests.exceptions.RetryError(str(e)) from e
+
+        if self._cache is not None:
+            self._cache.put(endpoint, payload, data)
+        return data
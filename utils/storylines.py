@@ -0,0 +1,361 @@
+"""
+Cross-day storyline tracking with hashed TF-IDF vectors and NumPy similarity.
+"""
+
+import hashlib
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.config import AppConfig, get_config
+from utils.dedup import names
+from utils.domain_policy import normalize_url
+
+if TYPE_CHECKING:
+    from tools.news_scraper_tool import NewsArticle
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset("""
+    a an and are as at be by for from has have how in is it its of on or says
+    said that the their this to was were what when who why will with new after
+    over into about more than report reports exclusive
+""".split())
+
+# Title terms count this many times toward an article's term frequency
+TITLE_WEIGHT = 2
+# Weight of the terms of names (companies, products, people, figures) in an
+# article's vector. Rival stories are told in the same words ("X raises $N
+# billion in funding round"), so without it they outscore real follow-ups.
+NAME_WEIGHT = 3.0
+# Words of fetched content, after the snippet, that go into an article's vector
+CONTENT_WORDS = 200
+DAY_SECONDS = 86400.0
+
+@dataclass
+class Storyline:
+    """A story followed across days, named after the article that started it."""
+    id: int
+    title: str
+    first_seen: datetime
+    last_seen: datetime
+    articles: int
+
+class _Features:
+    """Signed feature hashing of tokens into a fixed number of dimensions."""
+
+    def __init__(self, dimensions: int):
+        self.dimensions = dimensions
+        self._slots: Dict[str, Tuple[int, float]] = {}
+
+    def slot(self, token: str) -> Tuple[int, float]:
+        slot = self._slots.get(token)
+        if slot is None:
+            value = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+            slot = (value % self.dimensions, 1.0 if value >> 63 else -1.0)
+            self._slots[token] = slot
+        return slot
+
+    def matrix(self, articles: Sequence['NewsArticle']) -> np.ndarray:
+        """
+        One row per article of sublinear (1 + log) term frequencies over the
+        title, snippet and lead of its content, terms of the names in its
+        title and snippet weighted by NAME_WEIGHT, each term's count signed
+        and added into its hashed column.
+        """
+        rows, columns, values = [], [], []
+        for row, article in enumerate(articles):
+            named = {t for name in names(article.title, article.snippet or '') for t in _TOKEN_RE.findall(name)}
+            counts: Dict[str, int] = {}
+            for token in _tokens(article.title):
+                counts[token] = counts.get(token, 0) + TITLE_WEIGHT
+            text = article.snippet or ''
+            if article.content:
+                text += ' ' + ' '.join(article.content.split()[:CONTENT_WORDS])
+            for token in _tokens(text):
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                column, sign = self.slot(token)
+                rows.append(row)
+                columns.append(column)
+                weight = NAME_WEIGHT if token in named else 1.0
+                values.append(sign * weight * (1.0 + math.log(count)))
+        cells = np.array(rows, dtype=np.intp) * self.dimensions + np.array(columns, dtype=np.intp)
+        matrix = np.bincount(cells, weights=values, minlength=len(articles) * self.dimensions)
+        return matrix.reshape(len(articles), self.dimensions).astype(np.float32)
+
+def _tokens(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS and len(t) > 1]
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+class StorylineTracker:
+    """
+    Assigns articles to storylines that persist across runs.
+
+    Each article becomes a vector of hashed term frequencies weighted by
+    inverse document frequency, where the document frequencies are kept
+    over every article the tracker has seen. A storyline is the sum of its
+    articles' vectors. New articles are scored against the centroids of all
+    storylines active within active_days, and against each other, with one
+    matrix product per batch; an article joins the best storyline scoring
+    at least similarity_threshold (cosine) or starts a new one. State lives
+    in SQLite (WAL mode), so it grows one run at a time and an article
+    already assigned keeps its storyline.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dimensions: int = 1024,
+        similarity_threshold: float = 0.4,
+        active_days: float = 14,
+        batch_size: int = 512
+    ):
+        self.path = path
+        self.similarity_threshold = similarity_threshold
+        self.active_days = active_days
+        self.batch_size = batch_size
+        self._features = _Features(dimensions)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        Path(os.path.dirname(path) or '.').mkdir(parents=True, exist_ok=True)
+        conn = self._connection()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS storylines (
+                id INTEGER PRIMARY KEY,
+                title TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                articles INTEGER NOT NULL,
+                centroid BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_storylines_last_seen ON storylines(last_seen);
+            CREATE TABLE IF NOT EXISTS members (
+                url_key TEXT PRIMARY KEY,
+                storyline INTEGER NOT NULL,
+                published REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS state (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL
+            );
+        """)
+        row = conn.execute("SELECT value FROM state WHERE key = 'dimensions'").fetchone()
+        if row is not None and int(row[0]) != dimensions:
+            logger.warning(
+                f"Storyline state at {path} uses {int(row[0])} dimensions, not {dimensions}; starting over"
+            )
+            conn.executescript("DELETE FROM storylines; DELETE FROM members; DELETE FROM state;")
+        conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('dimensions', ?)", (dimensions,))
+
+    @classmethod
+    def from_config(cls, config: Optional[AppConfig] = None) -> Optional['StorylineTracker']:
+        """Open the configured tracker, or return None if it is disabled."""
+        settings = (config or get_config()).storylines
+        if not settings.enabled:
+            return None
+        return cls(
+            settings.path,
+            dimensions=settings.dimensions,
+            similarity_threshold=settings.similarity_threshold,
+            active_days=settings.active_days,
+            batch_size=settings.batch_size
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _members(self, conn: sqlite3.Connection, keys: Sequence[str]) -> Dict[str, int]:
+        found = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            found.update(conn.execute(
+                f"SELECT url_key, storyline FROM members WHERE url_key IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchall())
+        return found
+
+    def _storylines(self, conn: sqlite3.Connection, ids: Iterable[int]) -> Dict[int, Storyline]:
+        ids = list(set(ids))
+        found = {}
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            for id, title, first_seen, last_seen, articles in conn.execute(
+                "SELECT id, title, first_seen, last_seen, articles FROM storylines "
+                f"WHERE id IN ({','.join('?' * len(chunk))})",
+                chunk
+            ):
+                found[id] = Storyline(
+                    id, title, datetime.fromtimestamp(first_seen), datetime.fromtimestamp(last_seen), articles
+                )
+        return found
+
+    def assign(self, articles: Sequence['NewsArticle']) -> Dict[str, Storyline]:
+        """
+        Place each article not seen before in a storyline and update the
+        tracker's state. Articles are taken in publication order, in batches
+        of batch_size, so a backlog of stored history is replayed the way
+        it happened. Returns the storyline of every article, new or already
+        assigned, by normalized URL.
+        """
+        by_key: Dict[str, 'NewsArticle'] = {}
+        for article in articles:
+            by_key.setdefault(normalize_url(article.url), article)
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                assigned = self._members(conn, list(by_key))
+                fresh = sorted(
+                    (key for key in by_key if key not in assigned),
+                    key=lambda key: by_key[key].published_date
+                )
+                if fresh:
+                    assigned.update(self._assign(conn, [(key, by_key[key]) for key in fresh]))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            storylines = self._storylines(conn, assigned.values())
+        return {key: storylines[id] for key, id in assigned.items()}
+
+    def _assign(self, conn: sqlite3.Connection, fresh: List[Tuple[str, 'NewsArticle']]) -> Dict[str, int]:
+        dimensions = self._features.dimensions
+        row = conn.execute("SELECT value FROM state WHERE key = 'df'").fetchone()
+        df = np.frombuffer(row[0], dtype=np.float64).copy() if row else np.zeros(dimensions)
+        row = conn.execute("SELECT value FROM state WHERE key = 'documents'").fetchone()
+        documents = int(row[0]) if row else 0
+
+        # Every storyline that can still be active for the oldest new article
+        earliest = fresh[0][1].published_date.timestamp() - self.active_days * DAY_SECONDS
+        loaded = conn.execute(
+            "SELECT id, title, first_seen, last_seen, articles, centroid FROM storylines WHERE last_seen >= ?",
+            (earliest,)
+        ).fetchall()
+        ids: List[Optional[int]] = [r[0] for r in loaded]
+        titles = [r[1] for r in loaded]
+        first_seen = [r[2] for r in loaded]
+        last_seen = np.array([r[3] for r in loaded], dtype=np.float64)
+        counts = np.array([r[4] for r in loaded], dtype=np.int64)
+        centroids = np.zeros((len(loaded), dimensions), dtype=np.float32)
+        for i, r in enumerate(loaded):
+            centroids[i] = np.frombuffer(r[5], dtype=np.float32)
+        touched = np.zeros(len(loaded), dtype=bool)
+
+        assignment: List[int] = []
+        threshold = self.similarity_threshold
+        for start in range(0, len(fresh), self.batch_size):
+            batch = [article for _, article in fresh[start:start + self.batch_size]]
+            vectors = self._features.matrix(batch)
+            published = np.array([a.published_date.timestamp() for a in batch], dtype=np.float64)
+            df += (vectors != 0).sum(axis=0)
+            documents += len(batch)
+            idf = (np.log((1.0 + documents) / (1.0 + df)) + 1.0).astype(np.float32)
+            queries = _normalize_rows(vectors * idf)
+
+            existing = len(ids)
+            best = np.full(len(batch), -1, dtype=np.intp)
+            best_score = np.full(len(batch), -np.inf, dtype=np.float32)
+            if existing:
+                active = last_seen >= published.min() - self.active_days * DAY_SECONDS
+                scores = queries @ _normalize_rows(centroids * idf).T
+                scores[:, ~active] = -np.inf
+                best = scores.argmax(axis=1)
+                best_score = scores[np.arange(len(batch)), best]
+            within = queries @ queries.T
+
+            labels = np.empty(len(batch), dtype=np.intp)
+            for i in range(len(batch)):
+                label = best[i] if best_score[i] >= threshold else -1
+                if i:
+                    j = int(within[i, :i].argmax())
+                    if within[i, j] >= threshold and within[i, j] > best_score[i]:
+                        label = labels[j]
+                if label < 0:
+                    label = len(ids)
+                    ids.append(None)
+                    titles.append(batch[i].title)
+                    first_seen.append(published[i])
+                labels[i] = label
+
+            grown = len(ids) - existing
+            if grown:
+                centroids = np.vstack([centroids, np.zeros((grown, dimensions), dtype=np.float32)])
+                last_seen = np.concatenate([last_seen, np.full(grown, -np.inf)])
+                counts = np.concatenate([counts, np.zeros(grown, dtype=np.int64)])
+                touched = np.concatenate([touched, np.zeros(grown, dtype=bool)])
+            np.add.at(centroids, labels, vectors)
+            np.add.at(counts, labels, 1)
+            np.maximum.at(last_seen, labels, published)
+            touched[labels] = True
+            assignment.extend(labels.tolist())
+
+        for index in np.flatnonzero(touched):
+            values = (titles[index], first_seen[index], last_seen[index], int(counts[index]),
+                      centroids[index].tobytes())
+            if ids[index] is None:
+                ids[index] = conn.execute(
+                    "INSERT INTO storylines (title, first_seen, last_seen, articles, centroid) "
+                    "VALUES (?, ?, ?, ?, ?)", values
+                ).lastrowid
+            else:
+                conn.execute(
+                    "UPDATE storylines SET title = ?, first_seen = ?, last_seen = ?, articles = ?, centroid = ? "
+                    "WHERE id = ?", values + (ids[index],)
+                )
+        conn.executemany(
+            "INSERT INTO members (url_key, storyline, published) VALUES (?, ?, ?)",
+            [(key, ids[label], article.published_date.timestamp())
+             for (key, article), label in zip(fresh, assignment)]
+        )
+        conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('df', ?)", (df.tobytes(),))
+        conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('documents', ?)", (documents,))
+        created = sum(1 for index in np.flatnonzero(touched) if index >= len(loaded))
+        logger.info(f"Assigned {len(fresh)} articles to storylines; {created} new storylines")
+        return {key: ids[label] for (key, _), label in zip(fresh, assignment)}
+
+    def storylines_of(self, urls: Iterable[str]) -> Dict[str, Storyline]:
+        """Storyline of each already assigned URL, by normalized URL."""
+        conn = self._connection()
+        assigned = self._members(conn, list({normalize_url(url) for url in urls}))
+        storylines = self._storylines(conn, assigned.values())
+        return {key: storylines[id] for key, id in assigned.items()}
+
+    def stats(self) -> Dict[str, int]:
+        conn = self._connection()
+        return {
+            'storylines': conn.execute("SELECT COUNT(*) FROM storylines").fetchone()[0],
+            'articles': conn.execute("SELECT COUNT(*) FROM members").fetchone()[0],
+        }
+
+def group_by_storyline(items: Sequence, storylines: Dict[str, Storyline]) -> List:
+    """
+    items (anything with a url) reordered so that those in the same
+    storyline are adjacent, each group where its first item was; order is
+    otherwise kept.
+    """
+    groups: Dict[object, List] = {}
+    for item in items:
+        storyline = storylines.get(normalize_url(item.url))
+        groups.setdefault(storyline.id if storyline else ('url', item.url), []).append(item)
+    return [item for group in groups.values() for item in group]
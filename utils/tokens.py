@@ -0,0 +1,113 @@
+"""
+Local token counting and budgeting for LLM prompts.
+"""
+
+import logging
+import math
+import re
+from functools import lru_cache
+from typing import List, Optional
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken is optional; a character-based estimate is used instead
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Average characters per token for English text with the OpenAI tokenizers
+_CHARS_PER_TOKEN = 4.0
+_WORD_RE = re.compile(r"\S+")
+
+class BudgetExceeded(Exception):
+    """Raised when a request would exceed a token budget."""
+
+@lru_cache(maxsize=8)
+def _encoding(model: Optional[str]):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("cl100k_base")
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Number of tokens text encodes to for model.
+    Exact with tiktoken installed, otherwise a slightly pessimistic estimate
+    from character and word counts.
+    """
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return max(math.ceil(len(text) / _CHARS_PER_TOKEN), len(_WORD_RE.findall(text)))
+
+def truncate_to_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """Cut text to at most max_tokens, on a paragraph or word boundary where possible."""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    encoding = _encoding(model)
+    if encoding is not None:
+        cut = encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+    else:
+        cut = text[:int(max_tokens * _CHARS_PER_TOKEN)]
+    boundary = max(cut.rfind('\n\n'), cut.rfind(' '))
+    return cut[:boundary] if boundary > len(cut) // 2 else cut
+
+def chunk_paragraphs(text: str, max_tokens: int, model: Optional[str] = None) -> List[str]:
+    """
+    Split text into chunks of at most max_tokens, keeping paragraphs whole.
+    Paragraphs are separated by blank lines; a paragraph longer than
+    max_tokens is split at sentence ends.
+    """
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+    pieces: List[str] = []
+    for paragraph in paragraphs:
+        if count_tokens(paragraph, model) <= max_tokens:
+            pieces.append(paragraph)
+            continue
+        for sentence in re.split(r"(?<=[.!?])\s+", paragraph):
+            while count_tokens(sentence, model) > max_tokens:
+                head = truncate_to_tokens(sentence, max_tokens, model)
+                pieces.append(head)
+                sentence = sentence[len(head):].lstrip()
+            if sentence:
+                pieces.append(sentence)
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for piece in pieces:
+        tokens = count_tokens(piece, model)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append('\n\n'.join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+    if current:
+        chunks.append('\n\n'.join(current))
+    return chunks
+
+class TokenBudget:
+    """
+    A token allowance shared by the LLM calls of one run.
+    Calls reserve their estimated prompt tokens up front; once the budget is
+    spent, further reservations raise BudgetExceeded.
+    """
+
+    def __init__(self, limit: Optional[int]):
+        self.limit = limit
+        self.used = 0
+
+    @property
+    def remaining(self) -> Optional[int]:
+        return None if self.limit is None else max(0, self.limit - self.used)
+
+    def reserve(self, tokens: int) -> None:
+        if self.limit is not None and self.used + tokens > self.limit:
+            raise BudgetExceeded(
+                f"Token budget of {self.limit} exhausted ({self.used} used, {tokens} requested)"
+            )
+        self.used += tokens